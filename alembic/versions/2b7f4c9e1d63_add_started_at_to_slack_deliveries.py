@@ -0,0 +1,29 @@
+"""Add started_at to slack_deliveries
+
+Revision ID: 2b7f4c9e1d63
+Revises: 9c6b2e4f7a13
+Create Date: 2026-10-19 10:12:45.730216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7f4c9e1d63'
+down_revision: Union[str, None] = '9c6b2e4f7a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing claims count as started when they were created
+    op.add_column('slack_deliveries', sa.Column('started_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE slack_deliveries SET started_at = created_at")
+    op.alter_column('slack_deliveries', 'started_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('slack_deliveries', 'started_at')
@@ -0,0 +1,26 @@
+"""Add case-insensitive so_number index
+
+Revision ID: 4f1c8a2d7b95
+Revises: 0a7d4e9b3c18
+Create Date: 2026-10-18 14:05:48.302917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c8a2d7b95'
+down_revision: Union[str, None] = '0a7d4e9b3c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_service_incidents_so_number_upper', 'service_incidents', [sa.text('upper(so_number)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_incidents_so_number_upper', table_name='service_incidents')
@@ -0,0 +1,34 @@
+"""Add GIN indexes to incident array columns
+
+Revision ID: 8d2e6f0a4c71
+Revises: 4f1c8a2d7b95
+Create Date: 2026-10-18 14:48:13.590274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e6f0a4c71'
+down_revision: Union[str, None] = '4f1c8a2d7b95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_service_incidents_affected_products_gin', 'service_incidents', ['affected_products'], unique=False, postgresql_using='gin')
+    op.create_index('ix_service_incidents_severity_gin', 'service_incidents', ['severity'], unique=False, postgresql_using='gin')
+    op.create_index('ix_service_incidents_suspected_owning_team_gin', 'service_incidents', ['suspected_owning_team'], unique=False, postgresql_using='gin')
+    op.create_index('ix_service_incidents_suspected_affected_components_gin', 'service_incidents', ['suspected_affected_components'], unique=False, postgresql_using='gin')
+    op.create_index(op.f('ix_service_incidents_start_time'), 'service_incidents', ['start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_service_incidents_start_time'), table_name='service_incidents')
+    op.drop_index('ix_service_incidents_suspected_affected_components_gin', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_suspected_owning_team_gin', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_severity_gin', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_affected_products_gin', table_name='service_incidents')
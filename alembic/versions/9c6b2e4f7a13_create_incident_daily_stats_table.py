@@ -0,0 +1,58 @@
+"""Create incident_daily_stats table
+
+Revision ID: 9c6b2e4f7a13
+Revises: e4a9c2f61b37
+Create Date: 2026-10-18 19:07:12.481530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c6b2e4f7a13'
+down_revision: Union[str, None] = 'e4a9c2f61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('incident_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('team', sa.String(length=250), nullable=False),
+    sa.Column('product', sa.String(length=250), nullable=False),
+    sa.Column('severity', sa.String(length=250), nullable=False),
+    sa.Column('incidents', sa.Integer(), nullable=False),
+    sa.Column('customer_affected', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.Column('resolution_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'team', 'product', 'severity')
+    )
+    # Counting the existing incidents under the same keys the app uses, see rollup_keys in
+    # src/helperFunctions/incident_stats.py; resolved ones by their last resolution, else their end time
+    op.execute("""
+        INSERT INTO incident_daily_stats (day, team, product, severity, incidents, customer_affected, resolved, resolution_seconds)
+        SELECT keys.day, keys.team, keys.product, keys.severity,
+               count(*),
+               count(*) FILTER (WHERE i.p1_customer_affected),
+               count(*) FILTER (WHERE lower(i.status) = 'resolved'),
+               coalesce(sum(greatest(extract(epoch FROM coalesce(
+                   (SELECT max(e.occurred_at) FROM incident_events e
+                    WHERE e.incident_id = i.id AND lower(e.to_status) = 'resolved'),
+                   i.end_time
+               ) - i.start_time), 0)) FILTER (WHERE lower(i.status) = 'resolved'), 0)
+        FROM service_incidents i
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT i.start_time::date AS day, team, product, severity
+            FROM unnest(array_append(i.suspected_owning_team, '*')) AS team,
+                 unnest(array_append(i.affected_products, '*')) AS product,
+                 unnest(array_append(i.severity, '*')) AS severity
+        ) AS keys
+        GROUP BY keys.day, keys.team, keys.product, keys.severity
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('incident_daily_stats')
@@ -0,0 +1,30 @@
+"""Add (created_at, id) keyset index to service_incidents
+
+Revision ID: b7e3d91c5a08
+Revises: 8d2e6f0a4c71
+Create Date: 2026-10-18 15:27:40.118356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d91c5a08'
+down_revision: Union[str, None] = '8d2e6f0a4c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows without created_at would fall out of keyset pages, take the start time instead
+    op.execute("UPDATE service_incidents SET created_at = start_time WHERE created_at IS NULL")
+    op.alter_column('service_incidents', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_service_incidents_created_at_id', 'service_incidents', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_incidents_created_at_id', table_name='service_incidents')
+    op.alter_column('service_incidents', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,34 @@
+"""Create slack_deliveries table
+
+Revision ID: c5d2a8e17f40
+Revises: 64eef34b8131
+Create Date: 2026-10-18 12:04:11.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2a8e17f40'
+down_revision: Union[str, None] = '64eef34b8131'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('slack_deliveries',
+    sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+    sa.Column('response', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_slack_deliveries_created_at'), 'slack_deliveries', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_slack_deliveries_created_at'), table_name='slack_deliveries')
+    op.drop_table('slack_deliveries')
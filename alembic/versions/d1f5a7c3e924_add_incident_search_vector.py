@@ -0,0 +1,38 @@
+"""Add generated search_vector column to service_incidents
+
+Revision ID: d1f5a7c3e924
+Revises: b7e3d91c5a08
+Create Date: 2026-10-18 16:02:19.774530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f5a7c3e924'
+down_revision: Union[str, None] = 'b7e3d91c5a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('service_incidents', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(message_for_sp, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_service_incidents_search_vector', 'service_incidents', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_incidents_search_vector', table_name='service_incidents')
+    op.drop_column('service_incidents', 'search_vector')
@@ -0,0 +1,60 @@
+"""Create incident_events table, partitioned by month
+
+Revision ID: e4a9c2f61b37
+Revises: d1f5a7c3e924
+Create Date: 2026-10-18 16:41:55.203861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2f61b37'
+down_revision: Union[str, None] = 'd1f5a7c3e924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('incident_events_id_seq')))
+    op.create_table('incident_events',
+    sa.Column('id', sa.BigInteger(), server_default=sa.text("nextval('incident_events_id_seq')"), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(), nullable=False),
+    sa.Column('incident_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('actor', sa.String(length=250), nullable=True),
+    sa.Column('from_status', sa.String(length=50), nullable=True),
+    sa.Column('to_status', sa.String(length=50), nullable=True),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['incident_id'], ['service_incidents.id'], ),
+    sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index('ix_incident_events_incident_id_occurred_at', 'incident_events', ['incident_id', 'occurred_at', 'id'], unique=False)
+    # Catches rows of a month whose partition is missing; the app keeps the coming months' partitions ready
+    op.execute("CREATE TABLE incident_events_default PARTITION OF incident_events DEFAULT")
+    op.execute("""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', now())::date;
+        BEGIN
+            FOR i IN 0..3 LOOP
+                EXECUTE format(
+                    'CREATE TABLE incident_events_%s PARTITION OF incident_events FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    # Dropping the parent drops its partitions
+    op.drop_table('incident_events')
+    op.execute(sa.schema.DropSequence(sa.Sequence('incident_events_id_seq')))
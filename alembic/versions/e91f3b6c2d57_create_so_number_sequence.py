@@ -0,0 +1,32 @@
+"""Create so_number_seq sequence
+
+Revision ID: e91f3b6c2d57
+Revises: c5d2a8e17f40
+Create Date: 2026-10-18 12:41:37.519204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91f3b6c2d57'
+down_revision: Union[str, None] = 'c5d2a8e17f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('so_number_seq')))
+    # Continue after the highest SO number already stored
+    op.execute(
+        "SELECT setval('so_number_seq', COALESCE("
+        "(SELECT MAX(CAST(substring(so_number from '[0-9]+$') AS BIGINT)) FROM service_incidents), 0"
+        ") + 1, false)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('so_number_seq')))
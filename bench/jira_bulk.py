@@ -0,0 +1,56 @@
+"""Throughput of one-by-one Jira creates against the bulk path, on a local Jira stand-in.
+
+python -m bench.jira_bulk [incidents] [latency_ms]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+import httpx
+from src import schemas
+from src.helperFunctions.jira import JiraClient, build_issue_fields
+
+
+def stand_in(latency_ms: int):
+    issued = iter(range(1, 10**9))
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        # A fixed round trip plus a little work per issue
+        if request.url.path.endswith("/bulk"):
+            updates = json.loads(request.content)["issueUpdates"]
+            await asyncio.sleep((latency_ms + len(updates)) / 1000)
+            return httpx.Response(201, json={"issues": [{"key": f"SO-{next(issued)}"} for _ in updates], "errors": []})
+        await asyncio.sleep((latency_ms + 1) / 1000)
+        return httpx.Response(201, json={"key": f"SO-{next(issued)}"})
+
+    return handle
+
+
+async def benchmark(count: int, latency_ms: int) -> int:
+    client = JiraClient("http://jira.local", "", client=httpx.AsyncClient(transport=httpx.MockTransport(stand_in(latency_ms))))
+    incident = schemas.IncidentCreate(
+        affected_products=["Search"], severity=["High"], suspected_owning_team=["Core"],
+        start_time=datetime.now(), end_time=datetime.now(), p1_customer_affected=False,
+        suspected_affected_components=[], description="Benchmark", message_for_sp="",
+        statuspage_notification=False, separate_channel_creation=False, so_number="",
+    )
+    fields = build_issue_fields(incident)
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await client.create_issue(fields)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    created = await client.create_issues([fields] * count)
+    bulk = time.perf_counter() - started
+
+    print(f"one-by-one: {count / single:8.1f} issues/s ({single:.2f}s)")
+    print(f"bulk:       {count / bulk:8.1f} issues/s ({bulk:.2f}s)")
+    return 0 if all(created) else 1
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    sys.exit(asyncio.run(benchmark(*args + [200, 50][len(args):])))
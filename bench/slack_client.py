@@ -0,0 +1,107 @@
+"""Throughput and tail latency of SlackClient against the WebClient-on-a-thread-pool bridge it replaced.
+
+python -m bench.slack_client [calls] [concurrency] [latency_ms]
+
+Both talk to a local Slack stand-in running in its own process.
+"""
+import asyncio
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from slack_sdk import WebClient
+from src.helperFunctions.slack_client import SlackClient
+
+
+async def serve_stand_in(port_queue, latency: float):
+    """A minimal keep-alive HTTP server that answers every call with {"ok": true} after `latency`."""
+    body = b'{"ok": true, "ts": "1.0"}'
+    reply = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(latency)
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=1024)
+    port_queue.put(server.sockets[0].getsockname()[1])
+    await server.serve_forever()
+
+
+def run_stand_in(port_queue, latency: float):
+    asyncio.run(serve_stand_in(port_queue, latency))
+
+
+def report(name: str, calls: int, elapsed: float, cpu: float, latencies: list):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:16} {calls / elapsed:8.1f} calls/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms"
+        f"  cpu {cpu / calls * 1000:5.2f} ms/call"
+    )
+
+
+async def measure(name: str, call, calls: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - started)
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    report(name, calls, time.perf_counter() - started, time.process_time() - cpu_started, latencies)
+
+
+async def benchmark(base_url: str, calls: int, concurrency: int):
+    web_client = WebClient(token="xoxb-benchmark", base_url=base_url)
+    executor = ThreadPoolExecutor(max_workers=10)
+    loop = asyncio.get_running_loop()
+
+    async def bridged(i: int):
+        await loop.run_in_executor(
+            executor, lambda: web_client.chat_postMessage(channel=f"C{i}", text="benchmark")
+        )
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as http:
+        client = SlackClient("xoxb-benchmark", http_client=http, base_url=base_url, scheduler=None)
+
+        async def native(i: int):
+            await client.api_call("chat.postMessage", channel=f"C{i}", text="benchmark")
+
+        await measure("executor bridge", bridged, calls, concurrency)
+        await measure("async client", native, calls, concurrency)
+    executor.shutdown()
+
+
+def main(calls: int, concurrency: int, latency_ms: int):
+    port_queue = multiprocessing.Queue()
+    stand_in = multiprocessing.Process(target=run_stand_in, args=(port_queue, latency_ms / 1000), daemon=True)
+    stand_in.start()
+    try:
+        asyncio.run(benchmark(f"http://127.0.0.1:{port_queue.get()}/api/", calls, concurrency))
+    finally:
+        stand_in.terminate()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args + [1000, 10, 20][len(args):])
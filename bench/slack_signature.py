@@ -0,0 +1,46 @@
+"""Microbenchmark of Slack signature verification against the previous str-based one.
+
+python -m bench.slack_signature
+"""
+import hashlib
+import hmac
+import time
+import timeit
+from src.helperFunctions.slack_signature import SlackSignatureVerifier
+
+
+def main():
+    secret = "8f742231b10e8888abcd99yyyzzz85a5"
+    timestamp = str(int(time.time()))
+
+    def previous(body):
+        sig_base = f"v0:{timestamp}:{body.decode()}"
+        expected = "v0=" + hmac.new(secret.encode(), sig_base.encode(), hashlib.sha256).hexdigest()
+        hmac.compare_digest(expected, expected)
+
+    verifier = SlackSignatureVerifier(secret)
+
+    def signature_only(body):
+        hmac.compare_digest(verifier.signature_for(body, timestamp), b"")
+
+    def with_replay_check(body, signature):
+        # The same signature would be rejected as a replay, so forget it again
+        verifier.verify(body, signature, timestamp)
+        verifier.replay_cache._seen.popitem()
+
+    runs = 50_000
+    # Slash commands are a few hundred bytes, view submissions several kilobytes
+    for size in (512, 8 * 1024):
+        body = b"payload=" + b"x" * (size - 8)
+        signature = verifier.signature_for(body, timestamp)
+        for name, func in (
+            ("previous", lambda: previous(body)),
+            ("signature", lambda: signature_only(body)),
+            ("verify", lambda: with_replay_check(body, signature)),
+        ):
+            seconds = timeit.timeit(func, number=runs)
+            print(f"{size:>6}B {name:>9}: {seconds / runs * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Concurrency stress test of SONumberAllocator, exiting non-zero on any duplicate number.
+
+python -m bench.so_number_allocator [threads] [per_thread] [block_size]
+
+Runs against the configured database on a scratch sequence it creates and drops,
+so the SO numbers of so_number_seq are left alone.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import Sequence
+from sqlalchemy.schema import CreateSequence, DropSequence
+from src.database import engine
+from src.helperFunctions.generate_next_so_number import SONumberAllocator
+
+
+SCRATCH_SEQUENCE = Sequence("so_number_bench_seq")
+
+
+def main(threads: int, per_thread: int, block_size: int) -> int:
+    with engine.begin() as conn:
+        conn.execute(CreateSequence(SCRATCH_SEQUENCE, if_not_exists=True))
+    try:
+        # Two allocators stand in for two separate workers sharing the sequence
+        allocators = [SONumberAllocator(SCRATCH_SEQUENCE, block_size=block_size) for _ in range(2)]
+
+        def worker(index: int):
+            allocator = allocators[index % len(allocators)]
+            return [allocator.allocate_number() for _ in range(per_thread)]
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            issued = [number for numbers in pool.map(worker, range(threads)) for number in numbers]
+    finally:
+        with engine.begin() as conn:
+            conn.execute(DropSequence(SCRATCH_SEQUENCE, if_exists=True))
+
+    duplicates = len(issued) - len(set(issued))
+    print(f"Issued {len(issued)} SO numbers from {threads} threads, {duplicates} duplicates")
+    return 1 if duplicates else 0
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    sys.exit(main(*args + [16, 200, 1][len(args):]))
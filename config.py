@@ -29,6 +29,34 @@ class Settings(BaseSettings):
     statuspage_page_id: str
     statuspage_component_id: str
     statuspage_url: str
+    # Ack-first mode for /slack/commands: answer Slack within the budget and
+    # finish opening the modal in the background when it runs late
+    SLACK_ACK_FIRST: bool = False
+    SLACK_ACK_BUDGET_SECONDS: float = 2.5
+    # Connection pool of each engine (sync and async). With DATABASE_PGBOUNCER the app
+    # keeps no pool of its own and avoids prepared statements, for transaction pooling
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_PGBOUNCER: bool = False
+    # SO numbers reserved per database round trip; unused ones are skipped on restart
+    SO_NUMBER_BLOCK_SIZE: int = 1
+    # Incident lookups by SO number, see src/helperFunctions/incident_cache.py; misses are
+    # remembered for the shorter TTL
+    INCIDENT_CACHE_SIZE: int = 1024
+    INCIDENT_CACHE_TTL_SECONDS: float = 300.0
+    INCIDENT_CACHE_NEGATIVE_TTL_SECONDS: float = 30.0
+    # Outbox jobs run by this process; 0 leaves them to `python -m src.outbox worker`
+    OUTBOX_WORKER_CONCURRENCY: int = 4
+    OUTBOX_POLL_SECONDS: float = 1.0
+    # Key the /incidents and /metrics endpoints expect in the X-API-Key header; unset, they refuse every request
+    API_KEY: str = ""
+    # Logging goes through a queue to a background writer, see src/helperFunctions/logging_config.py
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "app.log"
+    LOG_JSON: bool = True
 
     class Config:
         env_file = ".env"
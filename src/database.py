@@ -1,16 +1,55 @@
+from uuid import uuid4
 from sqlalchemy import create_engine # type: ignore
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base #type: ignore
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from config import settings
 
 
-SQLALCHEMY_DATABASE_URL =  f"postgresql+psycopg2://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+def database_url(driver: str) -> str:
+    return f"postgresql+{driver}://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
 
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = database_url("psycopg2")
+ASYNC_SQLALCHEMY_DATABASE_URL = database_url("asyncpg")
+
+
+def pool_options() -> dict:
+    if settings.DATABASE_PGBOUNCER:
+        # PgBouncer pools the server connections; holding ours idle would only pin them
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def async_connect_args() -> dict:
+    if not settings.DATABASE_PGBOUNCER:
+        return {}
+    # In transaction pooling a statement prepared on one server connection is not there
+    # on the next, so nothing is cached and every prepared statement gets a unique name
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+# Used by the outbox worker and scripts, which run off the request path
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Used by everything that runs on the event loop, so queries never block it
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, connect_args=async_connect_args(), **pool_options())
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -18,4 +57,9 @@ def get_db():
         db = SessionLocal()
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
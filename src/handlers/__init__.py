@@ -0,0 +1 @@
+from src.handlers.registry import HandlerContext, HandlerRegistry, SlackResponse, registry
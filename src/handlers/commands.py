@@ -0,0 +1,218 @@
+import logging
+import httpx
+from fastapi import HTTPException
+from slack_sdk.errors import SlackApiError
+from src.handlers.registry import HandlerContext, SlackResponse, registry
+from src.helperFunctions.ack_dispatch import run_within_budget
+from src.helperFunctions.generate_next_so_number import generate_next_so_number
+from src.helperFunctions.incident_queries import find_incidents, parse_filter_text
+from src.helperFunctions.incident_search import search_incidents
+from src.helperFunctions.incident_stats import incident_stats, parse_stats_text
+from src.helperFunctions.slack_client import SlackClient
+from src.models import Incident
+
+
+logger = logging.getLogger(__name__)
+
+# Below this much remaining budget the modal is not attempted inline
+MIN_INLINE_OPEN_SECONDS = 0.2
+# Incidents listed in one /list-incidents reply
+LIST_COMMAND_LIMIT = 20
+# Matches listed in one /search-incident reply
+SEARCH_COMMAND_LIMIT = 10
+# Groups listed in one /incident-stats reply
+STATS_COMMAND_LIMIT = 25
+
+
+@registry.command("/get-incident", requires=("slack", "cache"))
+async def get_incident_command(ctx: HandlerContext) -> SlackResponse:
+    return await open_modal_for_command(
+        ctx, "so_lookup_form", "Incident Lookup form has been opened successfully."
+    )
+
+
+@registry.command("/create-incident", requires=("db", "slack", "cache"))
+async def create_incident_command(ctx: HandlerContext) -> SlackResponse:
+    async def suggest_so_number():
+        async with ctx.new_dependency("db") as so_db:
+            return await generate_next_so_number(so_db)
+
+    return await open_modal_for_command(
+        ctx,
+        "incident_form",
+        "Incident form opening executed successfully in the FastAPI Backend",
+        suggest_so_number=suggest_so_number,
+    )
+
+
+@registry.command("/update-incident", requires=("slack", "cache"))
+async def update_incident_command(ctx: HandlerContext) -> SlackResponse:
+    return await open_modal_for_command(
+        ctx, "statuspage_update", "Incident update form has been opened successfully."
+    )
+
+
+@registry.command("/list-incidents", requires=("db",))
+async def list_incidents_command(ctx: HandlerContext) -> SlackResponse:
+    try:
+        filters = parse_filter_text(ctx.request.get("text", ""))
+    except HTTPException as e:
+        return SlackResponse({"response_type": "ephemeral", "text": e.detail})
+
+    incidents = await find_incidents(ctx.db, filters, LIST_COMMAND_LIMIT + 1)
+    if not incidents:
+        return SlackResponse({"response_type": "ephemeral", "text": "No incidents match these filters."})
+
+    lines = [format_incident_line(incident) for incident in incidents[:LIST_COMMAND_LIMIT]]
+    if len(incidents) > LIST_COMMAND_LIMIT:
+        lines.append(f"_Showing the {LIST_COMMAND_LIMIT} most recent, narrow the filters to see older ones._")
+    return SlackResponse({"response_type": "ephemeral", "text": "\n".join(lines)})
+
+
+@registry.command("/search-incident", requires=("db",))
+async def search_incident_command(ctx: HandlerContext) -> SlackResponse:
+    text = ctx.request.get("text", "").strip()
+    if not text:
+        return SlackResponse({
+            "response_type": "ephemeral",
+            "text": 'Usage: /search-incident words to look for, e.g. /search-incident "login timeout" -staging',
+        })
+
+    matches = await search_incidents(ctx.db, text, limit=SEARCH_COMMAND_LIMIT, start_sel="*", stop_sel="*")
+    if not matches:
+        return SlackResponse({"response_type": "ephemeral", "text": f"No incidents mention {text}."})
+
+    lines = [
+        f"*{match['so_number']}* {match['start_time']:%Y-%m-%d %H:%M} | {', '.join(match['severity'])}\n>{match['snippet']}"
+        for match in matches
+    ]
+    return SlackResponse({"response_type": "ephemeral", "text": "\n".join(lines)})
+
+
+@registry.command("/incident-stats", requires=("db",))
+async def incident_stats_command(ctx: HandlerContext) -> SlackResponse:
+    try:
+        filters, group_by = parse_stats_text(ctx.request.get("text", ""))
+        groups = await incident_stats(ctx.db, filters, group_by or ["team"])
+    except HTTPException as e:
+        return SlackResponse({"response_type": "ephemeral", "text": e.detail})
+
+    groups = [group for group in groups if group["incidents"]]
+    if not groups:
+        return SlackResponse({"response_type": "ephemeral", "text": f"No incidents since {filters.since:%Y-%m-%d}."})
+
+    if "day" not in group_by:
+        groups.sort(key=lambda group: group["incidents"], reverse=True)
+    lines = [f"_Incidents since {filters.since:%Y-%m-%d}_"]
+    lines += [format_stats_line(group) for group in groups[:STATS_COMMAND_LIMIT]]
+    if len(groups) > STATS_COMMAND_LIMIT:
+        lines.append(f"_Showing {STATS_COMMAND_LIMIT} of {len(groups)} groups, narrow the filters to see the rest._")
+    return SlackResponse({"response_type": "ephemeral", "text": "\n".join(lines)})
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+def format_stats_line(group: dict) -> str:
+    day = f"{group['day']:%Y-%m-%d}" if group.get("day") else None
+    label = " / ".join(str(value) for value in (day, group.get("team"), group.get("product"), group.get("severity")) if value)
+    mttr = format_duration(group["mttr_seconds"]) if group["mttr_seconds"] is not None else "n/a"
+    return (
+        f"*{label or 'All incidents'}* {group['incidents']} incidents"
+        f" | {group['customer_affected']} customer-affected ({group['customer_impact_rate']:.0%})"
+        f" | {group['resolved']} resolved, MTTR {mttr}"
+    )
+
+
+def format_incident_line(incident: Incident) -> str:
+    return (
+        f"*{incident.so_number}* {incident.start_time:%Y-%m-%d %H:%M}"
+        f" | {', '.join(incident.severity)}"
+        f" | {', '.join(incident.affected_products)}"
+        f" | {', '.join(incident.suspected_owning_team)}"
+        f" | {incident.description}"
+    )
+
+
+async def open_modal_for_command(ctx: HandlerContext, callback_id: str, success_text: str, suggest_so_number=None) -> SlackResponse:
+    settings = ctx.settings
+    command = ctx.request.command
+    trigger_id = ctx.request.trigger_id
+    slack_client = ctx.slack
+    cache = ctx.cache
+
+    async def open_modal():
+        suggested_so_number = await suggest_so_number() if suggest_so_number else None
+        view = await cache.render_view(callback_id, suggested_so_number=suggested_so_number)
+        return await open_command_modal(slack_client, trigger_id, view)
+
+    if not settings.SLACK_ACK_FIRST or ctx.budget is None:
+        await open_modal()
+    else:
+        response_url = ctx.request.response_url
+
+        async def report_late_failure(error: BaseException):
+            await send_response_url_followup(
+                slack_client,
+                response_url,
+                f"Sorry, the form for {command} could not be opened in time. Please run the command again.",
+            )
+
+        opened = await run_within_budget(
+            open_modal(),
+            ctx.budget,
+            name=f"views.open {callback_id}",
+            min_inline_seconds=MIN_INLINE_OPEN_SECONDS,
+            on_late_failure=report_late_failure,
+        )
+        if not opened:
+            # Acknowledge now, the modal keeps opening in the background
+            return SlackResponse({
+                "response_type": "ephemeral",
+                "text": "Opening the form...",
+            })
+
+    return SlackResponse({
+        "response_type": "ephemeral",
+        "text": success_text,
+    })
+
+
+async def open_command_modal(slack_client: SlackClient, trigger_id: str, view: str) -> dict:
+    logger.debug("views.open view: %s", view)
+
+    try:
+        slack_response = await slack_client.api_call("views.open", trigger_id=trigger_id, view=view)
+    except SlackApiError as e:
+        logger.error(f"Slack API error: {e.response.data}")
+        raise HTTPException(
+            status_code=400, detail=f"Slack API error: {e.response.data}"
+        ) from e
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to open the form: {str(e)}")
+        raise HTTPException(
+            status_code=400, detail=f"Failed to open the form: {str(e)}"
+        ) from e
+    return slack_response.data
+
+
+async def send_response_url_followup(slack_client: SlackClient, response_url: str, text: str):
+    if not response_url:
+        logger.warning("No response_url to send the follow-up to")
+        return
+    try:
+        # response_url is not a Web API method, it is posted to on the same connection pool
+        await slack_client.http_client.post(
+            response_url,
+            json={"response_type": "ephemeral", "text": text},
+        )
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to send response_url follow-up: {str(e)}")
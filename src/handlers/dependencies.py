@@ -0,0 +1,23 @@
+from src.database import AsyncSessionLocal
+from src.helperFunctions.slack_client import get_slack_client
+from src.utils import render_view_payload, view_registry
+
+
+class AppCache:
+    """In-process caches shared by the Slack handlers."""
+
+    def __init__(self):
+        self.views = view_registry
+
+    async def render_view(self, callback_id: str, **values) -> str:
+        return await render_view_payload(callback_id, **values)
+
+
+app_cache = AppCache()
+
+# Dependency name -> factory, shared by the FastAPI router and the Lambda handlers
+DEFAULT_PROVIDERS = {
+    "db": AsyncSessionLocal,
+    "slack": get_slack_client,
+    "cache": lambda: app_cache,
+}
@@ -0,0 +1,118 @@
+import json
+import logging
+from typing import Optional, Union
+from fastapi import HTTPException
+from config import Settings
+from src.handlers import commands, interactions, jobs  # noqa: F401 (registers the handlers and job types)
+from src.handlers.dependencies import DEFAULT_PROVIDERS
+from src.handlers.idempotency import IN_FLIGHT, IdempotencyStore, delivery_key, delivery_store
+from src.handlers.payloads import Interaction, SlashCommand
+from src.handlers.registry import HandlerContext, SlackResponse, registry
+
+
+logger = logging.getLogger(__name__)
+
+# Answers to a duplicate delivery that arrives while the first one is still being handled
+IN_FLIGHT_RESPONSES = {
+    "command": {"response_type": "ephemeral", "text": "Your request is already being processed."},
+    "view_submission": {"response_action": "clear"},
+}
+
+
+#Checks shared by every entry point (FastAPI router and Lambda handlers)
+def check_verification_token(token: str, settings: Settings):
+    if token != settings.SLACK_VERIFICATION_TOKEN:
+        logger.error("Invalid Slack verification token")
+        raise HTTPException(status_code=400, detail="Invalid token")
+
+
+async def dispatch_once(kind: str, key: Optional[str], ctx: HandlerContext, store: Optional[IdempotencyStore], retry_num: Optional[str] = None) -> Optional[SlackResponse]:
+    """Dispatch a delivery unless it was already handled, in which case the stored response is returned.
+
+    Slack redelivers when the ack is slow (X-Slack-Retry-Num); running the handler
+    again would repeat its side effects, e.g. a second Jira ticket and P1 alert.
+    """
+    idempotency_key = delivery_key(ctx.request) if store is not None else None
+    if idempotency_key is None:
+        return await registry.dispatch(kind, key, ctx)
+
+    claimed, stored = await store.claim(idempotency_key)
+    if not claimed:
+        logger.info("Duplicate delivery of %s %s (retry %s), not handling it again", kind, key, retry_num)
+        if stored is IN_FLIGHT:
+            return SlackResponse(IN_FLIGHT_RESPONSES[kind])
+        return SlackResponse(stored)
+
+    try:
+        result = await registry.dispatch(kind, key, ctx)
+    except Exception:
+        await store.release(idempotency_key)
+        raise
+    if result is None:
+        await store.release(idempotency_key)
+    else:
+        await store.complete(idempotency_key, result.content)
+    return result
+
+
+async def dispatch_command(command: Union[SlashCommand, dict], settings: Settings, budget=None, providers: dict = None, verify_token: bool = True, retry_num: Optional[str] = None, store: Optional[IdempotencyStore] = delivery_store) -> Optional[SlackResponse]:
+    if isinstance(command, dict):
+        command = SlashCommand(command)
+    if verify_token:
+        check_verification_token(command.token, settings)
+
+    ctx = HandlerContext(command, settings, providers or DEFAULT_PROVIDERS, budget=budget)
+    try:
+        return await dispatch_once("command", command.command, ctx, store, retry_num)
+    finally:
+        await ctx.aclose()
+
+
+async def dispatch_interaction(interaction: Union[Interaction, dict], settings: Settings, providers: dict = None, verify_token: bool = True, retry_num: Optional[str] = None, store: Optional[IdempotencyStore] = delivery_store) -> SlackResponse:
+    if isinstance(interaction, dict):
+        interaction = Interaction(interaction)
+    if verify_token:
+        check_verification_token(interaction.token, settings)
+
+    #Extracting user id for usage in sending slack messages
+    if not interaction.user_id:
+        logger.error("Missing user_id in the payload")
+        raise HTTPException(status_code=400, detail="Missing user_id")
+
+    if not interaction.trigger_id:
+        logger.error("Missing trigger_id in the payload")
+        raise HTTPException(status_code=400, detail="Missing trigger_id")
+
+    ctx = HandlerContext(interaction, settings, providers or DEFAULT_PROVIDERS)
+    try:
+        result = await dispatch_once(interaction.kind, interaction.callback_id, ctx, store, retry_num)
+    finally:
+        await ctx.aclose()
+    if result is None:
+        result = SlackResponse({"response": "success"})
+    return result
+
+
+async def to_lambda_response(result: Optional[SlackResponse], not_found_error: str = "Invalid command") -> dict:
+    """API Gateway response for a handler result.
+
+    Lambda freezes once the handler returns, so background work runs before responding.
+    """
+    if result is None:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": not_found_error})
+        }
+    for func, args, kwargs in result.background:
+        await func(*args, **kwargs)
+    return {
+        "statusCode": result.status_code,
+        "body": json.dumps(result.content)
+    }
+
+
+def http_exception_to_lambda_response(e: HTTPException) -> dict:
+    return {
+        "statusCode": e.status_code,
+        "body": json.dumps({"error": e.detail})
+    }
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from src.database import AsyncSessionLocal
+from src.models import SlackDelivery
+
+
+logger = logging.getLogger(__name__)
+
+# Number of deliveries remembered in-process
+MAX_CACHED_DELIVERIES = 4096
+# Slack stops retrying well within this, older records are only kept for debugging
+DELIVERY_RETENTION = timedelta(days=1)
+
+# asyncpg raises connection failures as OSError rather than as a DBAPI error
+DB_ERRORS = (SQLAlchemyError, OSError)
+
+# Marks a delivery that was claimed but whose handler has not returned yet
+IN_FLIGHT = object()
+# A claim whose handler has not answered within this is taken to be lost, e.g. with
+# its process, and a retry may take the delivery over; Slack needs an ack within 3s
+IN_FLIGHT_LEASE = timedelta(seconds=30)
+
+
+def delivery_key(request) -> Optional[str]:
+    """Identifies one user action, so Slack's retries of it map to the same key.
+
+    Only slash commands and view submissions are keyed; other deliveries have no
+    side effects worth deduplicating.
+    """
+    if request.kind == "command":
+        return f"command:{request.trigger_id}:{request.user_id}:{request.digest}"
+    if request.kind == "view_submission":
+        view = request.view
+        return f"view:{view.get('id')}:{view.get('hash')}:{request.user_id}:{request.digest}"
+    return None
+
+
+def claim_statement(key: str, now: datetime, lease: timedelta = IN_FLIGHT_LEASE):
+    """Insert the delivery, or take over one whose claim is older than `lease` and has no response yet.
+
+    Affects one row exactly when the caller now holds the claim; the conflict check
+    runs under the row's lock, so only one of several retries takes a claim over.
+    """
+    statement = insert(SlackDelivery).values(idempotency_key=key, created_at=now, started_at=now)
+    return statement.on_conflict_do_update(
+        index_elements=[SlackDelivery.idempotency_key],
+        set_={"started_at": statement.excluded.started_at},
+        where=SlackDelivery.response.is_(None) & (SlackDelivery.started_at < now - lease),
+    )
+
+
+class IdempotencyStore:
+    """Remembers the response given to each Slack delivery.
+
+    Lookups go to a bounded in-process LRU first and then to the slack_deliveries
+    table, which every worker and Lambda container shares. If the database is
+    unreachable the store degrades to the LRU alone rather than failing the request.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, max_entries: int = MAX_CACHED_DELIVERIES,
+                 lease: timedelta = IN_FLIGHT_LEASE):
+        self._session_factory = session_factory
+        self._max_entries = max_entries
+        self._lease = lease
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        # monotonic time each in-process claim was made at
+        self._claimed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, response: Any):
+        with self._lock:
+            self._claimed_at.pop(key, None)
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def _lease_expired(self, key: str) -> bool:
+        claimed_at = self._claimed_at.get(key)
+        return claimed_at is not None and time.monotonic() - claimed_at >= self._lease.total_seconds()
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._cache or self._lease_expired(key):
+                return False, None
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    async def claim(self, key: str) -> Tuple[bool, Any]:
+        """Claim a delivery before handling it.
+
+        Returns (True, None) for a first delivery, and for a duplicate whose first
+        delivery has held its claim for longer than the lease without answering.
+        For other duplicates returns False and the stored response, or IN_FLIGHT
+        while the first delivery is still running.
+        """
+        found, response = self._cached(key)
+        if found:
+            return False, response
+
+        # Claim the key in-process first so concurrent duplicates on this worker wait on it
+        with self._lock:
+            if key in self._cache and not self._lease_expired(key):
+                return False, self._cache[key]
+            self._cache[key] = IN_FLIGHT
+            self._cache.move_to_end(key)
+            self._claimed_at[key] = time.monotonic()
+
+        now = datetime.now()
+        try:
+            async with self._session_factory() as db:
+                inserted = await db.execute(claim_statement(key, now, self._lease))
+                await db.commit()
+                if inserted.rowcount:
+                    return True, None
+                stored = (await db.execute(
+                    select(SlackDelivery.response).where(SlackDelivery.idempotency_key == key)
+                )).scalar_one_or_none()
+        except DB_ERRORS as e:
+            logger.warning("Idempotency store unavailable, relying on the in-process cache: %s", e)
+            return True, None
+
+        if stored is None:
+            # Another worker is still handling it, look again on the next retry
+            with self._lock:
+                self._cache.pop(key, None)
+                self._claimed_at.pop(key, None)
+            return False, IN_FLIGHT
+
+        # Another worker handled it; remember its answer locally
+        self._remember(key, stored)
+        return False, stored
+
+    async def complete(self, key: str, response: Any):
+        self._remember(key, response)
+        try:
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(SlackDelivery)
+                    .where(SlackDelivery.idempotency_key == key)
+                    .values(response=response)
+                )
+                await db.commit()
+        except DB_ERRORS as e:
+            logger.warning("Could not store the response for %s: %s", key, e)
+
+    async def release(self, key: str):
+        """Forget a delivery whose handler failed, so a retry can run it again."""
+        with self._lock:
+            self._cache.pop(key, None)
+            self._claimed_at.pop(key, None)
+        try:
+            async with self._session_factory() as db:
+                await db.execute(delete(SlackDelivery).where(SlackDelivery.idempotency_key == key))
+                await db.commit()
+        except DB_ERRORS as e:
+            logger.warning("Could not release %s: %s", key, e)
+
+    async def purge_expired(self, retention: timedelta = DELIVERY_RETENTION) -> int:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                delete(SlackDelivery).where(SlackDelivery.created_at < datetime.now() - retention)
+            )
+            await db.commit()
+        return result.rowcount
+
+
+delivery_store = IdempotencyStore()
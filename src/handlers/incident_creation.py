@@ -0,0 +1,349 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from config import Settings
+from src import models
+from src import schemas
+from src.helperFunctions.incident_events import set_incident_status
+from src.helperFunctions.status_page import create_statuspage_incident
+from src.helperFunctions.team_channel_mapping_to_slack import route_teams
+from src.helperFunctions.opsgenie import create_alert
+from src.helperFunctions.jira import create_jira_ticket
+from src.helperFunctions.slack_client import SlackClient
+from src.helperFunctions.slack_utils import post_message_to_slack, create_slack_channel, open_slack_response_modal
+from src.outbox.queue import DEFAULT_MAX_ATTEMPTS, run_sync
+
+
+logger = logging.getLogger(__name__)
+
+# Per-step deadlines for the side effects of a new incident, in seconds
+OPSGENIE_STAGE_TIMEOUT = 10
+STATUSPAGE_STAGE_TIMEOUT = 15
+SLACK_STAGE_TIMEOUT = 10
+# Channel setup includes creating, joining and the first message
+CHANNEL_STAGE_TIMEOUT = 30
+# Announcing the incident in the general outages and team channels
+BROADCAST_STAGE_TIMEOUT = 30
+BROADCAST_CONCURRENCY = 4
+
+
+#Extracting the incident from the submitted incident form
+def extract_incident_data(state_values):
+    required_fields = ["start_time", "start_time_picker", "end_time", "end_time_picker", "so_number", "affected_products", "suspected_owning_team", "severity"]
+    
+    for field in required_fields:
+        if field not in state_values:
+            logger.error(f"Missing {field} in state values")
+            raise ValueError(f"Missing {field}")
+    
+    start_date = state_values.get("start_time", {}).get("start_date_action", {}).get("selected_date")
+    start_time = state_values.get("start_time_picker", {}).get("start_time_picker_action", {}).get("selected_time")
+    end_date = state_values.get("end_time", {}).get("end_date_action", {}).get("selected_date")
+    end_time = state_values.get("end_time_picker", {}).get("end_time_picker_action", {}).get("selected_time")
+
+    if not start_date or not start_time:
+        raise ValueError("Missing start datetime")
+    if not end_date or not end_time:
+        raise ValueError("Missing end datetime")
+
+    start_datetime_str = f"{start_date}T{start_time}:00"
+    end_datetime_str = f"{end_date}T{end_time}:00"
+
+    try:
+        start_time_obj = datetime.strptime(start_datetime_str, "%Y-%m-%dT%H:%M:%S")
+        end_time_obj = datetime.strptime(end_datetime_str, "%Y-%m-%dT%H:%M:%S")
+    except ValueError as e:
+        raise ValueError("Invalid datetime format") from e
+
+    so_number = state_values.get("so_number", {}).get("so_number_action", {}).get("value")
+    if not so_number:
+        logger.error("Missing SO number")
+        raise ValueError("Missing SO number")
+
+    affected_products_options = state_values.get("affected_products", {}).get("affected_products_action", {}).get("selected_options", [])
+    affected_products = [option["value"] for option in affected_products_options]
+
+    suspected_owning_team_options = state_values.get("suspected_owning_team", {}).get("suspected_owning_team_action", {}).get("selected_options", [])
+    suspected_owning_team = [option["value"] for option in suspected_owning_team_options]
+
+    suspected_affected_components_options = state_values.get("suspected_affected_components", {}).get("suspected_affected_components_action", {}).get("selected_options", [])
+    suspected_affected_components = [option["value"] for option in suspected_affected_components_options]
+
+    severity_option = state_values.get("severity", {}).get("severity_action", {}).get("selected_option", {})
+    severity = severity_option.get("value") if severity_option else None
+    severity = [severity] if severity else []
+
+    return {
+        "so_number": so_number,
+        "affected_products": affected_products,
+        "severity": severity,
+        "suspected_owning_team": suspected_owning_team,
+        "start_time": start_time_obj.isoformat(),
+        "end_time": end_time_obj.isoformat(),
+        "p1_customer_affected": extract_checkbox(state_values, "p1_customer_affected"),
+        "suspected_affected_components": suspected_affected_components,
+        "description": state_values.get("description", {}).get("description_action", {}).get("value"),
+        "message_for_sp": state_values.get("message_for_sp", {}).get("message_for_sp_action", {}).get("value", ""),
+        "statuspage_notification": extract_checkbox(state_values, "flags_for_statuspage_notification", "statuspage_notification"),
+        "separate_channel_creation": extract_checkbox(state_values, "flags_for_statuspage_notification", "separate_channel_creation"),
+    }
+
+def extract_checkbox(state_values, key, value=None):
+    options = state_values.get(key, {}).get(f"{key}_action", {}).get("selected_options", [])
+    return any(option.get("value") == (value or key) for option in options)
+    
+class IncidentStep:
+    """One side effect of a new incident, run as its own outbox job (incident.<name>).
+
+    `func(incident, results)` gets an IncidentContext and the results of the steps
+    listed in `after`; it is enqueued as soon as those have succeeded, unless
+    `when(db_incident)` says the incident does not need it. `on_error(db, db_incident, error)`
+    runs after a failed attempt, in a session of its own, and is committed with the retry.
+    """
+
+    __slots__ = ("name", "func", "after", "timeout", "when", "max_attempts", "on_error")
+
+    def __init__(self, name: str, func, after=(), timeout: float = None, when=None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, on_error=None):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.timeout = timeout
+        self.when = when
+        self.max_attempts = max_attempts
+        self.on_error = on_error
+
+
+class IncidentContext:
+    def __init__(self, db_incident: models.Incident, trigger_id: str, settings: Settings, db: Session, slack: SlackClient):
+        self.db_incident = db_incident
+        self.trigger_id = trigger_id
+        self.settings = settings
+        self.db = db
+        self.slack = slack
+
+
+#creating incident 
+async def create_incident_record(
+    incident_data: dict, db: Session, idempotency_key: Optional[str] = None, retrying: bool = False
+) -> models.Incident:
+    """Creates the Jira ticket and adds the incident to the session, without committing.
+
+    With an idempotency key, a retry reuses the ticket an earlier attempt created.
+    """
+    logger.info("Starting incident creation process")
+
+    # Create Jira ticket
+    incident = schemas.IncidentCreate(**incident_data)
+    issue = await create_jira_ticket(incident, idempotency_key, retrying)
+    
+    # Update incident data
+    incident_data["so_number"] = issue["key"]
+    incident_data["jira_issue_key"] = issue["key"]
+    
+    # Save to database, flushing to get the id the follow-up steps refer to
+    db_incident = models.Incident(**incident_data)
+    try:
+        db.add(db_incident)
+        await run_sync(db, db.flush)
+    except Exception as db_error:
+        logger.error(f"Database error: {str(db_error)}")
+        await run_sync(db, db.rollback)
+        raise
+    return db_incident
+
+
+async def report_creation_failure(slack: SlackClient, trigger_id: str):
+    try:
+        await open_slack_response_modal(
+            slack,
+            trigger_id=trigger_id,
+            modal_type="error",
+            incident_data={
+                "error": "An unexpected error occurred during incident creation. Please try again or contact support."
+            }
+        )
+    except Exception as slack_error:
+        logger.error(f"Error sending Slack error message: {str(slack_error)}")
+
+
+async def page_opsgenie(incident: IncidentContext, results: dict):
+    opsgenie_response = await create_alert(incident.db_incident)
+    if opsgenie_response.get("status_code") in [201, 202]:  # OpsGenie uses 202 for successful alert creation
+        request_id = opsgenie_response["data"].get("requestId")
+        logger.info("OpsGenie alert created, request ID: %s", request_id)
+        return {"request_id": request_id}
+    logger.error("Failed to create OpsGenie alert")
+    raise RuntimeError(f"OpsGenie returned status code {opsgenie_response.get('status_code')}")
+
+
+async def create_statuspage(incident: IncidentContext, results: dict):
+    db_incident = incident.db_incident
+    try:
+        statuspage_response = await create_statuspage_incident(db_incident, incident.settings, incident.db)
+        logger.info(f"Statuspage incident created with ID: {statuspage_response.statuspage_incident_id}")
+        db_incident.statuspage_incident_id = statuspage_response.statuspage_incident_id
+        return statuspage_response.model_dump()
+    except Exception as e:
+        logger.error(f"Unexpected error creating Statuspage incident for SO {db_incident.so_number}: {str(e)}")
+        raise
+
+
+def mark_statuspage_failed(db: Session, db_incident: models.Incident, error: BaseException):
+    set_incident_status(db, db_incident, "STATUSPAGE_CREATION_FAILED", "statuspage")
+
+
+async def open_success_modal(incident: IncidentContext, results: dict):
+    db_incident = incident.db_incident
+    # Send success message to Slack
+    try:
+        await open_slack_response_modal(
+            incident.slack,
+            trigger_id=incident.trigger_id,
+            modal_type="success",
+            incident_data={
+                "so_number": db_incident.so_number,
+                "severity": db_incident.severity,
+                "jira_url": f"{incident.settings.jira_server}/browse/{db_incident.jira_issue_key}"
+            }
+        )
+    except Exception as slack_error:
+        logger.error(f"Error sending Slack success message: {str(slack_error)}")
+        await open_slack_response_modal(
+            incident.slack,
+            trigger_id=incident.trigger_id,
+            modal_type="error",
+            incident_data={
+                "error": str(slack_error)
+            }
+        )
+        raise
+
+
+async def set_up_incident_channel(incident: IncidentContext, results: dict):
+    db_incident = incident.db_incident
+    channel_name = f"incident-{db_incident.so_number}".lower()
+    #A channel an earlier run of this step already set up is reused
+    channel_id = results.get("incident_channel") or await create_slack_channel(incident.slack, channel_name)
+    incident_message = create_incident_message(db_incident, incident.settings)
+    await post_message_to_slack(incident.slack, channel_id, incident_message)
+    logger.info(f"Posted message to incident channel {channel_name}")
+    return channel_id
+
+
+def broadcast_plan(db_incident: models.Incident, incident_channel: str, settings: Settings) -> dict:
+    """channel id -> message, one entry per distinct channel to announce the incident in."""
+    general_channel = settings.SLACK_GENERAL_OUTAGES_CHANNEL
+    plan = {general_channel: create_general_outages_message(db_incident, incident_channel)}
+    routes = route_teams(db_incident.suspected_owning_team or [])
+    if routes:
+        team_message = create_team_message(db_incident, incident_channel)
+        for channel_id, teams in routes.items():
+            if channel_id in plan:
+                logger.info("Channel %s of %s already gets the incident", channel_id, ", ".join(teams))
+                continue
+            plan[channel_id] = team_message
+    return plan
+
+
+async def broadcast_incident(incident: IncidentContext, results: dict):
+    """Post to the general outages channel and every suspected team's channel at once."""
+    plan = broadcast_plan(incident.db_incident, results["incident_channel"], incident.settings)
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+    async def post(channel_id: str, message: str):
+        async with semaphore:
+            await post_message_to_slack(incident.slack, channel_id, message)
+
+    outcomes = await asyncio.gather(
+        *(post(channel_id, message) for channel_id, message in plan.items()),
+        return_exceptions=True,
+    )
+    failed = {
+        channel_id: outcome for channel_id, outcome in zip(plan, outcomes) if isinstance(outcome, BaseException)
+    }
+    for channel_id, error in failed.items():
+        logger.error("Could not announce incident %s in %s: %s", incident.db_incident.so_number, channel_id, error)
+    if failed:
+        raise RuntimeError(f"Broadcast failed for channels {', '.join(failed)}")
+    logger.info("Announced incident %s in %s channels", incident.db_incident.so_number, len(plan))
+    return list(plan)
+
+
+# Side effects of a new incident, most time-critical first. All but the channel
+# messages only need the saved incident, so they are queued together with it.
+INCIDENT_STEPS = [
+    IncidentStep("opsgenie", page_opsgenie, timeout=OPSGENIE_STAGE_TIMEOUT),
+    IncidentStep("statuspage", create_statuspage, timeout=STATUSPAGE_STAGE_TIMEOUT, when=lambda incident: incident.statuspage_notification, on_error=mark_statuspage_failed),
+    # Slack trigger_ids expire after 3 seconds, a retry could only fail
+    IncidentStep("success_modal", open_success_modal, timeout=SLACK_STAGE_TIMEOUT, max_attempts=1),
+    IncidentStep("incident_channel", set_up_incident_channel, timeout=CHANNEL_STAGE_TIMEOUT),
+    IncidentStep("broadcast", broadcast_incident, after=["incident_channel"], timeout=BROADCAST_STAGE_TIMEOUT),
+]
+
+
+def steps_after(name: str, db_incident: models.Incident) -> list:
+    """Steps that can start once `name` has succeeded, or the first steps when name is None."""
+    return [
+        step for step in INCIDENT_STEPS
+        if (name in step.after if name is not None else not step.after)
+        and (step.when is None or step.when(db_incident))
+    ]
+
+def create_incident_message(db_incident, settings):
+    return (
+        f"\U0001F6A8 *New Incident Created* \U0001F6A8\n\n"
+        f"*Incident Summary:*\n"
+        f"----------------------------------\n"
+        f"*SO Number:* {db_incident.so_number}\n"
+        f"*Severity Level:* {', '.join(db_incident.severity)}\n"
+        f"*Affected Products:* {', '.join(db_incident.affected_products)}\n"
+        f"*Customer Impact:* {'Yes' if db_incident.p1_customer_affected else 'No'}\n"
+        f"*Suspected Owning Team:* {', '.join(db_incident.suspected_owning_team)}\n"
+        f"\n"
+        f"*Time Details:*\n"
+        f"----------------------------------\n"
+        f"Start Time: {db_incident.start_time}\n"
+        f"\n"
+        f"*Additional Information:*\n"
+        f"----------------------------------\n"
+        f"🔗 *Jira Link:* [View Incident in Jira]({settings.jira_server}/browse/{db_incident.jira_issue_key})"
+    )
+
+def create_general_outages_message(db_incident, channel_id):
+    return (
+        f"\U0001F6A8 *New Incident Created* \U0001F6A8\n\n"
+        f"Incident Summary\n"
+        f"------------------------\n"
+        f"SO Number: {db_incident.so_number}\n"
+        f"Severity: {', '.join(db_incident.severity)}\n"
+        f"Affected Products: {', '.join(db_incident.affected_products)}\n"
+        f"Customer Impact: {'Yes' if db_incident.p1_customer_affected else 'No'}\n"
+        f"Suspected Owning Team: {', '.join(db_incident.suspected_owning_team)}\n\n"
+        f"*Time Details:*\n"
+        f"------------------------\n"
+        f"Start Time: {db_incident.start_time}\n"
+        f"*Additional Information:*\n"
+        f"----------------------------------\n"
+        f"Join the discussion in the newly created incident channel: <#{channel_id}>"
+    )
+
+def create_team_message(db_incident, channel_id):
+    return (
+        f"\U0001F6A8 *New Incident Created* \U0001F6A8\n\n"
+        f"Incident Summary\n"
+        f"------------------------\n"
+        f"SO Number: {db_incident.so_number}\n"
+        f"Severity: {', '.join(db_incident.severity)}\n"
+        f"Affected Products: {', '.join(db_incident.affected_products)}\n"
+        f"Customer Impact: {'Yes' if db_incident.p1_customer_affected else 'No'}\n"
+        f"Suspected Owning Team: {', '.join(db_incident.suspected_owning_team)}\n\n"
+        f"*Time Details:*\n"
+        f"------------------------\n"
+        f"Start Time: {db_incident.start_time}\n"
+        f"*Additional Information:*\n"
+        f"----------------------------------\n"
+        f"Join the discussion in the newly created incident channel: <#{channel_id}>"
+    )
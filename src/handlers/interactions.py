@@ -0,0 +1,193 @@
+import logging
+import httpx
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from slack_sdk.errors import SlackApiError
+from src.handlers.incident_creation import extract_incident_data
+from src.handlers.registry import HandlerContext, SlackResponse, registry
+from src.helperFunctions.incident_cache import find_incident_by_so_number
+from src.helperFunctions.status_page import INCIDENT_STATUSES
+from src.outbox import enqueue_job_async, process_outbox
+
+
+logger = logging.getLogger(__name__)
+
+
+@registry.view_submission("incident_form", requires=("db",))
+async def incident_form_submission(ctx: HandlerContext) -> SlackResponse:
+    try:
+        state_values = ctx.request.state_values
+        logger.debug("State values: %s", state_values)
+        
+        incident_data = extract_incident_data(state_values)
+        
+        #Queueing the incident creation durably before answering slack, an outbox worker creates it
+        job = await enqueue_job_async(ctx.db, "incident.create", {
+            "incident_data": incident_data,
+            "trigger_id": ctx.request.trigger_id,
+            "user_id": ctx.request.user_id,
+            #Same for every attempt of this job, so retries never open a second Jira ticket
+            "idempotency_key": ctx.request.digest,
+        })
+        return SlackResponse({"response_action": "clear"}).add_background(process_outbox, job.id)
+    except ValidationError as e:
+        return SlackResponse({
+            "response_action": "errors",
+            "errors": {"incident_form": str(e)}
+        })
+    except Exception as e:
+        logger.error("Error in form processing: %s", str(e), exc_info=True)
+        return SlackResponse({
+            "response_action": "errors",
+            "errors": {"incident_form": str(e)}
+        })
+
+
+#Handling the fetching of incident from the SLACK form
+@registry.view_submission("so_lookup_form", requires=("db", "slack"))
+async def so_lookup_submission(ctx: HandlerContext) -> SlackResponse:
+    settings = ctx.settings
+    user_id = ctx.request.user_id
+    try:
+        state_values = ctx.request.state_values
+        so_number = state_values.get("so_number")
+        if not so_number:
+            logging.error("Missing 'so_number_block' in the Slack payload.")
+            raise HTTPException(status_code=400, detail="SO Number block missing in form submission.")
+
+        so_number_action = so_number.get("so_number_action")
+        if not so_number_action:
+            logging.error("Missing 'so_number_action' in the Slack payload.")
+            raise HTTPException(status_code=400, detail="SO Number action missing in form submission.")
+
+        # Now, safely getting  the 'value' here
+        so_number = so_number_action.get("value")
+        if not so_number:
+            logging.error("SO Number is missing in the Slack form submission.")
+            raise HTTPException(
+                status_code=400, detail="SO Number is required but missing from the form submission."
+            )
+
+            
+        #fetching the incident, from the lookup cache when it was looked up recently
+        db_incident = await find_incident_by_so_number(ctx.db, so_number)
+        
+        if not db_incident:
+            return SlackResponse({
+                "response_action": "update",
+                "view": {
+                    "type": "modal",
+                    "title": {"type": "plain_text", "text": "SO Lookup"},
+                    "close": {"type": "plain_text", "text": "Close"},
+                    "blocks": [
+                        {
+                            "type": "section",
+                            "text": {
+                                "type": "mrkdwn",
+                                "text": f"No incident found for SO Number: *{so_number}*."
+                            }
+                        }
+                    ]
+                }
+            })
+        
+        #Constructing jira URL by using the incident's jira issue key
+        jira_issue_key = db_incident.jira_issue_key
+        if not jira_issue_key:
+            raise HTTPException(status_code=400, detail="Jira issue key is missing in the database.")
+        
+        jira_link = f"{settings.jira_server}/browse/{jira_issue_key}"
+
+    
+        #Sending the message to the user
+        incident_message = (
+            f"🚨 *Incident Details* 🚨:\n\n"
+            f"*SO Number:* {db_incident.so_number}\n"
+            f"*Severity:* {', '.join(db_incident.severity) if db_incident.severity else 'None'}\n"
+            f"*Affected Products:* {', '.join(db_incident.affected_products)}\n"
+            f"*Suspected Owning Team:* {', '.join(db_incident.suspected_owning_team)}\n"
+            f"*Start Time:* {db_incident.start_time}\n"
+            f"*End Time:* {db_incident.end_time}\n"
+            f"*Customer Affected:* {'Yes' if db_incident.p1_customer_affected else 'No'}\n"
+            f"*Description:* {db_incident.description}\n"
+            f"*Jira Link:* {jira_link}\n"
+        )
+        
+        try:
+            await ctx.slack.api_call("chat.postMessage", channel=user_id, text=incident_message, as_user=True)
+        except SlackApiError as e:
+            logger.error("Error sending Slack message: %s", e.response.data)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An unexpected error occurred: {e.response['error']}",
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error sending Slack message: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An unexpected error occurred",
+            )
+    
+        return SlackResponse({"response_action": "clear"})
+    
+
+    except KeyError as e:
+        logger.error("Error retrieving state values: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="State values not found in the view payload",
+        )
+
+
+#Handling the updating of incident in the statuspage
+@registry.view_submission("statuspage_update", requires=("db",))
+async def statuspage_update_submission(ctx: HandlerContext) -> SlackResponse:
+    state_values = ctx.request.state_values
+    #Extracting values from the slack payload
+    so_number = state_values.get("so_number", {}).get("so_number_action", {}).get("value")
+    if not so_number:
+        logging.error("Missing 'SO_number_block' in the Slack payload.")
+        raise HTTPException(status_code=400, detail="SO Number is required.")
+    new_status = state_values.get("status_update_block", {}).get("status_action", {}).get("selected_option", {}).get("value")
+    additional_info = state_values.get("additional_info_block", {}).get("additional_info_action", {}).get("value", "")
+    
+    #Introducing the validations section, an invalid status is reported on the form instead of failing in the outbox
+    if not new_status or new_status.lower() not in INCIDENT_STATUSES:
+        return SlackResponse({
+            "response_action": "errors",
+            "errors": {"status_update_block": f"Choose one of: {', '.join(INCIDENT_STATUSES)}"}
+        })
+    
+    #Fetching the incident, from the lookup cache when it was looked up recently
+    db_incident = await find_incident_by_so_number(ctx.db, so_number)
+    if not db_incident:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No incident found with SO Number: {so_number}"
+        )
+    
+    job = await enqueue_job_async(ctx.db, "incident.status", {
+        "incident_id": db_incident.id,
+        "new_status": new_status,
+        "additional_info": additional_info,
+        "user_id": ctx.request.user_id,
+    })
+
+    # Return an immediate response to the Slack user, the status and Statuspage are updated by an outbox worker
+    return SlackResponse({
+        "response_type": "ephemeral",
+        "view": {
+            "type": "modal",
+            "title": {"type": "plain_text", "text": "Status Update"},
+            "close": {"type": "plain_text", "text": "Close"},
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"Status of SO Number: *{so_number}* is being updated to *{new_status}*."
+                    }
+                }
+            ]
+        }
+    }).add_background(process_outbox, job.id)
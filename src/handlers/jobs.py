@@ -0,0 +1,176 @@
+import logging
+import time
+from datetime import datetime
+from sqlalchemy.orm import Session
+from config import get_settings
+from src import models
+from src.handlers.incident_creation import (
+    INCIDENT_STEPS,
+    IncidentContext,
+    IncidentStep,
+    create_incident_record,
+    report_creation_failure,
+    steps_after,
+)
+from src.helperFunctions.incident_events import CREATED, STEP_FAILED, STEP_SUCCEEDED, record_event, set_incident_status
+from src.helperFunctions.incident_stats import count_created
+from src.helperFunctions.metrics import record_latency
+from src.helperFunctions.slack_client import get_slack_client
+from src.helperFunctions.status_page import INCIDENT_STATUSES, update_statuspage_incident_status
+from src.outbox import PermanentJobError, enqueue_job, job, run_sync
+from src.outbox.queue import current_job
+
+
+logger = logging.getLogger(__name__)
+
+# Job runners leave committing to the worker, which marks the job done in the same
+# transaction, so a job and the follow-up jobs it enqueues are recorded atomically.
+# Their database calls go through run_sync, off the event loop the API answers Slack on.
+
+
+def enqueue_incident_steps(db: Session, steps: list, payload: dict):
+    for step in steps:
+        enqueue_job(db, f"incident.{step.name}", payload, commit=False)
+
+
+async def _report_creation_failure(payload: dict, error: BaseException, db: Session):
+    await report_creation_failure(get_slack_client(), payload["trigger_id"])
+
+
+def record_step_error(source: str, then=None):
+    """on_error hook adding a failed attempt to the incident's timeline, then calling `then(db, db_incident, error)`."""
+
+    async def on_error(payload: dict, error: BaseException, db: Session):
+        claimed = current_job.get()
+        record_event(db, payload["incident_id"], STEP_FAILED, source, details={
+            "error": f"{type(error).__name__}: {error}",
+            "attempt": claimed.attempts if claimed is not None else None,
+        })
+        if then is not None:
+            db_incident = await run_sync(db, db.get, models.Incident, payload["incident_id"])
+            if db_incident is not None:
+                await run_sync(db, then, db, db_incident, error)
+
+    return on_error
+
+
+@job("incident.create", timeout=60, max_attempts=3, on_failure=_report_creation_failure)
+async def create_incident(payload: dict, db: Session):
+    claimed = current_job.get()
+    db_incident = await create_incident_record(
+        dict(payload["incident_data"]),
+        db,
+        idempotency_key=payload.get("idempotency_key"),
+        retrying=claimed is not None and claimed.attempts > 1,
+    )
+
+    def record_creation():
+        record_event(db, db_incident.id, CREATED, "slack", actor=payload.get("user_id"), to_status=db_incident.status)
+        count_created(db, db_incident)
+        enqueue_incident_steps(db, steps_after(None, db_incident), {
+            "incident_id": db_incident.id,
+            "trigger_id": payload["trigger_id"],
+            "results": {},
+            #Stages are timed from here, see log_stage_timing
+            "saved_at": datetime.now().isoformat(),
+        })
+
+    await run_sync(db, record_creation)
+    return {"incident_id": db_incident.id, "so_number": db_incident.so_number}
+
+
+def log_stage_timing(step: IncidentStep, db_incident: models.Incident, payload: dict, seconds: float) -> dict:
+    """Log how long a stage of a new incident ran and how long after the incident was saved it finished.
+
+    The difference is the time the stage's job waited for a worker and for the
+    stages before it.
+    """
+    timing = {"seconds": round(seconds, 3)}
+    record_latency(f"incident.stage.{step.name}", seconds)
+    if payload.get("saved_at"):
+        since_saved = (datetime.now() - datetime.fromisoformat(payload["saved_at"])).total_seconds()
+        timing["since_saved"] = round(since_saved, 3)
+        record_latency(f"incident.stage.{step.name}.since_saved", since_saved)
+    logger.info(
+        "Incident %s stage %s ran %.2fs, done %ss after the incident was saved",
+        db_incident.so_number, step.name, seconds, timing.get("since_saved", "?"),
+    )
+    return timing
+
+
+def register_incident_step(step: IncidentStep):
+    async def run_step(payload: dict, db: Session):
+        started = time.monotonic()
+        db_incident = await run_sync(db, db.get, models.Incident, payload["incident_id"])
+        if db_incident is None:
+            raise PermanentJobError(f"Incident {payload['incident_id']} does not exist")
+        incident = IncidentContext(db_incident, payload["trigger_id"], get_settings(), db, get_slack_client())
+        result = await step.func(incident, payload["results"])
+        claimed = current_job.get()
+        #The timings of all stages of an incident end up on its timeline
+        record_event(db, db_incident.id, STEP_SUCCEEDED, step.name, details={
+            "result": result,
+            "attempt": claimed.attempts if claimed is not None else None,
+            "timing": log_stage_timing(step, db_incident, payload, time.monotonic() - started),
+        })
+
+        dependents = steps_after(step.name, db_incident)
+        if dependents:
+            enqueue_incident_steps(db, dependents, {
+                **payload,
+                "results": {**payload["results"], step.name: result},
+            })
+        return result
+
+    run_step.__name__ = f"run_{step.name}"
+    job(
+        f"incident.{step.name}",
+        timeout=step.timeout,
+        max_attempts=step.max_attempts,
+        on_error=record_step_error(step.name, step.on_error),
+    )(run_step)
+
+
+for incident_step in INCIDENT_STEPS:
+    register_incident_step(incident_step)
+
+
+@job("incident.status", timeout=30, on_error=record_step_error("status_update"))
+async def update_incident_status(payload: dict, db: Session):
+    """Move the incident to the new status and record it, then have Statuspage follow when it has an incident there."""
+    new_status = (payload.get("new_status") or "").lower()
+    if new_status not in INCIDENT_STATUSES:
+        raise PermanentJobError(f"Invalid status {payload.get('new_status')}, must be one of: {', '.join(INCIDENT_STATUSES)}")
+
+    def apply() -> models.Incident:
+        db_incident = db.get(models.Incident, payload["incident_id"])
+        if db_incident is None:
+            raise PermanentJobError(f"Incident {payload['incident_id']} does not exist")
+        set_incident_status(
+            db, db_incident, new_status, "slack",
+            actor=payload.get("user_id"),
+            details={"additional_info": payload.get("additional_info", "")},
+        )
+        #Incidents created without a Statuspage notification have nothing there to update
+        if db_incident.statuspage_incident_id:
+            enqueue_job(db, "statuspage.update", payload, commit=False)
+        return db_incident
+
+    db_incident = await run_sync(db, apply)
+    return {"status": new_status, "statuspage": bool(db_incident.statuspage_incident_id)}
+
+
+@job("statuspage.update", timeout=60, on_error=record_step_error("statuspage_update"))
+async def update_statuspage(payload: dict, db: Session):
+    db_incident = await run_sync(db, db.get, models.Incident, payload["incident_id"])
+    if db_incident is None:
+        raise PermanentJobError(f"Incident {payload['incident_id']} does not exist")
+    if not db_incident.statuspage_incident_id:
+        logger.info("Incident %s has no Statuspage incident, nothing to update", db_incident.so_number)
+        return None
+    return await update_statuspage_incident_status(
+        db_incident=db_incident,
+        new_status=payload["new_status"],
+        additional_info=payload.get("additional_info", ""),
+        settings=get_settings(),
+    )
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from typing import Optional
+from urllib.parse import parse_qs
+from fastapi import HTTPException
+
+
+class SlackPayload:
+    """A verified Slack request body, decoded once and shared by everything that handles it.
+
+    `raw` is the body as received (None when a caller built the payload from an
+    already-parsed dict) and `data` the decoded fields.
+    """
+
+    kind = ""
+    __slots__ = ("raw", "data", "_digest")
+
+    def __init__(self, data: dict, raw: Optional[bytes] = None):
+        self.raw = raw
+        self.data = data
+        self._digest = None
+
+    @property
+    def digest(self) -> str:
+        """sha256 of the body, identical for every redelivery of the same request."""
+        if self._digest is None:
+            body = self.raw
+            if body is None:
+                body = json.dumps(self.data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+            self._digest = hashlib.sha256(body).hexdigest()
+        return self._digest
+
+    @property
+    def token(self) -> Optional[str]:
+        return self.data.get("token")
+
+    @property
+    def trigger_id(self) -> Optional[str]:
+        return self.data.get("trigger_id")
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+
+class SlashCommand(SlackPayload):
+    kind = "command"
+    __slots__ = ()
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "SlashCommand":
+        try:
+            form = parse_qs(body.decode("utf-8"))
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Failed to parse form data: {str(e)}") from e
+        return cls({key: values[0] for key, values in form.items()}, raw=body)
+
+    @property
+    def command(self) -> Optional[str]:
+        return self.data.get("command")
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.data.get("user_id")
+
+    @property
+    def response_url(self) -> Optional[str]:
+        return self.data.get("response_url")
+
+
+class Interaction(SlackPayload):
+    __slots__ = ()
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "Interaction":
+        try:
+            payload_str = parse_qs(body.decode("utf-8")).get("payload", [None])[0]
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Failed to parse request body: {str(e)}") from e
+        if not payload_str:
+            raise HTTPException(status_code=400, detail="Missing payload")
+        try:
+            payload = json.loads(payload_str)
+        except json.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=400, detail=f"Failed to parse request body: {str(e)}"
+            ) from e
+        return cls(payload, raw=body)
+
+    @property
+    def kind(self) -> Optional[str]:
+        return self.data.get("type")
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.data.get("user", {}).get("id")
+
+    @property
+    def view(self) -> dict:
+        return self.data.get("view", {})
+
+    @property
+    def callback_id(self) -> Optional[str]:
+        return self.view.get("callback_id")
+
+    @property
+    def state_values(self) -> dict:
+        return self.view.get("state", {}).get("values", {})
@@ -0,0 +1,137 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class SlackResponse:
+    """Transport-neutral result of a Slack handler.
+
+    The FastAPI router turns it into a JSONResponse (running `background` as
+    BackgroundTasks) and the Lambda handlers into an API Gateway dict.
+    """
+
+    def __init__(self, content: Any = None, status_code: int = 200):
+        self.content = content
+        self.status_code = status_code
+        self.background = []
+
+    def add_background(self, func: Callable, *args, **kwargs):
+        self.background.append((func, args, kwargs))
+        return self
+
+
+class HandlerContext:
+    """Everything a handler gets: the parsed request, settings and its dependencies.
+
+    `request` is the SlackPayload decoded by the entry point and `payload` its
+    fields. Dependencies ("db", "slack", "cache") are created lazily from
+    `providers` the first time a handler asks for them. aclose() releases the
+    database session.
+    """
+
+    def __init__(self, request, settings, providers: Dict[str, Callable[[], Any]], budget=None):
+        self.request = request
+        self.payload = request.data
+        self.settings = settings
+        self.budget = budget
+        self._providers = providers
+        self._resolved: Dict[str, Any] = {}
+
+    @property
+    def available(self) -> frozenset:
+        return frozenset(self._providers)
+
+    def dependency(self, name: str):
+        if name not in self._resolved:
+            self._resolved[name] = self._providers[name]()
+        return self._resolved[name]
+
+    def new_dependency(self, name: str):
+        """A fresh instance for work that outlives the request, closed by the caller."""
+        return self._providers[name]()
+
+    @property
+    def db(self):
+        return self.dependency("db")
+
+    @property
+    def slack(self):
+        return self.dependency("slack")
+
+    @property
+    def cache(self):
+        return self.dependency("cache")
+
+    async def aclose(self):
+        db = self._resolved.pop("db", None)
+        if db is not None:
+            await db.close()
+
+
+class RegisteredHandler:
+    __slots__ = ("func", "requires", "name")
+
+    def __init__(self, func: Callable, requires: Iterable[str]):
+        self.func = func
+        self.requires = frozenset(requires)
+        self.name = func.__name__
+
+
+class HandlerRegistry:
+    """Maps (kind, key) to a handler.
+
+    kind is "command" for slash commands or the interaction type for interactive
+    payloads ("view_submission", "block_actions", ...). key is the command name or
+    the view callback_id; handlers registered with key None catch every key of
+    their kind.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Tuple[str, Optional[str]], RegisteredHandler] = {}
+
+    def register(self, kind: str, key: Optional[str] = None, requires: Iterable[str] = ()):
+        def decorator(func):
+            handler_key = (kind, key)
+            if handler_key in self._handlers:
+                raise ValueError(f"A handler is already registered for {handler_key}")
+            self._handlers[handler_key] = RegisteredHandler(func, requires)
+            return func
+
+        return decorator
+
+    def command(self, name: str, requires: Iterable[str] = ()):
+        return self.register("command", name, requires)
+
+    def view_submission(self, callback_id: str, requires: Iterable[str] = ()):
+        return self.register("view_submission", callback_id, requires)
+
+    def interaction(self, interaction_type: str, requires: Iterable[str] = ()):
+        return self.register(interaction_type, None, requires)
+
+    def resolve(self, kind: str, key: Optional[str]) -> Optional[RegisteredHandler]:
+        handler = self._handlers.get((kind, key))
+        if handler is None and key is not None:
+            handler = self._handlers.get((kind, None))
+        return handler
+
+    def keys(self):
+        return list(self._handlers)
+
+    async def dispatch(self, kind: str, key: Optional[str], ctx: HandlerContext) -> Optional[SlackResponse]:
+        handler = self.resolve(kind, key)
+        if handler is None:
+            logger.info("No handler registered for %s %s", kind, key)
+            return None
+
+        missing = handler.requires - ctx.available
+        if missing:
+            raise RuntimeError(
+                f"Handler {handler.name} needs dependencies that were not provided: {sorted(missing)}"
+            )
+        logger.debug("Dispatching %s %s to %s", kind, key, handler.name)
+        return await handler.func(ctx)
+
+
+registry = HandlerRegistry()
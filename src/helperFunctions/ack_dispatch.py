@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+# Tasks that outlive the request which started them
+_tracked_tasks: Set[asyncio.Task] = set()
+
+
+class DeadlineBudget:
+    """Time left before Slack gives up on the current request."""
+
+    def __init__(self, seconds: float):
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+def _on_task_done(task: asyncio.Task):
+    _tracked_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            "Tracked task %s failed: %s", task.get_name(), task.exception()
+        )
+
+
+def spawn_tracked(coro: Awaitable, name: str) -> asyncio.Task:
+    """Run a coroutine in the background, keeping a reference until it finishes."""
+    task = asyncio.ensure_future(coro)
+    task.set_name(name)
+    _tracked_tasks.add(task)
+    task.add_done_callback(_on_task_done)
+    return task
+
+
+async def drain_tracked_tasks(timeout: float = 5.0):
+    """Give in-flight background work a chance to finish on shutdown."""
+    if not _tracked_tasks:
+        return
+    done, pending = await asyncio.wait(set(_tracked_tasks), timeout=timeout)
+    for task in pending:
+        logger.warning("Cancelling tracked task %s on shutdown", task.get_name())
+        task.cancel()
+
+
+async def run_within_budget(
+    coro: Awaitable,
+    budget: DeadlineBudget,
+    name: str,
+    min_inline_seconds: float = 0.0,
+    on_late_failure: Optional[Callable[[BaseException], Awaitable]] = None,
+) -> bool:
+    """Run `coro` inline while the budget allows, otherwise let it finish in the background.
+
+    Returns True when the work completed before the budget ran out. Errors raised
+    inline propagate to the caller; errors raised after the caller has already
+    acknowledged Slack are handed to `on_late_failure`.
+    """
+
+    acked = False
+
+    async def guarded():
+        try:
+            return await coro
+        except Exception as e:
+            if acked and on_late_failure is not None:
+                await on_late_failure(e)
+            raise
+
+    task = spawn_tracked(guarded(), name)
+    remaining = budget.remaining()
+    if remaining <= min_inline_seconds:
+        logger.info("Budget exhausted before %s, deferring to background", name)
+        acked = True
+        return False
+
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=remaining)
+        return True
+    except asyncio.TimeoutError:
+        acked = True
+        logger.warning(
+            "%s did not finish within the ack budget (%.3fs), continuing in background",
+            name,
+            budget.elapsed(),
+        )
+        return False
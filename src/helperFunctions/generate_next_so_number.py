@@ -1,15 +1,77 @@
+import threading
+from collections import deque
+from typing import Deque, Optional
+from sqlalchemy import Sequence, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from src.models import Incident
-from src.database import get_db
-
-
-def generate_next_so_number(db:Session) -> str:
-    latest_incident = db.query(Incident).order_by(Incident.id.desc()).first()
-    if latest_incident and latest_incident.so_number:
-        latest_number = int(latest_incident.so_number.split('-')[1])
-        next_number = latest_number + 1
-    else:
-        next_number = 1
-        
-    return f"SO-{next_number:04d}"
+from config import get_settings
+from src.database import SessionLocal
+from src.models import so_number_seq
+
+
+class SONumberAllocator:
+    """Hands out SO numbers from the so_number_seq Postgres sequence.
+
+    nextval is atomic across connections, so no two workers or nodes ever get the
+    same number. With block_size > 1 each round trip reserves that many numbers
+    for this process; numbers of a block that is never used are skipped, not reused.
+    """
+
+    def __init__(self, sequence: Sequence = so_number_seq, block_size: int = 1, session_factory=SessionLocal):
+        self.sequence = sequence
+        self.block_size = max(1, block_size)
+        self._session_factory = session_factory
+        self._reserved: Deque[int] = deque()
+        self._lock = threading.Lock()
+
+    def _reserve_statement(self):
+        if self.block_size == 1:
+            return select(self.sequence.next_value())
+        return select(self.sequence.next_value()).select_from(func.generate_series(1, self.block_size))
+
+    def _reserve(self, db: Session) -> Deque[int]:
+        return deque(sorted(db.execute(self._reserve_statement()).scalars().all()))
+
+    async def _reserve_async(self, db: AsyncSession) -> Deque[int]:
+        return deque(sorted((await db.execute(self._reserve_statement())).scalars().all()))
+
+    def allocate_number(self, db: Optional[Session] = None) -> int:
+        with self._lock:
+            if not self._reserved:
+                if db is not None:
+                    self._reserved = self._reserve(db)
+                else:
+                    with self._session_factory() as own_db:
+                        self._reserved = self._reserve(own_db)
+            return self._reserved.popleft()
+
+    async def allocate_number_async(self, db: AsyncSession) -> int:
+        # The lock is not held across the await; a block reserved meanwhile by another caller is kept too
+        with self._lock:
+            if self._reserved:
+                return self._reserved.popleft()
+        numbers = await self._reserve_async(db)
+        with self._lock:
+            self._reserved.extend(numbers)
+            self._reserved = deque(sorted(self._reserved))
+            return self._reserved.popleft()
+
+    def allocate(self, db: Optional[Session] = None) -> str:
+        return f"SO-{self.allocate_number(db):04d}"
+
+    async def allocate_async(self, db: AsyncSession) -> str:
+        return f"SO-{await self.allocate_number_async(db):04d}"
+
+
+so_number_allocator = SONumberAllocator(block_size=get_settings().SO_NUMBER_BLOCK_SIZE)
+
+
+async def generate_next_so_number(db: AsyncSession) -> str:
+    """The SO number prefilled in the /create-incident form.
+
+    Only a placeholder: the incident is stored under its Jira ticket key, and a
+    form that is closed without submitting still uses up its number, so later
+    suggestions run ahead of the Jira keys.
+    """
+    return await so_number_allocator.allocate_async(db)
+
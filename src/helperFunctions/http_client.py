@@ -0,0 +1,74 @@
+import importlib.util
+import logging
+from typing import Dict
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-integration timeouts, a single request can still override them with timeout=...
+INTEGRATION_TIMEOUTS: Dict[str, httpx.Timeout] = {
+    "slack": httpx.Timeout(3.0, connect=2.0),
+    "jira": httpx.Timeout(30.0, connect=5.0),
+    "opsgenie": httpx.Timeout(10.0, connect=3.0),
+    "statuspage": httpx.Timeout(10.0, connect=3.0),
+}
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Keep-alive pool limits for each integration client
+POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+class HttpTransport:
+    """App-scoped pool of httpx clients, one per outbound integration.
+
+    Every client keeps its own keep-alive connections per host, so repeated calls
+    to Slack, Jira, OpsGenie and Statuspage reuse the TLS session instead of
+    opening a new connection each time.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def client(self, integration: str) -> httpx.AsyncClient:
+        client = self._clients.get(integration)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=INTEGRATION_TIMEOUTS.get(integration, DEFAULT_TIMEOUT),
+                limits=POOL_LIMITS,
+            )
+            self._clients[integration] = client
+            logger.info(
+                "Opened %s HTTP client (http2=%s)", integration, HTTP2_AVAILABLE
+            )
+        return client
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for integration, client in clients.items():
+            await client.aclose()
+            logger.info("Closed %s HTTP client", integration)
+
+
+http_transport = HttpTransport()
+
+
+def get_http_client(integration: str) -> httpx.AsyncClient:
+    return http_transport.client(integration)
+
+
+async def start_http_transport():
+    for integration in INTEGRATION_TIMEOUTS:
+        http_transport.client(integration)
+
+
+async def close_http_transport():
+    await http_transport.aclose()
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config import get_settings
+from src.models import INCIDENT_DATA_COLUMNS, Incident
+
+
+logger = logging.getLogger(__name__)
+
+# Typed as a bare number, e.g. "42" for SO-0042
+DIGITS_ONLY = re.compile(r"^\d+$")
+
+# session.info key under which the SO numbers a session has written wait for its commit
+PENDING_INVALIDATIONS = "incident_cache_invalidations"
+
+
+def normalize_so_number(so_number: str) -> str:
+    """Cache and lookup key of a typed SO number: trimmed, upper case, "SO-" added to a bare number."""
+    key = " ".join(so_number.split()).upper()
+    if DIGITS_ONLY.match(key):
+        key = f"SO-{int(key):04d}"
+    return key
+
+
+class CachedIncident:
+    """Column values of an incident, safe to use after its session is gone."""
+
+    __slots__ = tuple(column.key for column in INCIDENT_DATA_COLUMNS)
+
+    def __init__(self, row: Incident):
+        for name in self.__slots__:
+            value = getattr(row, name)
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+
+class IncidentLookupCache:
+    """Read-through cache of incidents by normalized SO number.
+
+    Found incidents are kept for `ttl` seconds and SO numbers that matched
+    nothing for `negative_ttl`, both in a LRU of `max_entries`. Entries are
+    dropped as soon as a session that wrote the incident commits, see
+    `track_incident_writes`; the TTLs only bound staleness from writers in
+    other processes. Concurrent misses on one key share a single query.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, negative_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Optional[CachedIncident]]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        # Bumped on every invalidation, so a query that raced one does not store what it read
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def _cached(self, key: str) -> Tuple[bool, Optional[CachedIncident]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, incident = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            if incident is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, incident
+
+    def _store(self, key: str, incident: Optional[CachedIncident], generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            ttl = self.ttl if incident is not None else self.negative_ttl
+            self._entries[key] = (time.monotonic() + ttl, incident)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _load(self, db: AsyncSession, key: str) -> Optional[CachedIncident]:
+        row = (await db.execute(
+            select(Incident)
+            .where(func.upper(Incident.so_number) == key)
+            .order_by(Incident.id)
+            .limit(1)
+        )).scalars().first()
+        return CachedIncident(row) if row is not None else None
+
+    async def get(self, db: AsyncSession, so_number: str) -> Optional[CachedIncident]:
+        """The incident with this SO number, ignoring case, or None when there is none."""
+        key = normalize_so_number(so_number)
+        hit, incident = self._cached(key)
+        if hit:
+            return incident
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+        loading = self._loading[key] = asyncio.get_running_loop().create_future()
+        try:
+            incident = await self._load(db, key)
+        except Exception as e:
+            loading.set_exception(e)
+            # Waiters get the error; nobody else needs to retrieve it
+            loading.exception()
+            raise
+        except BaseException:
+            loading.cancel()
+            raise
+        else:
+            self._store(key, incident, generation)
+            loading.set_result(incident)
+            return incident
+        finally:
+            self._loading.pop(key, None)
+
+    def invalidate(self, so_numbers: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            for so_number in so_numbers:
+                self._entries.pop(normalize_so_number(so_number), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+            }
+
+
+_settings = get_settings()
+incident_cache = IncidentLookupCache(
+    max_entries=_settings.INCIDENT_CACHE_SIZE,
+    ttl=_settings.INCIDENT_CACHE_TTL_SECONDS,
+    negative_ttl=_settings.INCIDENT_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+def _written_so_numbers(session: Session) -> set:
+    so_numbers = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, Incident):
+            continue
+        history = inspect(obj).attrs.so_number.history
+        # The old number as well, in case the incident was renumbered
+        for so_number in (*history.added, *history.unchanged, *history.deleted):
+            if so_number:
+                so_numbers.add(so_number)
+    return so_numbers
+
+
+def track_incident_writes(session_class=Session, cache: IncidentLookupCache = incident_cache):
+    """Invalidate `cache` entries of every incident a session of `session_class` writes, once it commits.
+
+    Covers AsyncSession too, which commits through a sync Session underneath.
+    """
+
+    @event.listens_for(session_class, "after_flush")
+    def collect(session, flush_context):
+        so_numbers = _written_so_numbers(session)
+        if so_numbers:
+            session.info.setdefault(PENDING_INVALIDATIONS, set()).update(so_numbers)
+
+    @event.listens_for(session_class, "after_commit")
+    def invalidate(session):
+        so_numbers = session.info.pop(PENDING_INVALIDATIONS, None)
+        if so_numbers:
+            cache.invalidate(so_numbers)
+
+    @event.listens_for(session_class, "after_rollback")
+    def discard(session):
+        session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+track_incident_writes()
+
+
+async def find_incident_by_so_number(db: AsyncSession, so_number: str) -> Optional[CachedIncident]:
+    return await incident_cache.get(db, so_number)
@@ -0,0 +1,145 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import Connection, func, select, text, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.helperFunctions.incident_queries import DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, encode_cursor
+from src.helperFunctions.incident_stats import RESOLVED, count_resolution, is_resolved
+from src.models import Incident, IncidentEvent
+
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+STATUS_CHANGED = "status_changed"
+STEP_SUCCEEDED = "step_succeeded"
+STEP_FAILED = "step_failed"
+
+# Monthly partitions kept ready ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+# Events of an incident are looked for from this long before it was created, for clock skew
+# between nodes; the bound lets Postgres skip the partitions of earlier months
+CLOCK_SKEW_MARGIN = timedelta(days=1)
+
+
+def record_event(
+    db: Session,
+    incident_id: int,
+    event_type: str,
+    source: str,
+    actor: Optional[str] = None,
+    from_status: Optional[str] = None,
+    to_status: Optional[str] = None,
+    details: Optional[dict] = None,
+) -> IncidentEvent:
+    """Add an event to the caller's transaction.
+
+    The events of one transaction are written by a single batched INSERT when it
+    flushes, and become visible together with the change they describe.
+    """
+    event = IncidentEvent(
+        incident_id=incident_id,
+        event_type=event_type,
+        source=source,
+        actor=actor,
+        from_status=from_status,
+        to_status=to_status,
+        details=details,
+        occurred_at=datetime.now(),
+    )
+    db.add(event)
+    return event
+
+
+def set_incident_status(db: Session, incident: Incident, new_status: str, source: str,
+                        actor: Optional[str] = None, details: Optional[dict] = None):
+    """Change the incident's status and record the transition; a no-op when it already has it.
+
+    Resolving or reopening the incident updates its daily statistics in the same transaction.
+    """
+    if incident.status == new_status:
+        return
+    event = record_event(db, incident.id, STATUS_CHANGED, source, actor, incident.status, new_status, details)
+    if is_resolved(new_status) and not is_resolved(incident.status):
+        count_resolution(db, incident, event.occurred_at)
+    elif is_resolved(incident.status) and not is_resolved(new_status):
+        count_resolution(db, incident, last_resolved_at(db, incident), undo=True)
+    incident.status = new_status
+
+
+def last_resolved_at(db: Session, incident: Incident) -> datetime:
+    """When the incident was last resolved; its end time when that was before the timeline was kept."""
+    resolved_at = db.execute(
+        select(IncidentEvent.occurred_at)
+        .where(
+            IncidentEvent.incident_id == incident.id,
+            IncidentEvent.occurred_at >= incident.created_at - CLOCK_SKEW_MARGIN,
+            func.lower(IncidentEvent.to_status) == RESOLVED,
+        )
+        .order_by(IncidentEvent.occurred_at.desc())
+        .limit(1)
+    ).scalar()
+    return resolved_at or incident.end_time
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"incident_events_{month:%Y_%m}"
+
+
+def ensure_event_partitions(conn: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Create the partitions of the current month and `months_ahead` following ones when missing.
+
+    Returns the partitions that could not be created, e.g. because rows for
+    that month already went to the default partition.
+    """
+    failed = []
+    month = month_start(today or date.today())
+    for _ in range(months_ahead + 1):
+        following = next_month(month)
+        name = partition_name(month)
+        try:
+            with conn.begin_nested():
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF incident_events "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+                ))
+        except SQLAlchemyError as e:
+            logger.warning("Could not create partition %s: %s", name, e)
+            failed.append(name)
+        month = following
+    return failed
+
+
+async def page_timeline(
+    db: AsyncSession,
+    incident_id: int,
+    created_at: datetime,
+    after: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> Tuple[List[IncidentEvent], Optional[str]]:
+    """One page of an incident's events, oldest first, and the cursor of the next page."""
+    limit = min(limit, MAX_LIMIT)
+    query = select(IncidentEvent).where(
+        IncidentEvent.incident_id == incident_id,
+        IncidentEvent.occurred_at >= created_at - CLOCK_SKEW_MARGIN,
+    )
+    if after is not None:
+        query = query.where(tuple_(IncidentEvent.occurred_at, IncidentEvent.id) > tuple_(*decode_cursor(after)))
+    events = list((await db.execute(
+        query.order_by(IncidentEvent.occurred_at, IncidentEvent.id).limit(limit + 1)
+    )).scalars().all())
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].occurred_at, events[-1].id)
+    return events, next_cursor
@@ -0,0 +1,192 @@
+import base64
+import binascii
+import logging
+import re
+import shlex
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import schemas, utils
+from src.database import AsyncSessionLocal
+from src.models import INCIDENT_DATA_COLUMNS, Incident
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Rows fetched per round trip from the server-side cursor of a streamed listing
+STREAM_BATCH_SIZE = 500
+
+# IncidentFilter field -> ARRAY column it matches, each backed by a GIN index
+ARRAY_FILTERS = {
+    "products": Incident.affected_products,
+    "teams": Incident.suspected_owning_team,
+    "components": Incident.suspected_affected_components,
+    "severities": Incident.severity,
+}
+# Key of each filter in options.json, for matching typed values case-insensitively
+OPTION_KEYS = {
+    "products": "affected_products",
+    "teams": "suspected_owning_team",
+    "components": "suspected_affected_components",
+    "severities": "severity",
+}
+# Words accepted by the Slack command, e.g. product:"Bet Management"
+COMMAND_FILTERS = {
+    "product": "products",
+    "team": "teams",
+    "component": "components",
+    "severity": "severities",
+}
+# since:30d style times, relative to now
+RELATIVE_TIME = re.compile(r"^(\d+)([hdw])$")
+RELATIVE_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def filter_conditions(filters: schemas.IncidentFilter) -> list:
+    """WHERE clauses of `filters`: && (any) or @> (all) on the array columns, a range on start_time."""
+    conditions = []
+    for name, column in ARRAY_FILTERS.items():
+        values = getattr(filters, name)
+        if values:
+            conditions.append(column.contains(values) if filters.match_all else column.overlap(values))
+    if filters.since is not None:
+        conditions.append(Incident.start_time >= filters.since)
+    if filters.until is not None:
+        conditions.append(Incident.start_time < filters.until)
+    return conditions
+
+
+def incident_query(filters: schemas.IncidentFilter, limit: int = DEFAULT_LIMIT) -> Select:
+    """Matching incidents, most recently started first."""
+    return (
+        select(Incident)
+        .where(*filter_conditions(filters))
+        .order_by(Incident.start_time.desc(), Incident.id.desc())
+        .limit(min(limit, MAX_LIMIT))
+    )
+
+
+async def find_incidents(db: AsyncSession, filters: schemas.IncidentFilter, limit: int = DEFAULT_LIMIT) -> List[Incident]:
+    return list((await db.execute(incident_query(filters, limit))).scalars().all())
+
+
+def encode_cursor(created_at: datetime, incident_id: int) -> str:
+    """Opaque position of a listing, just after the incident it was taken from."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{incident_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, incident_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(incident_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+def keyset_query(filters: schemas.IncidentFilter, after: Optional[str] = None, descending: bool = True) -> Select:
+    """Matching incidents' columns in (created_at, id) order, continuing after the `after` cursor.
+
+    Selects columns rather than entities, so a long listing keeps no ORM state.
+    """
+    position = tuple_(Incident.created_at, Incident.id)
+    query = select(*INCIDENT_DATA_COLUMNS).where(*filter_conditions(filters))
+    if after is not None:
+        last = tuple_(*decode_cursor(after))
+        query = query.where(position < last if descending else position > last)
+    if descending:
+        return query.order_by(Incident.created_at.desc(), Incident.id.desc())
+    return query.order_by(Incident.created_at, Incident.id)
+
+
+async def page_incidents(
+    db: AsyncSession,
+    filters: schemas.IncidentFilter,
+    after: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    descending: bool = True,
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of a keyset listing and the cursor of the next, None on the last page."""
+    limit = min(limit, MAX_LIMIT)
+    rows = (await db.execute(keyset_query(filters, after, descending).limit(limit + 1))).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [dict(row) for row in rows], next_cursor
+
+
+async def stream_incidents(
+    filters: schemas.IncidentFilter,
+    after: Optional[str] = None,
+    descending: bool = True,
+    session_factory=AsyncSessionLocal,
+) -> AsyncIterator[dict]:
+    """Every matching incident, read through a server-side cursor STREAM_BATCH_SIZE rows at a time.
+
+    Opens its own session, as a streamed response outlives the request's dependencies.
+    """
+    query = keyset_query(filters, after, descending).execution_options(yield_per=STREAM_BATCH_SIZE)
+    async with session_factory() as db:
+        result = await db.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
+
+
+def canonical_value(name: str, value: str) -> str:
+    """The options.json spelling of a typed filter value, or the value as typed when it is not an option."""
+    choices = (utils.options or {}).get(OPTION_KEYS[name], [])
+    for choice in choices:
+        if choice["value"].lower() == value.lower():
+            return choice["value"]
+    return value
+
+
+def parse_time(value: str, now: Optional[datetime] = None) -> datetime:
+    relative = RELATIVE_TIME.match(value)
+    if relative:
+        amount, unit = relative.groups()
+        return (now or datetime.now()) - timedelta(**{RELATIVE_UNITS[unit]: int(amount)})
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid time '{value}', use a date like 2024-07-01 or a period like 30d",
+        )
+
+
+def parse_filter_text(text: str) -> schemas.IncidentFilter:
+    """Filters of the /list-incidents command text.
+
+    e.g. `product:Sportsbook team:"Algo Trading team" severity:Major since:90d all`
+    """
+    try:
+        words = shlex.split(text or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {e}")
+
+    values = {name: [] for name in ARRAY_FILTERS}
+    since = until = None
+    match_all = False
+    for word in words:
+        key, _, value = word.partition(":")
+        key = key.lower()
+        if key == "all" and not value:
+            match_all = True
+        elif key in COMMAND_FILTERS and value:
+            name = COMMAND_FILTERS[key]
+            values[name].append(canonical_value(name, value))
+        elif key == "since" and value:
+            since = parse_time(value)
+        elif key == "until" and value:
+            until = parse_time(value)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown filter '{word}', use product:, team:, component:, severity:, since:, until: or all",
+            )
+    return schemas.IncidentFilter(**values, since=since, until=until, match_all=match_all)
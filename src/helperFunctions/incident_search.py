@@ -0,0 +1,64 @@
+import logging
+from typing import List, Optional
+from sqlalchemy import Select, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import schemas
+from src.helperFunctions.incident_queries import filter_conditions
+from src.models import Incident
+
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration, the same as in the search_vector column's expression
+SEARCH_CONFIG = "english"
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Snippets: up to two fragments of about 20 words around the matches
+HEADLINE_OPTIONS = 'MaxFragments=2, MaxWords=20, MinWords=5, FragmentDelimiter=" … "'
+
+
+def search_query(
+    text: str,
+    filters: Optional[schemas.IncidentFilter] = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    start_sel: str = "<mark>",
+    stop_sel: str = "</mark>",
+) -> Select:
+    """Incidents whose description or Statuspage message matches `text`, best match first.
+
+    `text` takes web search syntax: "quoted phrases", OR, and -excluded words.
+    The GIN index on search_vector finds and ranks the matches; snippets are
+    only built for the `limit` rows returned, in the outer query.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    rank = func.ts_rank_cd(Incident.search_vector, query).label("rank")
+    matches = (
+        select(Incident.id, rank)
+        .where(Incident.search_vector.op("@@")(query), *filter_conditions(filters or schemas.IncidentFilter()))
+        .order_by(rank.desc(), Incident.id.desc())
+        .limit(min(limit, MAX_SEARCH_LIMIT))
+        .subquery()
+    )
+    document = func.concat_ws(" — ", Incident.description, Incident.message_for_sp)
+    options = literal(f"StartSel={start_sel}, StopSel={stop_sel}, {HEADLINE_OPTIONS}")
+    return (
+        select(
+            Incident.id,
+            Incident.so_number,
+            Incident.start_time,
+            Incident.status,
+            Incident.severity,
+            Incident.affected_products,
+            matches.c.rank,
+            func.ts_headline(SEARCH_CONFIG, document, query, options).label("snippet"),
+        )
+        .join(matches, matches.c.id == Incident.id)
+        .order_by(matches.c.rank.desc(), Incident.id.desc())
+    )
+
+
+async def search_incidents(db: AsyncSession, text: str, filters: Optional[schemas.IncidentFilter] = None,
+                           limit: int = DEFAULT_SEARCH_LIMIT, **highlight) -> List[dict]:
+    if not text.strip():
+        return []
+    return [dict(row) for row in (await db.execute(search_query(text, filters, limit, **highlight))).mappings()]
@@ -0,0 +1,168 @@
+import itertools
+import logging
+import shlex
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src import schemas
+from src.helperFunctions.incident_queries import parse_filter_text, parse_time
+from src.models import Incident, IncidentDailyStat
+
+
+logger = logging.getLogger(__name__)
+
+RESOLVED = "resolved"
+# Value of a dimension in the rollup rows totalling over it
+ALL = "*"
+# What statistics can be grouped by, in the order groups are reported
+GROUP_BY = ("day", "team", "product", "severity")
+# Rollup column -> Incident array its values come from
+DIMENSIONS = {
+    "team": "suspected_owning_team",
+    "product": "affected_products",
+    "severity": "severity",
+}
+# IncidentFilter field -> rollup column it narrows
+DIMENSION_FILTERS = {
+    "teams": IncidentDailyStat.team,
+    "products": IncidentDailyStat.product,
+    "severities": IncidentDailyStat.severity,
+}
+COUNTERS = ("incidents", "customer_affected", "resolved", "resolution_seconds")
+# Period of /incident-stats when no since: is given
+DEFAULT_COMMAND_PERIOD = "30d"
+
+
+def is_resolved(incident_status: Optional[str]) -> bool:
+    return (incident_status or "").lower() == RESOLVED
+
+
+def as_datetime(value: Union[datetime, str]) -> datetime:
+    # A new incident holds the times as the ISO strings it was created from until it is reloaded
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def rollup_keys(incident: Incident) -> List[Tuple[date, str, str, str]]:
+    """(day, team, product, severity) of every rollup row counting the incident, in key order.
+
+    One row per combination of its values, plus the rows totalling over each
+    dimension, e.g. (day, "Core", "*", "*") for the Core team on that day.
+    """
+    day = as_datetime(incident.start_time).date()
+    values = [sorted(set(getattr(incident, attr) or ())) + [ALL] for attr in DIMENSIONS.values()]
+    return sorted((day, *combination) for combination in itertools.product(*values))
+
+
+def add_to_rollups(db: Session, incident: Incident, **counts):
+    """Add `counts` to the rollup rows of the incident in the caller's transaction, creating missing rows.
+
+    A single INSERT ... ON CONFLICT for all rows; they are written in key order, so
+    two transactions counting incidents of the same day lock them in the same order.
+    """
+    table = IncidentDailyStat.__table__
+    rows = [
+        {"day": day, "team": team, "product": product, "severity": severity, **dict.fromkeys(COUNTERS, 0), **counts}
+        for day, team, product, severity in rollup_keys(incident)
+    ]
+    statement = insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.team, table.c.product, table.c.severity],
+        set_={name: table.c[name] + statement.excluded[name] for name in counts},
+    )
+    db.execute(statement)
+
+
+def count_created(db: Session, incident: Incident):
+    add_to_rollups(db, incident, incidents=1, customer_affected=1 if incident.p1_customer_affected else 0)
+
+
+def count_resolution(db: Session, incident: Incident, resolved_at: datetime, undo: bool = False):
+    """Count the incident as resolved at `resolved_at`, or take that back when it is reopened."""
+    seconds = max((resolved_at - as_datetime(incident.start_time)).total_seconds(), 0.0)
+    sign = -1 if undo else 1
+    add_to_rollups(db, incident, resolved=sign, resolution_seconds=sign * seconds)
+
+
+def stats_query(filters: schemas.IncidentFilter, group_by: Sequence[str] = ()) -> Select:
+    """Summed counters of the incidents matching `filters`, one row per group.
+
+    Reads one rollup row per day and group, whatever the number of incidents. A
+    dimension filtered on several values is reported per value, as an incident
+    can have more than one of them.
+    """
+    if filters.components or filters.match_all:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Statistics are kept per team, product and severity, component filters and match=all are not supported",
+        )
+    unknown = set(group_by) - set(GROUP_BY)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot group by {', '.join(sorted(unknown))}, use {', '.join(GROUP_BY)}",
+        )
+
+    grouped = [IncidentDailyStat.day] if "day" in group_by else []
+    conditions = []
+    if filters.since is not None:
+        conditions.append(IncidentDailyStat.day >= filters.since.date())
+    if filters.until is not None:
+        #Whole days, up to the one `until` falls in unless it is its very start
+        conditions.append(IncidentDailyStat.day <= (filters.until - timedelta(microseconds=1)).date())
+    for name, column in DIMENSION_FILTERS.items():
+        values = getattr(filters, name)
+        if column.key in group_by or len(values) > 1:
+            grouped.append(column)
+            conditions.append(column != ALL)
+            if values:
+                conditions.append(column.in_(values))
+        else:
+            conditions.append(column == (values[0] if values else ALL))
+
+    sums = [func.coalesce(func.sum(getattr(IncidentDailyStat, name)), 0).label(name) for name in COUNTERS]
+    query = select(*grouped, *sums).where(*conditions)
+    if grouped:
+        query = query.group_by(*grouped).order_by(*grouped)
+    return query
+
+
+def stats_row(row: dict) -> dict:
+    stats = dict(row)
+    stats["customer_impact_rate"] = stats["customer_affected"] / stats["incidents"] if stats["incidents"] else None
+    stats["mttr_seconds"] = stats["resolution_seconds"] / stats["resolved"] if stats["resolved"] else None
+    return stats
+
+
+async def incident_stats(db: AsyncSession, filters: schemas.IncidentFilter, group_by: Sequence[str] = ()) -> List[dict]:
+    rows = (await db.execute(stats_query(filters, group_by))).mappings().all()
+    return [stats_row(row) for row in rows]
+
+
+def parse_stats_text(text: str) -> Tuple[schemas.IncidentFilter, List[str]]:
+    """Filters and grouping of the /incident-stats command text.
+
+    Takes the /list-incidents filters and `by:team,product`; covers the last
+    DEFAULT_COMMAND_PERIOD unless since: is given.
+    """
+    try:
+        words = shlex.split(text or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter: {e}")
+
+    group_by = []
+    rest = []
+    for word in words:
+        key, _, value = word.partition(":")
+        if key.lower() == "by" and value:
+            group_by.extend(name.strip().lower() for name in value.split(",") if name.strip())
+        else:
+            rest.append(word)
+    filters = parse_filter_text(shlex.join(rest))
+    if filters.since is None:
+        filters.since = parse_time(DEFAULT_COMMAND_PERIOD)
+    return filters, group_by
+
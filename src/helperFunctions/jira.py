@@ -1,112 +1,248 @@
+import asyncio
 import base64
-import json
 import logging
-import requests
-from fastapi import HTTPException, status,Depends
-from config import Settings, get_settings
+import time
+from typing import Iterable, List, Optional, Sequence
+import httpx
+from fastapi import HTTPException, status
+from config import get_settings
 from src import schemas
+from src.helperFunctions.http_client import get_http_client
+from src.helperFunctions.metrics import record_latency
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Label carrying an incident's idempotency key, so a retried create can find the issue it already made
+IDEMPOTENCY_LABEL_PREFIX = "crisis-"
+# Jira accepts at most this many issues per bulk create request
+BULK_CREATE_LIMIT = 50
+# Bulk requests, or single updates, in flight at once
+BULK_CONCURRENCY = 4
+
+
 async def get_jira_auth():
     auth_str = f"{settings.jira_email}:{settings.jira_api_key}"
     base_64_auth = base64.b64encode(auth_str.encode()).decode()
     return base_64_auth
 
 
-async def create_jira_ticket(incident: schemas.IncidentCreate):
-    # First, let's check the latest SO number in Jira
-    jira_search_url = f"{settings.jira_server}/rest/api/2/search"
-    base_64_auth = await get_jira_auth()
-    headers = {
-        'Authorization': f"Basic {base_64_auth}",
-        'Content-Type': 'application/json'
-    }
+def idempotency_label(idempotency_key: str) -> str:
+    return f"{IDEMPOTENCY_LABEL_PREFIX}{idempotency_key}"
 
-    # Search for the latest SO number
-    try:
-        search_query = {
-            'jql': 'project = SO ORDER BY created DESC',
-            'maxResults': 1,
-            'fields': ['key']
+
+class JiraClient:
+    """Async Jira REST client on the shared "jira" connection pool.
+
+    Every call records its latency as `jira.<call>` in the metrics module.
+    """
+
+    def __init__(self, server: str, auth: str, client: Optional[httpx.AsyncClient] = None):
+        self.server = server.rstrip("/")
+        self.client = client
+        self.headers = {
+            'Authorization': f"Basic {auth}",
+            'Content-Type': 'application/json'
         }
-        
-        search_response = requests.post(
-            jira_search_url, 
-            headers=headers, 
-            json=search_query
+
+    async def _request(self, call: str, method: str, path: str, **kwargs) -> httpx.Response:
+        client = self.client or get_http_client("jira")
+        started = time.monotonic()
+        try:
+            response = await client.request(method, f"{self.server}{path}", headers=self.headers, **kwargs)
+        finally:
+            record_latency(f"jira.{call}", time.monotonic() - started)
+        response.raise_for_status()
+        return response
+
+    async def create_issue(self, fields: dict) -> dict:
+        response = await self._request("create_issue", "POST", "/rest/api/2/issue", json={"fields": fields})
+        return response.json()
+
+    async def find_issue_by_label(self, label: str) -> Optional[dict]:
+        return (await self.find_issues_by_labels([label])).get(label)
+
+    async def find_issues_by_labels(self, labels: Sequence[str]) -> dict:
+        """Map each of `labels` to the oldest issue carrying it, leaving out labels no issue has."""
+        quoted = ", ".join(f'"{label}"' for label in labels)
+        response = await self._request("search", "POST", "/rest/api/2/search", json={
+            "jql": f"project = SO AND labels in ({quoted}) ORDER BY created ASC",
+            "maxResults": len(labels),
+            "fields": ["labels"],
+        })
+        wanted = set(labels)
+        found = {}
+        for issue in response.json().get("issues", []):
+            for label in issue.get("fields", {}).get("labels", []):
+                if label in wanted:
+                    found.setdefault(label, {"id": issue.get("id"), "key": issue.get("key"), "self": issue.get("self")})
+        return found
+
+    async def update_issue(self, key: str, fields: dict):
+        await self._request("update_issue", "PUT", f"/rest/api/2/issue/{key}", json={"fields": fields})
+
+    async def _create_chunk(self, chunk: List[dict]) -> List[Optional[dict]]:
+        response = await self._request(
+            "bulk_create", "POST", "/rest/api/2/issue/bulk",
+            json={"issueUpdates": [{"fields": fields} for fields in chunk]},
         )
-        search_response.raise_for_status()
-        search_result = search_response.json()
-        
-        # Get the latest issue number
-        latest_number = 0
-        if search_result['issues']:
-            latest_key = search_result['issues'][0]['key']
-            latest_number = int(latest_key.split('-')[1])
-            
-        # Use the next sequential number
-        next_number = latest_number + 1
-        
-        # Now create the new ticket with the correct number
-        jira_url = f"{settings.jira_server}/rest/api/2/issue"
-        
-        
-        
-        # Convert times to ISO format, if they are not None
-        start_time_iso = incident.start_time.isoformat() if incident.start_time else None
-        end_time_iso = incident.end_time.isoformat() if incident.end_time else None
-        suspected_owning_team = [team for team in incident.suspected_owning_team]
-        affected_products = [product for product in incident.affected_products]
-        severity = [severity for severity in incident.severity]
-        
-        issue_dict = {
-            'fields': {
-                'project': {'key': 'SO'},  # Ensure this is the correct project key
-                'summary': f"{incident.start_time} > {incident.severity}> {', '.join(incident.affected_products)} > Outage ",
-                'description': (
-                    f"We had an {', '.join(incident.severity) + ' ' if incident.severity else ''}incident affecting {', '.join(incident.affected_products)} products.\n"
-                    f"{f'The issue has been escalated to {', '.join(incident.suspected_owning_team)} team' if incident.suspected_owning_team else ''}\n"
-                    f"{'Tier 1 customers were affected' if incident.p1_customer_affected else ''}\n"
-                    f"{'Statuspage incident has been created' if incident.statuspage_notification else ''}\n"
-                    f"Incident details: \n"
-                    f"{incident.description}\n"
-                    f"Timeline: \n"
-                    f"{incident.start_time} - Incident escalation was initiated"
-                ),
-                'issuetype': {'name': 'Service Outage'},  # Adjust issuetype as necessary
-                'reporter': {'name': settings.jira_email},  # Use the email as the reporter
-
-                # Custom fields
-                'customfield_12608': start_time_iso,
-                'customfield_12607': end_time_iso,
-                'customfield_17273': [{'value': team} for team in suspected_owning_team],
-                'customfield_17272': [{'value': product} for product in affected_products],
-                'customfield_11201': {'value': severity[0]} if severity else None,
+        body = response.json()
+        failed = set()
+        for error in body.get("errors", []):
+            failed.add(error.get("failedElementNumber"))
+            logger.error("Jira rejected bulk element %s: %s", error.get("failedElementNumber"), error.get("elementErrors"))
+        # Created issues come back in request order, without the rejected elements
+        created = iter(body.get("issues", []))
+        return [None if index in failed else next(created, None) for index in range(len(chunk))]
+
+    async def create_issues(
+        self, field_sets: Sequence[dict], idempotency_keys: Optional[Sequence[Optional[str]]] = None,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> List[Optional[dict]]:
+        """Create many issues through the bulk endpoint.
+
+        Returns one entry per field set, in order: the created issue, or None where
+        Jira rejected it or its chunk failed. Keyed elements carry the idempotency
+        label and, when their chunk fails in transit, are looked up rather than lost.
+        """
+        field_sets = list(field_sets)
+        keys = list(idempotency_keys) if idempotency_keys is not None else [None] * len(field_sets)
+        labels = [idempotency_label(key) if key else None for key in keys]
+        field_sets = [
+            {**fields, "labels": [*fields.get("labels", []), label]} if label else fields
+            for fields, label in zip(field_sets, labels)
+        ]
+        results: List[Optional[dict]] = [None] * len(field_sets)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_chunk(start: int):
+            chunk = field_sets[start:start + BULK_CREATE_LIMIT]
+            async with semaphore:
+                try:
+                    results[start:start + len(chunk)] = await self._create_chunk(chunk)
+                    return
+                except httpx.TransportError as e:
+                    chunk_labels = [label for label in labels[start:start + len(chunk)] if label]
+                    logger.warning("Jira bulk create of %s issues failed in transit: %s", len(chunk), e)
+                    if not chunk_labels:
+                        return
+                    try:
+                        found = await self.find_issues_by_labels(chunk_labels)
+                    except httpx.HTTPError as lookup_error:
+                        logger.error("Could not look up the issues of the failed chunk: %s", lookup_error)
+                        return
+                except httpx.HTTPStatusError as e:
+                    logger.error("Jira bulk create of %s issues failed: %s", len(chunk), e.response.text)
+                    return
+            for offset in range(len(chunk)):
+                label = labels[start + offset]
+                if label in found:
+                    results[start + offset] = found[label]
+
+        await asyncio.gather(*(run_chunk(start) for start in range(0, len(field_sets), BULK_CREATE_LIMIT)))
+        return results
+
+    async def update_issues(self, updates: Iterable[tuple], concurrency: int = BULK_CONCURRENCY) -> List[Optional[Exception]]:
+        """Apply (key, fields) edits with bounded concurrency; returns each one's error, or None."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_update(key: str, fields: dict):
+            async with semaphore:
+                try:
+                    await self.update_issue(key, fields)
+                except httpx.HTTPError as e:
+                    logger.error("Could not update Jira ticket %s: %s", key, e)
+                    return e
+
+        return await asyncio.gather(*(run_update(key, fields) for key, fields in updates))
+
+    async def create_issue_once(self, fields: dict, idempotency_key: Optional[str] = None, retrying: bool = False) -> dict:
+        """Create an issue, at most once per idempotency key.
+
+        The first attempt is a single create request. The key goes on the issue as
+        a label; when an earlier attempt may have created the issue (a retry, or a
+        create that timed out) the label is looked up before creating again.
+        """
+        if idempotency_key is None:
+            return await self.create_issue(fields)
+
+        label = idempotency_label(idempotency_key)
+        if retrying:
+            existing = await self.find_issue_by_label(label)
+            if existing is not None:
+                logger.info("Reusing Jira ticket %s created by an earlier attempt", existing.get("key"))
+                return existing
+
+        fields = {**fields, "labels": [*fields.get("labels", []), label]}
+        try:
+            return await self.create_issue(fields)
+        except httpx.TransportError:
+            # The request may have reached Jira before the connection failed
+            existing = await self.find_issue_by_label(label)
+            if existing is not None:
+                logger.info("Jira ticket %s was created despite the failed request", existing.get("key"))
+                return existing
+            raise
+
+
+async def get_jira_client() -> JiraClient:
+    return JiraClient(settings.jira_server, await get_jira_auth())
+
+
+def build_issue_fields(incident: schemas.IncidentCreate) -> dict:
+    # Convert times to ISO format, if they are not None
+    start_time_iso = incident.start_time.isoformat() if incident.start_time else None
+    end_time_iso = incident.end_time.isoformat() if incident.end_time else None
+    suspected_owning_team = [team for team in incident.suspected_owning_team]
+    affected_products = [product for product in incident.affected_products]
+    severity = [severity for severity in incident.severity]
+
+    return {
+        'project': {'key': 'SO'},  # Ensure this is the correct project key
+        'summary': f"{incident.start_time} > {incident.severity}> {', '.join(incident.affected_products)} > Outage ",
+        'description': (
+            f"We had an {', '.join(incident.severity) + ' ' if incident.severity else ''}incident affecting {', '.join(incident.affected_products)} products.\n"
+            f"{f'The issue has been escalated to {', '.join(incident.suspected_owning_team)} team' if incident.suspected_owning_team else ''}\n"
+            f"{'Tier 1 customers were affected' if incident.p1_customer_affected else ''}\n"
+            f"{'Statuspage incident has been created' if incident.statuspage_notification else ''}\n"
+            f"Incident details: \n"
+            f"{incident.description}\n"
+            f"Timeline: \n"
+            f"{incident.start_time} - Incident escalation was initiated"
+        ),
+        'issuetype': {'name': 'Service Outage'},  # Adjust issuetype as necessary
+        'reporter': {'name': settings.jira_email},  # Use the email as the reporter
+
+        # Custom fields
+        'customfield_12608': start_time_iso,
+        'customfield_12607': end_time_iso,
+        'customfield_17273': [{'value': team} for team in suspected_owning_team],
+        'customfield_17272': [{'value': product} for product in affected_products],
+        'customfield_11201': {'value': severity[0]} if severity else None,
     }
-}
-        
 
-        # Create the ticket
-        response = requests.post(jira_url, headers=headers, json=issue_dict, timeout=30)
-        response.raise_for_status()
-        issue = response.json()
+
+async def create_jira_ticket(incident: schemas.IncidentCreate, idempotency_key: Optional[str] = None, retrying: bool = False):
+    # Jira assigns the issue key, which becomes the incident's SO number
+    try:
+        client = await get_jira_client()
+        issue = await client.create_issue_once(build_issue_fields(incident), idempotency_key, retrying)
         
         # Log the creation
-        print(f"Created Jira ticket SO-{next_number}")
+        logger.info("Created Jira ticket %s", issue.get("key"))
         
         #Update the SO number in your database to match
-        incident.so_number = f"SO-{next_number}"
+        incident.so_number = issue.get("key")
         return issue
 
-    except requests.exceptions.HTTPError as http_err:
-        print(f"Jira API error: {http_err.response.text if hasattr(http_err, 'response') else str(http_err)}")
+    except httpx.HTTPStatusError as http_err:
+        logger.error("Jira API error: %s", http_err.response.text if hasattr(http_err, 'response') else http_err)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Jira API error: {str(http_err)}"
         )
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
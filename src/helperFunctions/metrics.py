@@ -0,0 +1,62 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+# Number of most recent samples kept per metric for percentile calculations
+MAX_SAMPLES = 2048
+
+
+class LatencyRecorder:
+    """Keeps the most recent latency samples of one operation, in seconds."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+latency_metrics: Dict[str, LatencyRecorder] = {}
+_registry_lock = threading.Lock()
+
+
+def get_latency_recorder(name: str) -> LatencyRecorder:
+    recorder = latency_metrics.get(name)
+    if recorder is None:
+        with _registry_lock:
+            recorder = latency_metrics.setdefault(name, LatencyRecorder())
+    return recorder
+
+
+def record_latency(name: str, seconds: float):
+    get_latency_recorder(name).record(seconds)
+
+
+def latency_snapshot() -> dict:
+    return {name: recorder.snapshot() for name, recorder in sorted(latency_metrics.items())}
@@ -1,11 +1,11 @@
-import requests
+import httpx
 from config import settings
 from typing import Dict, Tuple
-from requests.exceptions import RequestException
 import logging
 import json
 from pathlib import Path
 from config import get_settings, Settings
+from src.helperFunctions.http_client import get_http_client
 
 
 logger = logging.getLogger(__name__)
@@ -93,29 +93,21 @@ async def create_alert(incident) -> Dict:
         ),
         "priority": "P1",
         "tags": tags,
-        "responders": responders
+        "responders": responders,
+        #OpsGenie keeps one open alert per alias, so a retried request does not page twice
+        "alias": incident.so_number or f"incident-{incident.id}",
     }
 
-    logger.info("Final Payload Being Sent to OpsGenie:")
-    logger.info(json.dumps(payload, indent=2))
+    logger.debug("Final payload being sent to OpsGenie: %s", payload)
 
     try:
-        logger.info(
-            f"Creating OpsGenie alert for incident {incident.jira_issue_key}")
-        response = requests.post(url, json=payload, headers=headers)
-
-        # Log the complete response
-        logger.info(f"OpsGenie Response Status Code: {response.status_code}")
-        logger.info(f"OpsGenie Response Headers: {dict(response.headers)}")
-        logger.info(f"OpsGenie Response Body: {response.text}")
-
-        # Try to parse the response as JSON for more detailed error information
-        try:
-            response_data = response.json()
-            logger.info(
-                f"OpsGenie Response JSON: {json.dumps(response_data, indent=2)}")
-        except json.JSONDecodeError:
-            logger.warning("Could not parse OpsGenie response as JSON")
+        logger.info("Creating OpsGenie alert for incident %s", incident.jira_issue_key)
+        response = await get_http_client("opsgenie").post(url, json=payload, headers=headers)
+
+        # The full response is only rendered when DEBUG is enabled
+        logger.info("OpsGenie response status code: %s", response.status_code)
+        logger.debug("OpsGenie response headers: %s", response.headers)
+        logger.debug("OpsGenie response body: %s", response.text)
 
         # Check if the request was successful
         if response.status_code == 202:  # OpsGenie uses 202 for successful alert creation
@@ -128,22 +120,16 @@ async def create_alert(incident) -> Dict:
         else:
             error_message = f"OpsGenie returned status code {response.status_code}"
             logger.error(error_message)
-            logger.error(f"Response content: {response.text}")
+            logger.error("Response content: %s", response.text)
             raise OpsGenieError(error_message)
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_message = "Failed to create OpsGenie alert"
         logger.error(error_message)
 
-        if hasattr(e, 'response') and e.response is not None:
-            logger.error(f"Error status code: {e.response.status_code}")
-            logger.error(f"Error response body: {e.response.text}")
-            try:
-                error_json = e.response.json()
-                logger.error(
-                    f"Error response JSON: {json.dumps(error_json, indent=2)}")
-            except json.JSONDecodeError:
-                logger.error("Could not parse error response as JSON")
+        if getattr(e, 'response', None) is not None:
+            logger.error("Error status code: %s", e.response.status_code)
+            logger.error("Error response body: %s", e.response.text)
 
         raise OpsGenieError(f"{error_message}: {str(e)}") from e
     except Exception as e:
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# conversations.list page size, Slack's maximum
+PAGE_SIZE = 1000
+# A name missing from an index younger than this is taken as not existing, without asking Slack
+MISS_REFRESH_SECONDS = 60.0
+# The whole index is rebuilt this often, dropping archived and renamed channels
+FULL_REFRESH_SECONDS = 3600.0
+
+ListPage = Callable[..., Awaitable[dict]]
+
+
+class ChannelDirectory:
+    """name -> id index of the workspace's non-archived channels.
+
+    The first lookup pages through conversations.list once; after that a hit
+    costs no API call. A miss pages through again, merging what it sees and
+    stopping as soon as the name turns up, at most every MISS_REFRESH_SECONDS.
+    Channels the app creates are added with `remember` the moment they exist.
+    """
+
+    def __init__(self, list_page: ListPage, miss_refresh_seconds: float = MISS_REFRESH_SECONDS,
+                 full_refresh_seconds: float = FULL_REFRESH_SECONDS):
+        self._list_page = list_page
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self._ids: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._scanned_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def remember(self, name: str, channel_id: str):
+        self._ids[name] = channel_id
+
+    def forget(self, name: str):
+        self._ids.pop(name, None)
+
+    def _needs_full_load(self, now: float) -> bool:
+        return self._loaded_at is None or now - self._loaded_at >= self.full_refresh_seconds
+
+    async def _scan(self, until: Optional[str] = None) -> Optional[str]:
+        """Page through the channel list, merging every page; stop early once `until` is seen."""
+        cursor = None
+        pages = 0
+        while True:
+            response = await self._list_page(
+                types="public_channel,private_channel",
+                exclude_archived=True,
+                limit=PAGE_SIZE,
+                cursor=cursor,
+            )
+            pages += 1
+            for channel in response["channels"]:
+                self._ids[channel["name"]] = channel["id"]
+            if until is not None and until in self._ids:
+                logger.debug("Found channel %s after %s page(s)", until, pages)
+                return self._ids[until]
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                logger.info("Indexed %s Slack channels from %s page(s)", len(self._ids), pages)
+                return None
+
+    async def load(self):
+        """Rebuild the index from scratch."""
+        async with self._lock:
+            await self._load()
+
+    async def _load(self):
+        previous, self._ids = self._ids, {}
+        try:
+            await self._scan()
+        except Exception:
+            self._ids = previous
+            raise
+        self._loaded_at = self._scanned_at = time.monotonic()
+
+    async def get(self, name: str, refresh: bool = False) -> Optional[str]:
+        """Id of the channel called `name`, or None. With refresh, a miss always asks Slack."""
+        now = time.monotonic()
+        if not self._needs_full_load(now) and name in self._ids:
+            return self._ids[name]
+
+        async with self._lock:
+            now = time.monotonic()
+            if self._needs_full_load(now):
+                await self._load()
+                return self._ids.get(name)
+            if name in self._ids:
+                return self._ids[name]
+            if not refresh and self._scanned_at is not None and now - self._scanned_at < self.miss_refresh_seconds:
+                return None
+            channel_id = await self._scan(until=name)
+            self._scanned_at = time.monotonic()
+            return channel_id
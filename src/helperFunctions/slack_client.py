@@ -0,0 +1,96 @@
+import json
+import logging
+from typing import Optional
+import httpx
+from slack_sdk.web import SlackResponse
+from config import get_settings
+from src.helperFunctions.http_client import get_http_client
+from src.helperFunctions.slack_channels import ChannelDirectory
+from src.helperFunctions.slack_rate_limit import SlackScheduler, slack_scheduler
+
+
+logger = logging.getLogger(__name__)
+
+SLACK_API_URL = "https://slack.com/api/"
+
+
+def encode_params(params: dict) -> dict:
+    """Form-encode Web API arguments the way Slack expects them; None values are left out."""
+    encoded = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded[key] = "true" if value else "false"
+        elif isinstance(value, (dict, list)):
+            encoded[key] = json.dumps(value)
+        else:
+            encoded[key] = value
+    return encoded
+
+
+class SlackClient:
+    """Async Slack Web API client on the shared "slack" connection pool.
+
+    Calls are admitted by the rate-limit scheduler and return slack_sdk
+    SlackResponse objects, raising SlackApiError for a failed call just as
+    WebClient does. `channels` is this workspace's channel name index.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        base_url: str = SLACK_API_URL,
+        scheduler: Optional[SlackScheduler] = slack_scheduler,
+    ):
+        self.token = token
+        self.base_url = base_url
+        self.scheduler = scheduler
+        self._http_client = http_client
+        self.channels = ChannelDirectory(self.list_channels_page)
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client("slack")
+
+    async def _post(self, method: str, params: dict) -> SlackResponse:
+        url = f"{self.base_url}{method}"
+        response = await self.http_client.post(
+            url,
+            headers={"Authorization": f"Bearer {self.token}"},
+            data=encode_params(params),
+        )
+        try:
+            data = response.json()
+        except json.JSONDecodeError:
+            data = {"ok": False, "error": response.text or response.reason_phrase}
+        return SlackResponse(
+            client=self,
+            http_verb="POST",
+            api_url=url,
+            req_args={"data": params},
+            data=data,
+            headers=dict(response.headers),
+            status_code=response.status_code,
+        ).validate()
+
+    async def api_call(self, method: str, **params) -> SlackResponse:
+        if self.scheduler is None:
+            return await self._post(method, params)
+        return await self.scheduler.run(method, lambda: self._post(method, params), channel=params.get("channel"))
+
+    async def list_channels_page(self, **params) -> SlackResponse:
+        return await self.api_call("conversations.list", **params)
+
+
+_slack_client: Optional[SlackClient] = None
+
+
+def get_slack_client() -> SlackClient:
+    """The process-wide client for the bot token."""
+    global _slack_client
+    if _slack_client is None:
+        _slack_client = SlackClient(get_settings().SLACK_BOT_TOKEN)
+    return _slack_client
+
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, Optional
+from slack_sdk.errors import SlackApiError
+from src.helperFunctions.metrics import record_latency
+
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+# Requests per minute Slack allows each Web API method, by the method's tier
+TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "conversations.create": 2,
+    "conversations.list": 2,
+    "conversations.info": 3,
+    "conversations.join": 3,
+    "views.open": 4,
+    "views.update": 4,
+    "views.push": 4,
+}
+DEFAULT_TIER = 3
+# chat.* is not tiered; Slack allows about one message per second per channel,
+# with a workspace-wide limit of several hundred a minute
+CHANNEL_ORDERED_METHODS = frozenset({"chat.postMessage", "chat.update", "chat.postEphemeral"})
+CHANNEL_RATE = 60
+WORKSPACE_MESSAGE_RATE = 300
+# The modal calls race a 3 second trigger_id expiry and go ahead of everything else
+HIGH_PRIORITY_METHODS = frozenset({"views.open", "views.update", "views.push"})
+
+# Slack calls in flight at once, of which RESERVED_HIGH_PRIORITY only high priority calls may use
+MAX_IN_FLIGHT = 10
+RESERVED_HIGH_PRIORITY = 2
+SLACK_MAX_ATTEMPTS = 5
+# Per-channel state kept for this many channels, least recently used first out
+MAX_TRACKED_CHANNELS = 1024
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds Slack asked us to back off, or None when the response was not rate limited.
+
+    Understands both slack_sdk responses and raw httpx responses.
+    """
+    if getattr(response, "status_code", None) != 429:
+        return None
+    headers = response.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after") or 1
+    return float(value)
+
+
+class TokenBucket:
+    """Hands out `rate_per_minute` tokens, up to `burst` at once.
+
+    Waiters are served high priority lane first and in arrival order within a lane.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int = 1):
+        self.name = name
+        self.interval = 60.0 / rate_per_minute
+        self.burst = burst
+        self.blocked_until = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lanes = (deque(), deque())
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def depth(self, priority: int) -> int:
+        return len(self._lanes[priority])
+
+    def block_for(self, seconds: float):
+        """Hand out nothing for `seconds`, as told by a Retry-After."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        """Wait for a token; returns the seconds spent waiting."""
+        now = time.monotonic()
+        self._refill(now)
+        if not any(self._lanes) and self._tokens >= 1 and now >= self.blocked_until:
+            self._tokens -= 1
+            return 0.0
+        waiter = asyncio.get_running_loop().create_future()
+        self._lanes[priority].append(waiter)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await waiter
+        return time.monotonic() - now
+
+    async def _dispatch(self):
+        while any(self._lanes):
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.blocked_until - now, (1 - self._tokens) * self.interval)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            lane = self._lanes[0] if self._lanes[0] else self._lanes[1]
+            waiter = lane.popleft()
+            if waiter.done():
+                # Its caller gave up waiting
+                continue
+            self._tokens -= 1
+            waiter.set_result(None)
+
+
+class ChannelLane:
+    """Keeps calls to one channel in FIFO order and within the channel's own rate."""
+
+    def __init__(self, channel: str):
+        self.lock = asyncio.Lock()
+        self.bucket = TokenBucket(f"channel {channel}", CHANNEL_RATE)
+        # Calls waiting for their turn on this channel
+        self.queued = 0
+
+
+class SlackScheduler:
+    """Admission control for every Slack Web API call made by this process.
+
+    Each method has a token bucket at its tier's rate, and a 429 stops the
+    method's bucket for the Retry-After Slack returned. chat.* calls also queue
+    per channel, so messages to one channel go out in order. Modal calls use a
+    high priority lane in the buckets and a reserve of in-flight slots, so a
+    burst of routine posts cannot hold them up.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, reserved_high_priority: int = RESERVED_HIGH_PRIORITY):
+        self.max_in_flight = max_in_flight
+        self.reserved_high_priority = reserved_high_priority
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+
+    def _reset(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._channels: "OrderedDict[str, ChannelLane]" = OrderedDict()
+        self._all_slots = asyncio.Semaphore(self.max_in_flight)
+        self._normal_slots = asyncio.Semaphore(self.max_in_flight - self.reserved_high_priority)
+        self.in_flight = 0
+
+    def _bind_loop(self):
+        # Queues and waiters belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._reset()
+
+    def bucket(self, method: str) -> TokenBucket:
+        bucket = self._buckets.get(method)
+        if bucket is None:
+            if method in CHANNEL_ORDERED_METHODS:
+                rate = WORKSPACE_MESSAGE_RATE
+            else:
+                rate = TIER_RATES[METHOD_TIERS.get(method, DEFAULT_TIER)]
+            bucket = self._buckets[method] = TokenBucket(method, rate, burst=max(1, rate // 10))
+        return bucket
+
+    def _channel(self, channel: str) -> ChannelLane:
+        lane = self._channels.get(channel)
+        if lane is None:
+            lane = self._channels[channel] = ChannelLane(channel)
+            if len(self._channels) > MAX_TRACKED_CHANNELS:
+                for name, old in list(self._channels.items()):
+                    if name != channel and not old.lock.locked() and not old.queued:
+                        del self._channels[name]
+                        break
+        self._channels.move_to_end(channel)
+        return lane
+
+    async def run(
+        self,
+        method: str,
+        call: Callable[[], Awaitable],
+        channel: Optional[str] = None,
+        priority: Optional[int] = None,
+        max_attempts: int = SLACK_MAX_ATTEMPTS,
+    ):
+        """Run `call`, a Slack API request to `method`, once the rate limits allow it.
+
+        Rate-limited attempts, raised as SlackApiError or returned as a 429
+        response, are retried up to `max_attempts` times.
+        """
+        self._bind_loop()
+        if priority is None:
+            priority = PRIORITY_HIGH if method in HIGH_PRIORITY_METHODS else PRIORITY_NORMAL
+        bucket = self.bucket(method)
+        lane = self._channel(channel) if channel and method in CHANNEL_ORDERED_METHODS else None
+
+        async with AsyncExitStack() as stack:
+            started = time.monotonic()
+            if lane is not None:
+                lane.queued += 1
+                try:
+                    await stack.enter_async_context(lane.lock)
+                finally:
+                    lane.queued -= 1
+            for attempt in range(max_attempts):
+                await bucket.acquire(priority)
+                if lane is not None:
+                    await lane.bucket.acquire(priority)
+                async with AsyncExitStack() as slots:
+                    if priority != PRIORITY_HIGH:
+                        await slots.enter_async_context(self._normal_slots)
+                    await slots.enter_async_context(self._all_slots)
+                    record_latency(f"slack.throttle_wait.{method}", time.monotonic() - started)
+                    self.in_flight += 1
+                    try:
+                        result = await call()
+                        delay = retry_after(result)
+                    except SlackApiError as e:
+                        delay = retry_after(e.response)
+                        if delay is None or attempt == max_attempts - 1:
+                            raise
+                    finally:
+                        self.in_flight -= 1
+                if delay is None or attempt == max_attempts - 1:
+                    return result
+
+                delay += random.uniform(0, delay / 2)
+                (lane.bucket if lane is not None else bucket).block_for(delay)
+                logger.info("Rate limited on %s, retrying in %.1f seconds", method, delay)
+                started = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Queue depths and Retry-After blocks, for the metrics endpoint."""
+        now = time.monotonic()
+        return {
+            "in_flight": self.in_flight,
+            "methods": {
+                method: {
+                    "tier": None if method in CHANNEL_ORDERED_METHODS else METHOD_TIERS.get(method, DEFAULT_TIER),
+                    "queued_high": bucket.depth(PRIORITY_HIGH),
+                    "queued_normal": bucket.depth(PRIORITY_NORMAL),
+                    "blocked_for": round(max(0.0, bucket.blocked_until - now), 2),
+                }
+                for method, bucket in sorted(self._buckets.items())
+            },
+            "channels_queued": {
+                channel: lane.queued for channel, lane in self._channels.items() if lane.queued
+            },
+        }
+
+
+slack_scheduler = SlackScheduler()
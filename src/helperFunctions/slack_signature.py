@@ -0,0 +1,107 @@
+import hashlib
+import hmac
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+
+
+# Slack recommends ignoring requests older than 5 minutes to mitigate replay attacks
+MAX_REQUEST_AGE_SECONDS = 60 * 5
+
+
+class SlackSignatureError(ValueError):
+    pass
+
+
+class ReplayCache:
+    """Bounded set of signatures seen inside the replay window.
+
+    Entries are kept in arrival order with an expiry far enough out to cover the
+    whole window their timestamp is accepted for, so the oldest entries always sit
+    at the front and both lookups and evictions are O(1).
+    """
+
+    def __init__(self, window_seconds: int = MAX_REQUEST_AGE_SECONDS, max_entries: int = 100_000):
+        # A timestamp is accepted for up to `window` seconds either side of now
+        self._ttl = 2 * window_seconds
+        self._max_entries = max_entries
+        self._seen: "OrderedDict[bytes, float]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def _evict(self, now: float):
+        seen = self._seen
+        while seen:
+            signature, expires_at = next(iter(seen.items()))
+            if expires_at > now and len(seen) < self._max_entries:
+                break
+            seen.popitem(last=False)
+
+    def add(self, signature: bytes, now: float) -> bool:
+        """Remember the signature, returning False if it was already seen."""
+        self._evict(now)
+        if signature in self._seen:
+            return False
+        self._seen[signature] = now + self._ttl
+        return True
+
+
+class SlackSignatureVerifier:
+    """Verifies Slack's v0 request signatures on the raw body bytes.
+
+    The HMAC key schedule is computed once and copied per request, and valid
+    signatures go into a replay cache so the same request cannot be accepted twice.
+    """
+
+    def __init__(
+        self,
+        signing_secret: Union[str, bytes],
+        max_age_seconds: int = MAX_REQUEST_AGE_SECONDS,
+        replay_cache: Optional[ReplayCache] = None,
+    ):
+        if isinstance(signing_secret, str):
+            signing_secret = signing_secret.encode("utf-8")
+        if not signing_secret:
+            raise SlackSignatureError("Missing Slack signing secret")
+        self._mac = hmac.new(signing_secret, digestmod=hashlib.sha256)
+        self._max_age = max_age_seconds
+        self.replay_cache = replay_cache if replay_cache is not None else ReplayCache(max_age_seconds)
+
+    def signature_for(self, body: bytes, timestamp: Union[str, bytes]) -> bytes:
+        if isinstance(timestamp, str):
+            timestamp = timestamp.encode("ascii")
+        mac = self._mac.copy()
+        mac.update(b"v0:")
+        mac.update(timestamp)
+        mac.update(b":")
+        mac.update(body)
+        return b"v0=" + mac.hexdigest().encode("ascii")
+
+    def verify(
+        self,
+        body: bytes,
+        signature: Optional[Union[str, bytes]],
+        timestamp: Optional[Union[str, bytes]],
+        now: Optional[float] = None,
+    ):
+        if not timestamp or not signature:
+            raise SlackSignatureError("Missing request signature")
+
+        now = time.time() if now is None else now
+        try:
+            request_time = int(timestamp)
+        except ValueError as e:
+            raise SlackSignatureError("Invalid request timestamp") from e
+        if abs(now - request_time) > self._max_age:
+            raise SlackSignatureError("Request timestamp is too old")
+
+        if isinstance(signature, str):
+            signature = signature.encode("ascii", "replace")
+        if not hmac.compare_digest(self.signature_for(body, timestamp), signature):
+            raise SlackSignatureError("Invalid request signature is detected")
+
+        # Only valid signatures are remembered, so forged requests cannot fill the cache
+        if not self.replay_cache.add(signature, now):
+            raise SlackSignatureError("Request signature has already been used")
+
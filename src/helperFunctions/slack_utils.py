@@ -1,45 +1,52 @@
 import asyncio
+import random
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import List
-from fastapi import HTTPException, status, Depends
-from slack_sdk import WebClient
+from fastapi import HTTPException, status
 from slack_sdk.errors import SlackApiError
-from config import get_settings, Settings
+from config import get_settings
+from src.helperFunctions.metrics import record_latency
+from src.helperFunctions.slack_client import SlackClient
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-settings = get_settings()
-slack_client = WebClient(token=settings.SLACK_BOT_TOKEN)
+# Attempts of the membership check before giving up
+SLACK_MAX_ATTEMPTS = 5
+# First wait between membership checks, doubled on every further check
+MEMBERSHIP_POLL_SECONDS = 0.25
 
-executor = ThreadPoolExecutor(max_workers=10)
 
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff plus up to 50% jitter."""
+    base = MEMBERSHIP_POLL_SECONDS * 2 ** attempt
+    return base + random.uniform(0, base / 2)
 
-async def run_in_executor(func, *args, **kwargs):
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(executor, lambda: (func(*args, **kwargs)))
+async def wait_for_membership(slack: SlackClient, channel_id: str, max_attempts: int = SLACK_MAX_ATTEMPTS):
+    """Return once Slack reports the bot as a member of the channel."""
+    for attempt in range(max_attempts):
+        response = await slack.api_call("conversations.info", channel=channel_id)
+        if response["channel"].get("is_member"):
+            return
+        if attempt < max_attempts - 1:
+            await asyncio.sleep(retry_delay(attempt))
+    raise HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Bot did not become a member of channel {channel_id}",
+    )
 
-async def test_slack_integration(slack_settings: Settings = Depends(get_settings)):
+async def test_slack_integration(slack: SlackClient, channel_id: str):
     try:
-        await post_message_to_slack(
-            slack_settings.SLACK_GENERAL_OUTAGES_CHANNEL, "Testing Slack integration"
-        )
+        await post_message_to_slack(slack, channel_id, "Testing Slack integration")
         logger.info("Slack integration test successful")
-    except SlackApiError as e:
-        logger.error(f"Test Slack Integration Error: {str(e)}")
+    except HTTPException as e:
+        logger.error(f"Test Slack Integration Error: {str(e.detail)}")
 
-async def get_channel_id(channel_name: str) -> str:
+async def get_channel_id(slack: SlackClient, channel_name: str) -> str:
     try:
-        response = await run_in_executor(slack_client.conversations_list)
-        if response["ok"]:
-            for channel in response["channels"]:
-                if channel["name"] == channel_name:
-                    logger.info(f"Channel already exists. Channel ID: {channel['id']}")
-                    return channel["id"]
-        await asyncio.sleep(1)
-        return None
+        channel_id = await slack.channels.get(channel_name)
+        if channel_id:
+            logger.info(f"Channel already exists. Channel ID: {channel_id}")
+        return channel_id
     except SlackApiError as e:
         logger.error(f"Slack API error in get_channel_id: {e.response['error']}")
         raise HTTPException(
@@ -48,11 +55,9 @@ async def get_channel_id(channel_name: str) -> str:
         ) from e
 
 # check the channel not found bug- the root cause of it
-async def post_message_to_slack(channel_id: str, message: str):
+async def post_message_to_slack(slack: SlackClient, channel_id: str, message: str):
     try:
-        response = await run_in_executor(
-            slack_client.chat_postMessage, channel=channel_id, text=message
-        )
+        response = await slack.api_call("chat.postMessage", channel=channel_id, text=message)
 
         if response["ok"]:
             logger.info(f"Message posted to Slack channel ID {channel_id}")
@@ -71,53 +76,71 @@ async def post_message_to_slack(channel_id: str, message: str):
             detail=f"Slack API error: {e.response['error']}",
         ) from e
 
-async def create_slack_channel(channel_name: str) -> str:
+async def create_slack_channel(slack: SlackClient, channel_name: str) -> str:
+    """Find or create the incident channel, returning once the bot can post in it."""
+    started = time.monotonic()
     try:
         # Check if the channel already exists
-        channel_id = await get_channel_id(channel_name)
+        channel_id = await get_channel_id(slack, channel_name)
         if channel_id:
             logger.info(f"Channel already exists. Channel ID: {channel_id}")
             return channel_id
 
-        # If the channel does not exist, create a new one
-        unique_channel_name = f"{channel_name}-{int(time.time())}"
-        response = await run_in_executor(
-            slack_client.conversations_create,
-            name=unique_channel_name,
-            is_private=False,
-            is_group=False,
-        )
+        # If the channel does not exist, create it under the name lookups use, so a retry finds it again
+        try:
+            response = await slack.api_call(
+                "conversations.create",
+                name=channel_name,
+                is_private=False,
+            )
+        except SlackApiError as e:
+            if e.response["error"] != "name_taken":
+                raise
+            # Usually created since the last scan, e.g. by another attempt; the miss may be cached, so scan again
+            channel_id = await slack.channels.get(channel_name, refresh=True)
+            if channel_id:
+                logger.info(f"Channel was created meanwhile. Channel ID: {channel_id}")
+                return channel_id
+            # Taken by a channel the lookup does not list, e.g. an archived one
+            logger.error(f"Channel name {channel_name} is taken by a channel that cannot be found, creating it under another name")
+            response = await slack.api_call(
+                "conversations.create",
+                name=f"{channel_name}-{int(time.time())}",
+                is_private=False,
+            )
 
-        logger.info(f"Slack API response in create_slack_channel: {response}")
+        if not response["ok"]:
+            logger.error(
+                f"Failed to create channel. Error: {response.get('error', 'Unknown error')}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create Slack channel: {response.get('error', 'Unknown error')}",
+            )
 
-        if response["ok"]:
-            channel_id = response["channel"]["id"]
-            logger.info(f"Channel created successfully. Channel ID: {channel_id}")
-            
-            #Enabling the bot to join the channel when it is created
-            await run_in_executor(slack_client.conversations_join, channel=channel_id)
-            logger.info(f"Bot enabled to join the channel: {channel_id}")
-            await asyncio.sleep(2)
-            return channel_id
-        
+        channel = response["channel"]
+        channel_id = channel["id"]
+        logger.info(f"Channel created successfully. Channel ID: {channel_id}")
+        slack.channels.remember(channel_name, channel_id)
 
-        logger.error(
-            f"Failed to create channel. Error: {response.get('error', 'Unknown error')}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create Slack channel: {response.get('error', 'Unknown error')}",
-        )
+        # The creator is normally a member already; join and confirm only if Slack says otherwise
+        if not channel.get("is_member"):
+            joined = await slack.api_call("conversations.join", channel=channel_id)
+            if not joined["channel"].get("is_member"):
+                await wait_for_membership(slack, channel_id)
+            logger.info(f"Bot joined the channel: {channel_id}")
+
+        elapsed = time.monotonic() - started
+        record_latency("slack.provision_channel", elapsed)
+        logger.info("Provisioned channel %s in %.2f seconds", channel_id, elapsed)
+        return channel_id
+
+    except HTTPException:
+        raise
 
     except SlackApiError as e:
         logger.error(f"Slack API error in create_slack_channel: {e.response['error']}")
         logger.error(f"Full error response: {e.response}")
-        if e.response["error"] == "ratelimited":
-            retry_after = int(e.response["headers"].get("Retry-After", 1))
-            logger.info(f"Rate limited. Retrying after {retry_after} seconds")
-            await asyncio.sleep(retry_after)
-            return await create_slack_channel(channel_name)
-
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Slack API error: {e.response['error']}",
@@ -130,7 +153,7 @@ async def create_slack_channel(channel_name: str) -> str:
             detail=f"Unexpected error: {str(e)}",
         ) from e
 
-async def open_slack_response_modal(trigger_id:str,modal_type:dict,incident_data:dict):
+async def open_slack_response_modal(slack: SlackClient, trigger_id:str,modal_type:dict,incident_data:dict):
     try:
         modal_payload=None
         if modal_type == "success":
@@ -196,7 +219,7 @@ async def open_slack_response_modal(trigger_id:str,modal_type:dict,incident_data
                                     "text": "📄 View Jira Ticket",
                                     "emoji": True
                                 },
-                                "url": f"{settings.jira_server}/browse/{incident_data.get('so_number')}",
+                                "url": incident_data.get("jira_url") or f"{get_settings().jira_server}/browse/{incident_data.get('so_number')}",
                                 "action_id": "view_jira"
                             }
                         ]
@@ -244,8 +267,8 @@ async def open_slack_response_modal(trigger_id:str,modal_type:dict,incident_data
             raise ValueError(f"Invalid modal type: {modal_type}")
         
         #Opening the modal
-        response = await run_in_executor(
-            slack_client.views_open,
+        response = await slack.api_call(
+            "views.open",
             trigger_id=trigger_id,
             view=modal_payload
         )
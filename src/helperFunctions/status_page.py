@@ -2,7 +2,6 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from fastapi import HTTPException,status
 from pydantic import BaseModel, Field, ValidationError
-import requests
 import logging
 from sqlalchemy.orm import Session
 from fastapi import Depends
@@ -11,10 +10,15 @@ from src import models
 from src.schemas import IncidentBase
 from src.database import get_db
 import httpx
+from src.helperFunctions.http_client import get_http_client
+from src.outbox.queue import run_sync
 
 
 settings = get_settings()
 
+# Statuses an incident can be moved to from Slack, the ones Statuspage knows
+INCIDENT_STATUSES = ("investigating", "identified", "monitoring", "resolved")
+
 class StatuspageCreationResponse(BaseModel):
     incident_id: str
     so_number: str
@@ -28,6 +32,15 @@ class StatuspageStatusUpdate(BaseModel):
 
 #Create statuspage incident
 async def create_statuspage_incident(incident_data,settings,db: Session = Depends(get_db)):
+    #A retry of an incident that already has its Statuspage incident must not open a second one
+    if incident_data.statuspage_incident_id:
+        logging.info(f"Statuspage incident {incident_data.statuspage_incident_id} already exists for {incident_data.so_number}")
+        return StatuspageCreationResponse(
+            incident_id=str(incident_data.id),
+            so_number=incident_data.so_number,
+            statuspage_incident_id=incident_data.statuspage_incident_id
+        )
+
     headers = {
         "Authorization": f"Bearer {settings.statuspage_api_key}",
         "Content-Type":"application/json",
@@ -82,13 +95,11 @@ async def create_statuspage_incident(incident_data,settings,db: Session = Depend
     
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.statuspage_url}/{settings.statuspage_page_id}/incidents",
-                headers=headers,
-                json=incident_payload,
-                timeout=10
-            )
+        response = await get_http_client("statuspage").post(
+            f"{settings.statuspage_url}/{settings.statuspage_page_id}/incidents",
+            headers=headers,
+            json=incident_payload,
+        )
             
         # Log the response for debugging
         logging.info(f"Statuspage response: {response.status_code} - {response.text}")
@@ -101,9 +112,9 @@ async def create_statuspage_incident(incident_data,settings,db: Session = Depend
     
         #Saving the incident ID for future reference to update the incident status in the statuspage
         statuspage_incident_id = str(response_data['id'])
+        #Committed by the caller, e.g. together with the outbox job that runs this
         incident_data.statuspage_incident_id = statuspage_incident_id
-        db.commit()
-        db.refresh(incident_data)
+        await run_sync(db, db.flush)
         
         
         # Return simplified response
@@ -140,16 +151,10 @@ async def update_statuspage_incident_status(
           detail="No statuspage incident ID found in the database."
     )
       
-    valid_statuses = {
-        "investigating", 
-        "identified", 
-        "monitoring", 
-        "resolved"
-    }
-    if new_status.lower() not in valid_statuses:
+    if new_status.lower() not in INCIDENT_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+            detail=f"Invalid status. Must be one of: {', '.join(INCIDENT_STATUSES)}"
         )
     
     headers = {
@@ -175,13 +180,12 @@ async def update_statuspage_incident_status(
     }
     #updating the statuspage
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{settings.statuspage_url}/{settings.statuspage_page_id}/incidents/{db_incident.statuspage_incident_id}",
-                headers=headers,
-                json=update_payload,
-                timeout=60
-            )
+        response = await get_http_client("statuspage").patch(
+            f"{settings.statuspage_url}/{settings.statuspage_page_id}/incidents/{db_incident.statuspage_incident_id}",
+            headers=headers,
+            json=update_payload,
+            timeout=60
+        )
         if response.status_code != 200:
             error_message = f"Failed to update statuspage incident: Status {response.status_code}"
             try:
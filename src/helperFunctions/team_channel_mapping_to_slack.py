@@ -1,13 +1,6 @@
 import logging
+from typing import Dict, FrozenSet, Iterable, List
 
-logging.basicConfig(
-    level=logging.INFO,  # Set the level to DEBUG for more verbosity
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Outputs logs to the console
-        logging.FileHandler("app.log")  # Optionally log to a file
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
@@ -53,27 +46,46 @@ TEAM_SLACK_CHANNEL_MAPPING = {
     "Volleyball On Court":"",
     "Volleyball Competition Manager":"",
 }
-  
-   
+
+
+def normalize_team_name(team_name: str) -> str:
+    return team_name.strip().lower()
+
+
+def build_team_routing_index(mapping: Dict[str, str]) -> Dict[str, FrozenSet[str]]:
+    """Normalized team name -> the channels to notify for it. Teams without a channel are left out."""
+    index: Dict[str, set] = {}
+    for team_name, channel_id in mapping.items():
+        if channel_id:
+            index.setdefault(normalize_team_name(team_name), set()).add(channel_id)
+    return {team: frozenset(channels) for team, channels in index.items()}
+
+
+# Built once at import; several teams share a channel
+TEAM_ROUTING_INDEX = build_team_routing_index(TEAM_SLACK_CHANNEL_MAPPING)
+
+
 def get_slack_channel_id_for_team(team_name:str) -> str | None:
-    
-    #normalizing the input team name
-    normalized_team_name = team_name.strip().lower()
-    
-    #Debugging
-    logger.debug(f"Looking up channel for normalized team name: {normalized_team_name}")
-    logger.debug(f"Available mappings: {TEAM_SLACK_CHANNEL_MAPPING}")
-    
-    #normalized mapping for case insensitive cmaprison
-    normalized_mapping = {k.strip().lower(): v for k, v in TEAM_SLACK_CHANNEL_MAPPING.items()}
-    
-    #Channel ID look up
-    channel_id = normalized_mapping.get(normalized_team_name)
-    
-    if channel_id:
-        logger.debug(f"Found channel ID: {channel_id}")
-    else:
-        logger.warning(f"No channel ID found for team: {team_name}")
-    
-    return channel_id
+    channels = TEAM_ROUTING_INDEX.get(normalize_team_name(team_name))
+    if not channels:
+        logger.warning("No channel ID found for team: %s", team_name)
+        return None
+    return min(channels)
+
+
+def route_teams(team_names: Iterable[str]) -> Dict[str, List[str]]:
+    """Group teams by the channel that notifies them, so every channel is posted to once.
 
+    Channels come out in the order their first team was given.
+    """
+    routes: Dict[str, List[str]] = {}
+    for team_name in team_names:
+        channels = TEAM_ROUTING_INDEX.get(normalize_team_name(team_name))
+        if not channels:
+            logger.warning("No channel ID found for team: %s", team_name)
+            continue
+        for channel_id in sorted(channels):
+            teams = routes.setdefault(channel_id, [])
+            if team_name not in teams:
+                teams.append(team_name)
+    return routes
@@ -2,12 +2,12 @@ import json
 import logging
 import os
 from fastapi import HTTPException
-import httpx
 from typing import Dict, Any
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from urllib.parse import parse_qs
-from src.utils import verify_slack_request, get_modal_view, create_modal_view, update_modal_view
+from src.utils import verify_slack_request
+from src.handlers.entry import dispatch_command, http_exception_to_lambda_response, to_lambda_response
+from src.handlers.payloads import SlashCommand
 from config import get_settings, Settings
 
 logger = Logger()
@@ -30,20 +30,17 @@ async def handler(event: Dict[Any, Any], context: LambdaContext) -> Dict[str, An
     
     settings = get_settings()
     try:
-        # Get and decode body if needed
+        # Parse the form once, the handlers share the parsed object
         body = event['body']
-        if isinstance(body, bytes):
-            body = body.decode('utf-8')
-            
-        # Parse form data
-        if isinstance(body, str):
-            form_data = dict(parse_qs(body))
-            form_data = {k: v[0] for k, v in form_data.items()}
+        if isinstance(body, dict):
+            slash_command = SlashCommand(body)
+            body_bytes = None
         else:
-            form_data = body
+            body_bytes = body.encode('utf-8') if isinstance(body, str) else body
+            slash_command = SlashCommand.from_body(body_bytes)
             
-        command = form_data.get("command")
-        trigger_id = form_data.get("trigger_id")
+        command = slash_command.command
+        trigger_id = slash_command.trigger_id
         
         if not command or not trigger_id:
             return {
@@ -70,79 +67,14 @@ async def handler(event: Dict[Any, Any], context: LambdaContext) -> Dict[str, An
         headers = event['headers']
         x_slack_signature = headers.get('x-slack-signature')
         x_slack_request_timestamp = headers.get("x-slack-request-timestamp")
+        await verify_slack_request(body_bytes or b"", x_slack_signature, x_slack_request_timestamp, settings)
             
-        # Convert back to bytes for verification
-        body_bytes = body.encode('utf-8') if isinstance(body, str) else body
-        await verify_slack_request(body_bytes, x_slack_signature, x_slack_request_timestamp, settings)
-            
-        # Verify token
-        token = form_data.get("token")
-        if token != settings.SLACK_VERIFICATION_TOKEN:
-            return {
-                "statusCode": 401,
-                "body": json.dumps({"error": "Invalid token"})
-            }
-        
-       
-        # Set up Slack headers
-        slack_headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}",
-        }
-        
-        # Handle different commands
-        if command == "/get-incident":
-            logger.info("Handling /get-incident command")
-            modal_view = await get_modal_view(callback_id="so_lookup_form")
-        elif command == "/create-incident":
-            logger.info("Handling /create-incident command")
-            suggested_so_number = "SO-1234"
-            modal_view = await create_modal_view(
-                callback_id="incident_form",
-                suggested_so_number=suggested_so_number,
-            )
-        elif command == "/update-incident":
-            logger.info("Handling /update-incident command")
-            modal_view = await update_modal_view(callback_id="statuspage_update")
-        else:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "Invalid command"})
-            }
-            
-        # Open modal in Slack
-        payload = {"trigger_id": trigger_id, "view": modal_view}
-        
         try:
-            async with httpx.AsyncClient() as client:
-                slack_response = await client.post(
-                    "https://slack.com/api/views.open",
-                    headers=slack_headers,
-                    json=payload,
-                    timeout=3
-                )
-                slack_response.raise_for_status()
-                slack_response_data = slack_response.json()
-                
-                if not slack_response_data.get("ok"):
-                    raise HTTPException(
-                        status_code=500,
-                        detail=slack_response_data.get("error", "Unknown Slack API error")
-                    )
-                
-                return {
-                    "statusCode": 200,
-                    "body": json.dumps({
-                        "response_type": "ephemeral",
-                        "text": "Form opened successfully"
-                    })
-                }
-        except Exception as e:
-            logger.error(f"Error opening Slack modal: {str(e)}")
-            return {
-                'statusCode': 500,
-                'body': json.dumps({'error': f"Failed to open form: {str(e)}"})
-            }   
+            result = await dispatch_command(slash_command, settings, retry_num=headers.get("x-slack-retry-num"))
+        except HTTPException as e:
+            logger.error(f"Error handling {command}: {e.detail}")
+            return http_exception_to_lambda_response(e)
+        return await to_lambda_response(result)
             
     except Exception as e:
         logger.error(f"Error processing command: {str(e)}")
@@ -4,10 +4,11 @@ import os
 from typing import Dict,Any
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from urllib.parse import parse_qs
 from config import get_settings
+from fastapi import HTTPException
 from src.utils import verify_slack_request
-from .form_handlers import handle_incident_form,handle_lookup_form,handle_statuspage_update
+from src.handlers.entry import dispatch_interaction, http_exception_to_lambda_response, to_lambda_response
+from src.handlers.payloads import Interaction
 
 
 logger = Logger()
@@ -30,70 +31,34 @@ async def handler(event:Dict[Any,Any],context:LambdaContext) ->Dict[str,Any]:
     
     try:
         body=event['body']
-        if isinstance(body,bytes):
-            body = body.decode('utf-8')
+        body_bytes = body.encode('utf-8') if isinstance(body, str) else body
             
         # Skip verification in test mode but continue with form processing
         if not test_mode:
             headers = event['headers']
             x_slack_signature = headers.get('x-slack-signature')
             x_slack_request_timestamp = headers.get('x-slack-request-timestamp')
-            body_bytes = body.encode('utf-8') if isinstance(body, str) else body
             await verify_slack_request(body_bytes, x_slack_signature, x_slack_request_timestamp, settings)
             
-         #Parsing payload
-        decoded_body = parse_qs(body)
-        payload_str = decoded_body.get("payload",[None])[0]
-        
-        if not payload_str:
-            return {
-                "statusCode":400,
-                "body":json.dumps({"error":"Missing payload"})
-            }
-
-        #Now parsing the json payload
+        #Parsing the payload once, the handlers share the parsed object
         try:
-            payload = json.loads(payload_str)
-            logger.debug(f"Parsed payload: {json.dumps(payload, indent=2)}")
-        except json.JSONDecodeError as e:
-            return {
-                "statusCode":400,
-                "body":json.dumps({"error":f"Failed to parse payload: {str(e)}"})
-            }
-            
-        #Validating the token
-        token = payload.get("token")
-        if not test_mode and token != settings.SLACK_VERIFICATION_TOKEN:
-            return {
-                "statusCode":401,
-                "body":json.dumps({"error":"Invalid token"})
-            }
+            interaction = Interaction.from_body(body_bytes)
+        except HTTPException as e:
+            return http_exception_to_lambda_response(e)
+        logger.debug("Parsed payload", extra={"payload": interaction.data})
             
-        #Extracting common fields
-        
-        user_id = payload.get("user",{}).get("id")
-        trigger_id = payload.get("trigger_id")
-        callback_id = payload.get("view",{}).get("callback_id")
-        
-        
-        #Routing to the related handler based on interaction type
-        if payload.get("type") == "view_submission":
-            if callback_id == "incident_form":
-                return await handle_incident_form(payload,settings)
-            elif callback_id == "so_lookup_form" :
-                return await handle_lookup_form(payload,settings)
-            elif callback_id == "statuspage_update":
-                return await handle_statuspage_update(payload,settings)
-            else:
-                return {
-                    "statusCode":400,
-                    "body":json.dumps({"error":f"Unknown callback_id: {callback_id}"})
-                }
-        
-        return {
-            "statusCode":200,
-            "body":json.dumps({"response":"success"})
-        }
+        #Routing to the related handler through the shared registry
+        try:
+            result = await dispatch_interaction(
+                interaction,
+                settings,
+                verify_token=not test_mode,
+                retry_num=event.get("headers", {}).get("x-slack-retry-num"),
+            )
+        except HTTPException as e:
+            logger.error(f"Error handling interaction: {e.detail}")
+            return http_exception_to_lambda_response(e)
+        return await to_lambda_response(result)
     
     except Exception as e:
         logger.error(f"Error processing interaction: {str(e)}")
@@ -1,11 +1,29 @@
 import os
+from config import get_settings, Settings
+from src.helperFunctions.logging_config import configure_logging
+
+#Logging configuration, configured once for the whole app before the modules below log anything
+settings = get_settings()
+configure_logging(settings.LOG_LEVEL, settings.LOG_FILE, settings.LOG_JSON)
+
 from fastapi import FastAPI, Request,Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse, RedirectResponse
-from src.routers import incident  # type: ignore
+from src.routers import incident, incidents  # type: ignore
 from src.utils import initialize_options
 from src.helperFunctions.slack_utils import test_slack_integration
-from config import get_settings, Settings
+from src.helperFunctions.slack_client import get_slack_client
+from src.helperFunctions.http_client import get_http_client, start_http_transport, close_http_transport
+from src.helperFunctions.ack_dispatch import drain_tracked_tasks
+from src.helperFunctions.metrics import latency_snapshot
+from src.helperFunctions.slack_rate_limit import slack_scheduler
+from src.helperFunctions.incident_cache import incident_cache
+from src.helperFunctions.incident_events import ensure_event_partitions
+from src.handlers.idempotency import DB_ERRORS, delivery_store
+from src.middleware.api_key import require_api_key
+from src.outbox import start_outbox_worker, stop_outbox_worker
 import os
 import logging
 from fastapi.logger import logger as fastapi_logger
@@ -14,22 +32,13 @@ from src.models import UserToken
 from src import schemas
 from src.database import get_db
 from src.utils import encrypt_token
-from .database import get_db,SessionLocal
+from .database import get_db,SessionLocal,get_async_db,async_engine
 from cryptography.fernet import Fernet
 import asyncio
 from fastapi import HTTPException, status,Depends
 import json
 
-#Logging configuration
 schemas.IncidentResponse.Config()
-logging.basicConfig(
-    level=logging.INFO,  # Set the level to DEBUG for more verbosity
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Outputs logs to the console
-        logging.FileHandler("app.log")  # Optionally log to a file
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
@@ -37,9 +46,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 app.include_router(incident.router)
+app.include_router(incidents.router)
 
 
-settings = get_settings()
 encryption_key= settings.ENCRYPTION_KEY
 cipher = Fernet(encryption_key.encode())
 
@@ -82,15 +91,50 @@ cipher = Fernet(encryption_key.encode())
 @app.on_event("startup")
 async def startup_event():
     await initialize_options()
+    await start_http_transport()
+    try:
+        purged = await delivery_store.purge_expired()
+        logger.info(f"Purged {purged} expired Slack delivery records")
+    except DB_ERRORS as e:
+        logger.warning(f"Could not purge expired Slack delivery records: {e}")
+    try:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(ensure_event_partitions)
+    except DB_ERRORS as e:
+        logger.warning(f"Could not create the coming incident_events partitions: {e}")
+    await start_outbox_worker(settings.OUTBOX_WORKER_CONCURRENCY, settings.OUTBOX_POLL_SECONDS)
     # Fetch and save teams
     # await fetch_and_save_teams()
     # logging.info("Teams data successfully fetched and saved to options.json")
     
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_outbox_worker()
+    await drain_tracked_tasks()
+    await close_http_transport()
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
 
+
+@app.get("/metrics/latency", dependencies=[Depends(require_api_key)])
+async def latency_metrics():
+    return latency_snapshot()
+
+
+@app.get("/metrics/slack", dependencies=[Depends(require_api_key)])
+async def slack_metrics():
+    return slack_scheduler.snapshot()
+
+
+@app.get("/metrics/incident-cache", dependencies=[Depends(require_api_key)])
+async def incident_cache_metrics():
+    return incident_cache.snapshot()
+
 """
 Below Code was used for testing purposes but still is kept for future debugging purposes
 """
@@ -114,93 +158,93 @@ async def slack_login():
     return RedirectResponse(slack_auth_url)
 
 @app.get("/slack/oauth/callback")
-async def slack_oauth_callback(request:Request, db:Session=Depends(get_db)):
+async def slack_oauth_callback(request:Request, db:AsyncSession=Depends(get_async_db)):
     code = request.query_params.get("code")
     
     logging.info(f"Authorization code received: {code}")
     
     if not code:
         return {"error": "No authorization code received"}
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            settings.SLACK_TOKEN_URL,
-            data = {
-                "client_id": settings.SLACK_CLIENT_ID,
-                "client_secret": settings.SLACK_CLIENT_SECRET,
-                "code": code,
-                "redirect_uri": settings.SLACK_REDIRECT_URI
-            }
-        )
-        
-        token_data = response.json()
-        
-        logging.info(f"Slack response Data: {token_data}")
-        if "error" in token_data:
-            logging.error(f"Slack API returned an error:{token_data["error"]}")
-            return {"error":token_data['error']}
-        
-        access_token = token_data.get("access_token")
-        authed_user = token_data.get("authed_user")
-        if authed_user:
-            user_id = authed_user.get("id")
-            
-        else:
-            user_id=None
-        
-        #Checking exceptions for the user
-        if not user_id or not access_token:
-            logging.error("Failed to retrieve access_token or user_dataaaa")
-            return {"error": "Failed to retrieve access token or user dataaaaa"}
-        
-        
-        #Writing the access token to db
-        encrypted_token = cipher.encrypt(access_token.encode()).decode()
-        
-        #checking if the token already is in the database
-        is_token_exist = db.query(UserToken).filter(UserToken.user_id == user_id).first()
-        
-        if is_token_exist:
-            is_token_exist.encrypted_token = encrypted_token
-            db.commit()
-            logging.info(f"Updated token for user_id :{user_id}")
-        else:
-            #add new token to the database
-            admin_exists = db.query(UserToken).filter(UserToken.role == "admin").first()
-            role = "user" if admin_exists else "admin"
-            db_token = UserToken(user_id = user_id,encrypted_token=encrypted_token,role=role)
-            db.add(db_token)
-            db.commit()
-            logging.info(f"The new token for user_id :{user_id} and {role}")
-            
-       
-    
-     
-        #Now sending the message to the user in slack
-        send_message_url = "https://slack.com/api/chat.postMessage"
-        headers = {"Authorization":f"Bearer {access_token}"}
+    client = get_http_client("slack")
+    response = await client.post(
+        settings.SLACK_TOKEN_URL,
         data = {
-            "channel":user_id,
-            "text":"You’ve successfully authenticated! You can now use CRISIS app to create incidents.You can now create and view incidents in the #gs-service-outages channel.Good luck!",
-            "as_user":True
+            "client_id": settings.SLACK_CLIENT_ID,
+            "client_secret": settings.SLACK_CLIENT_SECRET,
+            "code": code,
+            "redirect_uri": settings.SLACK_REDIRECT_URI
         }
+    )
+    
+    token_data = response.json()
+    
+    logging.info(f"Slack response Data: {token_data}")
+    if "error" in token_data:
+        logging.error(f"Slack API returned an error:{token_data["error"]}")
+        return {"error":token_data['error']}
+    
+    access_token = token_data.get("access_token")
+    authed_user = token_data.get("authed_user")
+    if authed_user:
+        user_id = authed_user.get("id")
         
-        #Additional step : sending the messagr to the user itself
-        message_response = await client.post(send_message_url,headers=headers,json = data)
-        if message_response.status_code != 200 or not message_response.json().get('ok'):
-            raise HTTPException(status_code=500,detail="Failed to send slack message")
-            
-        return {"message":"Authentication successful"}
-
-        
+    else:
+        user_id=None
+    
+    #Checking exceptions for the user
+    if not user_id or not access_token:
+        logging.error("Failed to retrieve access_token or user_dataaaa")
+        return {"error": "Failed to retrieve access token or user dataaaaa"}
+    
+    
+    #Writing the access token to db
+    encrypted_token = cipher.encrypt(access_token.encode()).decode()
+    
+    #checking if the token already is in the database
+    is_token_exist = (await db.execute(select(UserToken).where(UserToken.user_id == user_id))).scalars().first()
+    
+    if is_token_exist:
+        is_token_exist.encrypted_token = encrypted_token
+        await db.commit()
+        logging.info(f"Updated token for user_id :{user_id}")
+    else:
+        #add new token to the database
+        admin_exists = (await db.execute(select(UserToken).where(UserToken.role == "admin"))).scalars().first()
+        role = "user" if admin_exists else "admin"
+        db_token = UserToken(user_id = user_id,encrypted_token=encrypted_token,role=role)
+        db.add(db_token)
+        await db.commit()
+        logging.info(f"The new token for user_id :{user_id} and {role}")
         
-          
+
+
+
+    #Now sending the message to the user in slack
+    send_message_url = "https://slack.com/api/chat.postMessage"
+    headers = {"Authorization":f"Bearer {access_token}"}
+    data = {
+        "channel":user_id,
+        "text":"You’ve successfully authenticated! You can now use CRISIS app to create incidents.You can now create and view incidents in the #gs-service-outages channel.Good luck!",
+        "as_user":True
+    }
+    
+    #Additional step : sending the messagr to the user itself
+    message_response = await client.post(send_message_url,headers=headers,json = data)
+    if message_response.status_code != 200 or not message_response.json().get('ok'):
+        raise HTTPException(status_code=500,detail="Failed to send slack message")
         
+    return {"message":"Authentication successful"}
+
+    
+    
+      
+    
     return {"error": "Failed to retrieve access token"}
 
 
 @app.get("/slack/user/{user_id}")
-async def get_user_token(user_id: str, db: Session = Depends(get_db)):
-    token_entry = db.query(UserToken).filter(UserToken.user_id == user_id).first()
+async def get_user_token(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    token_entry = (await db.execute(select(UserToken).where(UserToken.user_id == user_id))).scalars().first()
     
     if token_entry:
         decrypted_token = cipher.decrypt(token_entry.encrypted_token.encode()).decode()
@@ -215,4 +259,4 @@ if __name__ == "__main__":
     import asyncio
 
     asyncio.run(startup_event())
-    asyncio.run(test_slack_integration())
+    asyncio.run(test_slack_integration(get_slack_client(), settings.SLACK_GENERAL_OUTAGES_CHANNEL))
@@ -0,0 +1,32 @@
+import hmac
+import logging
+from typing import Optional
+from fastapi import HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+from config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+async def require_api_key(api_key: Optional[str] = Security(api_key_header)):
+    """Let a request through only with the configured API_KEY in its X-API-Key header.
+
+    Without an API_KEY configured every request is refused, so the incident data
+    is never public by accident.
+    """
+    if not settings.API_KEY:
+        logger.error("API_KEY is not configured, refusing the request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="API access is not configured",
+        )
+    if api_key is None or not hmac.compare_digest(api_key.encode(), settings.API_KEY.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing API key",
+            headers={"WWW-Authenticate": "X-API-Key"},
+        )
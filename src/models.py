@@ -1,15 +1,22 @@
 from .database import Base
 from datetime import datetime
-from sqlalchemy import Column,Integer,String,Boolean,DateTime
+from sqlalchemy import BigInteger,Column,Computed,Date,Float,ForeignKey,Index,Integer,String,Boolean,DateTime,Sequence,Text,func
 from sqlalchemy.ext.declarative import declarative_base 
-from sqlalchemy.dialects.postgresql import ARRAY 
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy import Column, Enum as SQLAlchemyEnum
+from sqlalchemy.orm import deferred
 from enum import Enum
 
 Base = declarative_base()
 
 
 
+# Source of SO numbers, see src/helperFunctions/generate_next_so_number.py
+so_number_seq = Sequence("so_number_seq", metadata=Base.metadata)
+# Ids of incident_events rows, unique across all of its partitions
+incident_events_id_seq = Sequence("incident_events_id_seq", metadata=Base.metadata)
+
+
 class UserRole(str,Enum):
     USER = "USER"
     SUPPORT = "SUPPORT"
@@ -23,7 +30,7 @@ class Incident(Base):
     affected_products = Column(ARRAY(String), nullable=False)
     severity = Column(ARRAY(String), nullable=False)
     suspected_owning_team = Column(ARRAY(String), nullable=False)
-    start_time = Column(DateTime, nullable=False)
+    start_time = Column(DateTime, index=True, nullable=False)
     end_time = Column(DateTime, nullable=False)
     p1_customer_affected = Column(Boolean, default=False, nullable=False)
     suspected_affected_components = Column(ARRAY(String), nullable=False)
@@ -32,14 +39,37 @@ class Incident(Base):
     statuspage_notification = Column(Boolean, default=False, nullable=False)
     separate_channel_creation = Column(Boolean, default=False, nullable=False)
     status = Column(String(50), index=True, nullable=True)
-    created_at = Column(DateTime, nullable=True, default=datetime.now()) 
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
     jira_issue_key = Column(String(250), nullable=True,unique=True)
     statuspage_incident_id = Column(String(250), nullable=True)
+    # Full-text search document, kept up to date by Postgres, see src/helperFunctions/incident_search.py
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(message_for_sp, '')), 'B')",
+        persisted=True,
+    )))
+
+    __table_args__ = (
+        # Case-insensitive SO number lookups, see src/helperFunctions/incident_cache.py
+        Index("ix_service_incidents_so_number_upper", func.upper(so_number)),
+        # Containment (@>) and overlap (&&) filters, see src/helperFunctions/incident_queries.py
+        Index("ix_service_incidents_affected_products_gin", affected_products, postgresql_using="gin"),
+        Index("ix_service_incidents_severity_gin", severity, postgresql_using="gin"),
+        Index("ix_service_incidents_suspected_owning_team_gin", suspected_owning_team, postgresql_using="gin"),
+        Index("ix_service_incidents_suspected_affected_components_gin", suspected_affected_components, postgresql_using="gin"),
+        # Keyset pagination of GET /incidents
+        Index("ix_service_incidents_created_at_id", created_at, id),
+        Index("ix_service_incidents_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     def __repr__(self):
         return f"<Incident(id={self.id}, affected_products={self.affected_products}, severity={self.severity}, start_time={self.start_time}, end_time={self.end_time}, status={self.status}), created_at={self.created_at}), jira_issue_key={self.jira_issue_key}>"
     
     
+# Stored columns of an incident, without the ones Postgres generates
+INCIDENT_DATA_COLUMNS = tuple(column for column in Incident.__table__.columns if column.computed is None)
+
+
 class UserToken(Base):
     __tablename__ = "user_tokens"
     
@@ -47,7 +77,80 @@ class UserToken(Base):
     user_id = Column(String(250),unique=True, index=True, nullable=False)
     encrypted_token = Column(String(250), index=True, nullable=False)
     role = Column(SQLAlchemyEnum(UserRole), default=UserRole.USER,nullable=True,index=True) 
-    created_at = Column(DateTime, nullable=True, default=datetime.now())    
-  
-  
-  
\ No newline at end of file
+    created_at = Column(DateTime, nullable=True, default=datetime.now())
+
+
+class SlackDelivery(Base):
+    """A Slack command or view submission that was already handled, so retries can be answered from here."""
+    __tablename__ = "slack_deliveries"
+
+    idempotency_key = Column(String(255), primary_key=True)
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    # When the handler holding the delivery claimed it, see IN_FLIGHT_LEASE in src/handlers/idempotency.py
+    started_at = Column(DateTime, nullable=False, default=datetime.now)
+
+
+class OutboxJob(Base):
+    """One side-effect step waiting to run, see src/outbox."""
+    __tablename__ = "outbox_jobs"
+
+    id = Column(BigInteger, primary_key=True)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_jobs_status_run_after", "status", "run_after"),
+    )
+
+
+class IncidentEvent(Base):
+    """One entry of an incident's timeline, see src/helperFunctions/incident_events.py.
+
+    Rows are only ever inserted. The table is partitioned by month of occurred_at,
+    which is why it is part of the primary key.
+    """
+    __tablename__ = "incident_events"
+
+    id = Column(BigInteger, incident_events_id_seq, primary_key=True)
+    occurred_at = Column(DateTime, primary_key=True, default=datetime.now)
+    incident_id = Column(Integer, ForeignKey("service_incidents.id"), nullable=False)
+    event_type = Column(String(50), nullable=False)
+    source = Column(String(50), nullable=False)
+    actor = Column(String(250), nullable=True)
+    from_status = Column(String(50), nullable=True)
+    to_status = Column(String(50), nullable=True)
+    details = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        Index("ix_incident_events_incident_id_occurred_at", "incident_id", "occurred_at", "id"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+
+class IncidentDailyStat(Base):
+    """Running totals of the incidents that started on one day, see src/helperFunctions/incident_stats.py.
+
+    team, product and severity hold one value each, or "*" in the rows totalling
+    over that dimension, so an incident with several values is still counted once.
+    """
+    __tablename__ = "incident_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    team = Column(String(250), primary_key=True)
+    product = Column(String(250), primary_key=True)
+    severity = Column(String(250), primary_key=True)
+    incidents = Column(Integer, nullable=False, default=0)
+    customer_affected = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+    resolution_seconds = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,2 @@
+from src.outbox.queue import enqueue_job, enqueue_job_async, job, notify_listeners, replay_job, run_sync
+from src.outbox.worker import OutboxWorker, PermanentJobError, process_outbox, start_outbox_worker, stop_outbox_worker
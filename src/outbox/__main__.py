@@ -0,0 +1,99 @@
+"""Inspect, replay and drain outbox jobs.
+
+    python -m src.outbox list [--status failed] [--type incident.stage] [--limit 20]
+    python -m src.outbox show <id>
+    python -m src.outbox replay <id> [<id> ...]
+    python -m src.outbox worker [--concurrency 4]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from sqlalchemy import select
+from config import get_settings
+from src.database import SessionLocal
+from src.handlers import jobs  # noqa: F401 (registers the job types)
+from src.models import OutboxJob
+from src.outbox.queue import replay_job
+from src.helperFunctions.logging_config import configure_logging
+from src.outbox.worker import OutboxWorker
+
+
+def list_jobs(args):
+    query = select(OutboxJob).order_by(OutboxJob.id.desc()).limit(args.limit)
+    if args.status:
+        query = query.where(OutboxJob.status == args.status)
+    if args.type:
+        query = query.where(OutboxJob.job_type == args.type)
+    with SessionLocal() as db:
+        for row in db.execute(query).scalars():
+            error = (row.last_error or "")[:80]
+            print(f"{row.id:>8}  {row.status:<8} {row.job_type:<24} {row.attempts}/{row.max_attempts}  {row.created_at:%Y-%m-%d %H:%M:%S}  {error}")
+
+
+def show_job(args):
+    with SessionLocal() as db:
+        row = db.get(OutboxJob, args.id)
+        if row is None:
+            sys.exit(f"No outbox job with id {args.id}")
+        print(json.dumps({
+            column.name: getattr(row, column.name) for column in OutboxJob.__table__.columns
+        }, indent=2, default=str))
+
+
+def replay_jobs(args):
+    with SessionLocal() as db:
+        for job_id in args.ids:
+            try:
+                replay_job(db, job_id)
+                print(f"Job {job_id} queued again")
+            except LookupError as e:
+                print(e)
+
+
+def run_worker(args):
+    settings = get_settings()
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FILE, settings.LOG_JSON)
+
+    async def main():
+        worker = OutboxWorker(concurrency=args.concurrency)
+        worker.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await worker.stop()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.outbox", description="Inspect and replay outbox jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List recent jobs")
+    list_parser.add_argument("--status", choices=["pending", "running", "done", "failed"])
+    list_parser.add_argument("--type")
+    list_parser.add_argument("--limit", type=int, default=20)
+    list_parser.set_defaults(func=list_jobs)
+
+    show_parser = commands.add_parser("show", help="Show one job with its payload and last error")
+    show_parser.add_argument("id", type=int)
+    show_parser.set_defaults(func=show_job)
+
+    replay_parser = commands.add_parser("replay", help="Queue jobs again from their first attempt")
+    replay_parser.add_argument("ids", type=int, nargs="+")
+    replay_parser.set_defaults(func=replay_jobs)
+
+    worker_parser = commands.add_parser("worker", help="Run a standalone worker")
+    worker_parser.add_argument("--concurrency", type=int, default=4)
+    worker_parser.set_defaults(func=run_worker)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
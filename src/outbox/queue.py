@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import random
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.models import OutboxJob
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+# Retry n waits BACKOFF_BASE_SECONDS * 2**(n-1), capped and jittered
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 300.0
+# A running job whose worker has not finished it within this is assumed lost and claimed again
+DEFAULT_LEASE = timedelta(minutes=5)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobType:
+    __slots__ = ("name", "func", "timeout", "max_attempts", "on_failure", "on_error")
+
+    def __init__(self, name: str, func: Callable, timeout: Optional[float], max_attempts: int,
+                 on_failure: Optional[Callable], on_error: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+        self.on_error = on_error
+
+
+job_types: Dict[str, JobType] = {}
+
+
+def job(name: str, timeout: Optional[float] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        on_failure: Optional[Callable] = None, on_error: Optional[Callable] = None):
+    """Register an async `func(payload, db)` as the runner of `name` jobs.
+
+    `db` is a sync session opened for this attempt only; runners and hooks do their
+    queries and flushes through `run_sync`. `on_error(payload, error, db)`
+    runs after every failed attempt, once the attempt's changes are rolled back;
+    what it adds to `db` is committed with the retry bookkeeping.
+    `on_failure(payload, error, db)` runs once the last attempt has failed.
+    A runner raising PermanentJobError fails the job without further attempts.
+    """
+
+    def decorator(func):
+        if name in job_types:
+            raise ValueError(f"A job type is already registered for {name}")
+        job_types[name] = JobType(name, func, timeout, max_attempts, on_failure, on_error)
+        return func
+
+    return decorator
+
+
+class ClaimedJob:
+    """Snapshot of a claimed row, safe to use after its session is gone."""
+
+    __slots__ = ("id", "job_type", "payload", "attempts", "max_attempts")
+
+    def __init__(self, row: OutboxJob):
+        self.id = row.id
+        self.job_type = row.job_type
+        self.payload = row.payload
+        self.attempts = row.attempts
+        self.max_attempts = row.max_attempts
+
+
+# The job being run by the current task, e.g. for a runner to tell a retry from a first attempt
+current_job: ContextVar[Optional[ClaimedJob]] = ContextVar("current_job", default=None)
+
+# session.info key of the lock serializing a job session's calls across threads
+SESSION_LOCK = "outbox_session_lock"
+
+
+async def run_sync(db: Session, func: Callable, *args, **kwargs):
+    """Run blocking database work of a job, `func(*args, **kwargs)` on `db`, on a worker thread.
+
+    Jobs run on the API's event loop, which must not wait on the database. Calls
+    on one session run one at a time, also when a timed out job left one behind.
+    """
+    lock = db.info.setdefault(SESSION_LOCK, threading.Lock())
+
+    def call():
+        with lock:
+            return func(*args, **kwargs)
+
+    return await asyncio.to_thread(call)
+
+
+# (loop, event) of the workers running in this process, woken up on enqueue
+_listeners: List[tuple] = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(loop: asyncio.AbstractEventLoop, event: asyncio.Event):
+    with _listeners_lock:
+        _listeners.append((loop, event))
+
+
+def remove_listener(loop: asyncio.AbstractEventLoop, event: asyncio.Event):
+    with _listeners_lock:
+        if (loop, event) in _listeners:
+            _listeners.remove((loop, event))
+
+
+def has_listeners() -> bool:
+    return bool(_listeners)
+
+
+def notify_listeners():
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for loop, event in listeners:
+        loop.call_soon_threadsafe(event.set)
+
+
+def _job_row(job_type: str, payload: dict, delay: float) -> OutboxJob:
+    if job_type not in job_types:
+        raise ValueError(f"Unknown job type: {job_type}")
+    return OutboxJob(
+        job_type=job_type,
+        payload=payload,
+        status=PENDING,
+        attempts=0,
+        max_attempts=job_types[job_type].max_attempts,
+        run_after=datetime.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_job(db: Session, job_type: str, payload: dict, delay: float = 0.0, commit: bool = True) -> OutboxJob:
+    """Add a job to the outbox.
+
+    With commit=False the row becomes visible together with the caller's own
+    changes when the caller commits, so the work and its follow-ups are recorded
+    atomically.
+    """
+    row = _job_row(job_type, payload, delay)
+    db.add(row)
+    if commit:
+        db.commit()
+        notify_listeners()
+    return row
+
+
+async def enqueue_job_async(db: AsyncSession, job_type: str, payload: dict, delay: float = 0.0, commit: bool = True) -> OutboxJob:
+    """enqueue_job for an AsyncSession, as used by the request handlers."""
+    row = _job_row(job_type, payload, delay)
+    db.add(row)
+    if commit:
+        await db.commit()
+        notify_listeners()
+    return row
+
+
+def claim_jobs(
+    db: Session, worker_id: str, limit: int, lease: timedelta = DEFAULT_LEASE, job_ids: Optional[Sequence[int]] = None,
+) -> List[ClaimedJob]:
+    """Lock up to `limit` runnable jobs for this worker, only those in `job_ids` if given.
+
+    SKIP LOCKED lets any number of workers claim at the same time without
+    blocking on, or double-claiming, each other's rows.
+    """
+    now = datetime.now()
+    query = select(OutboxJob)
+    if job_ids is not None:
+        query = query.where(OutboxJob.id.in_(job_ids))
+    rows = db.execute(
+        query
+        .where(or_(
+            and_(OutboxJob.status == PENDING, OutboxJob.run_after <= now),
+            and_(OutboxJob.status == RUNNING, OutboxJob.locked_at < now - lease),
+        ))
+        .order_by(OutboxJob.run_after, OutboxJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for row in rows:
+        row.status = RUNNING
+        row.locked_at = now
+        row.locked_by = worker_id
+        row.attempts += 1
+    db.commit()
+    return [ClaimedJob(row) for row in rows]
+
+
+def backoff_delay(attempts: int) -> float:
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def mark_done(db: Session, job_id: int, result: Any = None):
+    row = db.get(OutboxJob, job_id)
+    row.status = DONE
+    row.result = result
+    row.last_error = None
+    row.locked_at = None
+    row.finished_at = datetime.now()
+    db.commit()
+
+
+def mark_failed(db: Session, job_id: int, error: str, retry: bool = True) -> bool:
+    """Schedule a retry, or fail the job for good. Returns True when no attempts are left or retry is False."""
+    row = db.get(OutboxJob, job_id)
+    row.last_error = error
+    row.locked_at = None
+    final = not retry or row.attempts >= row.max_attempts
+    if final:
+        row.status = FAILED
+        row.finished_at = datetime.now()
+    else:
+        row.status = PENDING
+        row.run_after = datetime.now() + timedelta(seconds=backoff_delay(row.attempts))
+    db.commit()
+    return final
+
+
+def replay_job(db: Session, job_id: int) -> OutboxJob:
+    """Run a finished or failed job again from scratch."""
+    row = db.get(OutboxJob, job_id)
+    if row is None:
+        raise LookupError(f"No outbox job with id {job_id}")
+    row.status = PENDING
+    row.attempts = 0
+    row.run_after = datetime.now()
+    row.locked_at = None
+    row.locked_by = None
+    row.finished_at = None
+    db.commit()
+    notify_listeners()
+    return row
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from typing import Optional, Sequence, Set
+from sqlalchemy.exc import SQLAlchemyError
+from src.database import SessionLocal
+from src.helperFunctions.ack_dispatch import spawn_tracked
+from src.helperFunctions.incident_events import ensure_event_partitions
+from src.helperFunctions.metrics import record_latency
+from src.outbox import queue
+from src.outbox.queue import ClaimedJob, run_sync
+
+
+logger = logging.getLogger(__name__)
+
+# How often a running worker makes sure the coming incident_events partitions exist, so
+# events never land in the default partition, which would block creating their month's
+PARTITION_CHECK_SECONDS = 3600.0
+
+
+class PermanentJobError(Exception):
+    """Raised by a job for an error retrying cannot fix, e.g. invalid input; the job fails right away."""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class OutboxWorker:
+    """Claims outbox jobs and runs up to `concurrency` of them at a time.
+
+    Any number of workers, in this process or on other nodes, can drain the same
+    table; throughput grows with the number of workers. While running, a worker
+    also creates the coming incident_events partitions every partition_check_interval.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        lease: timedelta = queue.DEFAULT_LEASE,
+        session_factory=SessionLocal,
+        worker_id: Optional[str] = None,
+        partition_check_interval: Optional[float] = PARTITION_CHECK_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.worker_id = worker_id or default_worker_id()
+        self._session_factory = session_factory
+        self.partition_check_interval = partition_check_interval
+        self._next_partition_check = 0.0
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def claim(self, limit: int, job_ids: Optional[Sequence[int]] = None):
+        # Blocking, so run() and drain() call it on a worker thread
+        with self._session_factory() as db:
+            return queue.claim_jobs(db, self.worker_id, limit, self.lease, job_ids)
+
+    def ensure_partitions(self):
+        # Blocking, so run() calls it on a worker thread
+        with self._session_factory() as db:
+            failed = ensure_event_partitions(db.connection())
+            db.commit()
+        if failed:
+            logger.error("Could not create the incident_events partitions %s", ", ".join(failed))
+
+    async def maybe_ensure_partitions(self):
+        if self.partition_check_interval is None or time.monotonic() < self._next_partition_check:
+            return
+        self._next_partition_check = time.monotonic() + self.partition_check_interval
+        try:
+            await asyncio.to_thread(self.ensure_partitions)
+        except SQLAlchemyError as e:
+            logger.warning("Could not check the incident_events partitions: %s", e)
+
+    async def run_job(self, claimed: ClaimedJob):
+        job_type = queue.job_types.get(claimed.job_type)
+        started = time.monotonic()
+        queue.current_job.set(claimed)
+        db = self._session_factory()
+        try:
+            if job_type is None:
+                raise LookupError(f"No runner registered for job type {claimed.job_type}")
+            result = await asyncio.wait_for(job_type.func(claimed.payload, db), job_type.timeout)
+        except Exception as e:
+            await run_sync(db, db.rollback)
+            error = f"{type(e).__name__}: {e}"
+            if job_type is not None and job_type.on_error is not None:
+                try:
+                    await job_type.on_error(claimed.payload, e, db)
+                    await run_sync(db, db.flush)
+                except Exception as hook_error:
+                    await run_sync(db, db.rollback)
+                    logger.error("Error hook of outbox job %s failed: %s", claimed.id, hook_error)
+            final = await run_sync(db, queue.mark_failed, db, claimed.id, error, not isinstance(e, PermanentJobError))
+            logger.error(
+                "Outbox job %s (%s) failed on attempt %s/%s: %s",
+                claimed.id, claimed.job_type, claimed.attempts, claimed.max_attempts, error,
+            )
+            if final and job_type is not None and job_type.on_failure is not None:
+                try:
+                    await job_type.on_failure(claimed.payload, e, db)
+                except Exception as hook_error:
+                    logger.error("Failure hook of outbox job %s failed: %s", claimed.id, hook_error)
+            return False
+        else:
+            await run_sync(db, queue.mark_done, db, claimed.id, result)
+            # Follow-up jobs enqueued by the runner became visible with that commit
+            queue.notify_listeners()
+            return True
+        finally:
+            await run_sync(db, db.close)
+            record_latency(f"outbox.{claimed.job_type}", time.monotonic() - started)
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        queue.add_listener(loop, self._wakeup)
+        logger.info("Outbox worker %s started with concurrency %s", self.worker_id, self.concurrency)
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                await self.maybe_ensure_partitions()
+                free = self.concurrency - len(self._running)
+                claimed = []
+                if free > 0:
+                    try:
+                        claimed = await asyncio.to_thread(self.claim, free)
+                    except SQLAlchemyError as e:
+                        logger.warning("Could not claim outbox jobs: %s", e)
+                for job in claimed:
+                    task = spawn_tracked(self.run_job(job), f"outbox job {job.id} {job.job_type}")
+                    self._running.add(task)
+                    task.add_done_callback(self._on_job_done)
+                if len(claimed) == free and free > 0:
+                    # There may be more waiting, claim again right away
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            queue.remove_listener(loop, self._wakeup)
+
+    def _on_job_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> asyncio.Task:
+        self._stopping = False
+        self._task = spawn_tracked(self.run(), f"outbox worker {self.worker_id}")
+        return self._task
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop claiming and give the jobs in flight a chance to finish.
+
+        Jobs still running after `timeout` are cancelled; their lease expires and
+        another worker picks them up again.
+        """
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+        if self._running:
+            done, pending = await asyncio.wait(set(self._running), timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+    async def drain(self, max_seconds: Optional[float] = None) -> int:
+        """Run claimable jobs until none are left, returning how many ran.
+
+        Used where no worker keeps running, e.g. in Lambda before it freezes.
+        """
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        ran = 0
+        while deadline is None or time.monotonic() < deadline:
+            claimed = await asyncio.to_thread(self.claim, self.concurrency)
+            if not claimed:
+                break
+            await asyncio.gather(*(self.run_job(job) for job in claimed))
+            ran += len(claimed)
+        return ran
+
+    async def run_once(self, job_ids: Sequence[int] = ()) -> int:
+        """Run the given jobs, then one batch of whatever else is claimable, returning how many ran.
+
+        Bounded, unlike drain(): the rest of the backlog is left to the workers.
+        """
+        ran = 0
+        if job_ids:
+            claimed = await asyncio.to_thread(self.claim, len(job_ids), job_ids)
+            await asyncio.gather(*(self.run_job(job) for job in claimed))
+            ran += len(claimed)
+        #Picks up the follow-ups the jobs above enqueued, e.g. the steps of a new incident
+        claimed = await asyncio.to_thread(self.claim, self.concurrency)
+        await asyncio.gather(*(self.run_job(job) for job in claimed))
+        return ran + len(claimed)
+
+
+_worker: Optional[OutboxWorker] = None
+
+
+async def start_outbox_worker(concurrency: int, poll_interval: float = 1.0) -> Optional[OutboxWorker]:
+    global _worker
+    if concurrency <= 0 or _worker is not None:
+        return _worker
+    _worker = OutboxWorker(concurrency=concurrency, poll_interval=poll_interval)
+    _worker.start()
+    return _worker
+
+
+async def stop_outbox_worker():
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+async def process_outbox(*job_ids: int):
+    """Make sure newly enqueued jobs run: wake the worker, or run them inline when there is none.
+
+    Inline, only `job_ids` and one batch besides run per call, so a request never
+    works off the whole outbox; the backlog is for `python -m src.outbox worker`.
+    """
+    if queue.has_listeners():
+        queue.notify_listeners()
+        return
+    await OutboxWorker().run_once(job_ids)
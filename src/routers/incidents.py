@@ -0,0 +1,152 @@
+import logging
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import schemas
+from src.database import get_async_db
+from src.helperFunctions.incident_cache import find_incident_by_so_number
+from src.helperFunctions.incident_events import page_timeline
+from src.helperFunctions.incident_queries import DEFAULT_LIMIT, MAX_LIMIT, page_incidents, stream_incidents
+from src.helperFunctions.incident_search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_incidents
+from src.helperFunctions.incident_stats import incident_stats
+from src.middleware.api_key import require_api_key
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter(
+    prefix="/incidents",
+    tags=["Incidents"],
+    dependencies=[Depends(require_api_key)],
+)
+
+
+def incident_filter(
+    product: List[str] = Query([]),
+    team: List[str] = Query([]),
+    component: List[str] = Query([]),
+    severity: List[str] = Query([]),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    match: Literal["any", "all"] = "any",
+) -> schemas.IncidentFilter:
+    """Filters shared by the listing endpoints.
+
+    Repeat a filter for several values, e.g. ?product=Sportsbook&product=BetBuilder;
+    match=all requires all of them instead of any.
+    """
+    return schemas.IncidentFilter(
+        products=product,
+        teams=team,
+        components=component,
+        severities=severity,
+        since=since,
+        until=until,
+        match_all=match == "all",
+    )
+
+
+def to_json_line(row: dict) -> str:
+    return schemas.IncidentResponse.model_validate(row).model_dump_json()
+
+
+@router.get("", response_model=List[schemas.IncidentResponse])
+async def list_incidents(
+    request: Request,
+    response: Response,
+    filters: schemas.IncidentFilter = Depends(incident_filter),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """One page of matching incidents in (created_at, id) order, newest first by default.
+
+    When there are more, the X-Next-Cursor header holds the `after` of the next
+    page and the Link header its URL.
+    """
+    rows, next_cursor = await page_incidents(db, filters, after, limit, descending=order == "desc")
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+    return rows
+
+
+@router.get("/search", response_model=List[schemas.IncidentSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, description='Words to look for; supports "phrases", OR and -word'),
+    filters: schemas.IncidentFilter = Depends(incident_filter),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Incidents whose description or Statuspage message mention `q`, best match first."""
+    return await search_incidents(db, q, filters, limit)
+
+
+@router.get("/stats", response_model=List[schemas.IncidentStats])
+async def stats(
+    filters: schemas.IncidentFilter = Depends(incident_filter),
+    group_by: List[Literal["day", "team", "product", "severity"]] = Query([]),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Incident counts, customer-impact rate and MTTR of the matching incidents, by day they started.
+
+    Read from daily rollups, so the cost grows with the days covered and not the
+    number of incidents; since and until are rounded to whole days. Repeat
+    group_by for finer groups, e.g. ?group_by=team&group_by=severity.
+    """
+    return await incident_stats(db, filters, group_by)
+
+
+@router.get("/export")
+async def export_incidents(
+    filters: schemas.IncidentFilter = Depends(incident_filter),
+    after: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    format: Literal["ndjson", "json"] = "ndjson",
+):
+    """Every matching incident, streamed as it is read, for reporting scripts.
+
+    Rows are read through a server-side cursor, so memory use does not grow
+    with the number of incidents.
+    """
+    rows = stream_incidents(filters, after, descending=order == "desc")
+
+    async def ndjson():
+        async for row in rows:
+            yield to_json_line(row) + "\n"
+
+    async def json_array():
+        separator = "["
+        async for row in rows:
+            yield separator + to_json_line(row)
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    if format == "ndjson":
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(json_array(), media_type="application/json")
+
+
+@router.get("/{so_number}/timeline", response_model=List[schemas.IncidentEventResponse])
+async def incident_timeline(
+    so_number: str,
+    request: Request,
+    response: Response,
+    after: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Status changes and integration outcomes of an incident, oldest first, paged like the listing."""
+    incident = await find_incident_by_so_number(db, so_number)
+    if incident is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No incident found with SO Number: {so_number}"
+        )
+    events, next_cursor = await page_timeline(db, incident.id, incident.created_at, after, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+    return events
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional,List
 
 
@@ -17,7 +17,7 @@ class IncidentBase(BaseModel):
     message_for_sp: Optional[str] = Field(None, min_length=0, max_length=250)
     statuspage_notification: bool = Field(False)
     separate_channel_creation: bool = Field(False)
-    jira_issue_key: str = None
+    jira_issue_key: Optional[str] = None
 
 class IncidentCreate(IncidentBase):
     """Model for creating an incident."""
@@ -27,6 +27,8 @@ class IncidentCreate(IncidentBase):
 
 class IncidentResponse(IncidentBase):
     """Response model for incident."""
+    #Null until the incident's SO number is written, which happens after it is created
+    so_number: Optional[str] = Field(None, description="SO Number")
     id: int
     created_at: datetime
 
@@ -41,4 +43,54 @@ class IncidentOut(BaseModel):
 class IncidenUpdate(BaseModel):
     status: Optional[str] = Field(None, max_length=50)
     description: Optional[str] = Field(None, min_length=0, max_length=250)
-    severity: Optional[List[str]] = Field(None)
\ No newline at end of file
+    severity: Optional[List[str]] = Field(None)
+
+class IncidentFilter(BaseModel):
+    """Filters of an incident listing; array filters match incidents having any of the values, or all with match_all."""
+    products: List[str] = Field(default_factory=list)
+    teams: List[str] = Field(default_factory=list)
+    components: List[str] = Field(default_factory=list)
+    severities: List[str] = Field(default_factory=list)
+    since: Optional[datetime] = Field(None, description="Incidents that started at or after this time")
+    until: Optional[datetime] = Field(None, description="Incidents that started before this time")
+    match_all: bool = Field(False)
+
+
+class IncidentSearchResult(BaseModel):
+    """An incident matching a full-text search, with the matched words highlighted in `snippet`."""
+    id: int
+    so_number: Optional[str] = None
+    start_time: datetime
+    status: Optional[str] = None
+    severity: List[str]
+    affected_products: List[str]
+    rank: float
+    snippet: str
+
+
+class IncidentStats(BaseModel):
+    """Counters of one group of incidents; the fields it is not grouped by are None."""
+    day: Optional[date] = None
+    team: Optional[str] = None
+    product: Optional[str] = None
+    severity: Optional[str] = None
+    incidents: int
+    customer_affected: int
+    customer_impact_rate: Optional[float] = Field(None, description="Share of the incidents that affected customers")
+    resolved: int
+    mttr_seconds: Optional[float] = Field(None, description="Mean time from start to resolution of the resolved incidents")
+
+
+class IncidentEventResponse(BaseModel):
+    """One entry of an incident's timeline."""
+    id: int
+    occurred_at: datetime
+    event_type: str
+    source: str
+    actor: Optional[str] = None
+    from_status: Optional[str] = None
+    to_status: Optional[str] = None
+    details: Optional[dict] = None
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,5 @@
 import os
+import re
 import json
 from fastapi import HTTPException, status, Request, Depends, Header
 from config import get_settings, Settings
@@ -9,6 +10,7 @@ import os
 import time
 import cryptography
 from cryptography.fernet import Fernet
+from src.helperFunctions.slack_signature import SlackSignatureError, SlackSignatureVerifier
 
 
 settings = get_settings()
@@ -29,6 +31,18 @@ async def initialize_options():
     options = await load_options_from_file(
         os.path.join(os.path.dirname(__file__), "options.json")
     )
+    await build_view_registry()
+
+
+_signature_verifiers: dict = {}
+
+
+def get_signature_verifier(signing_secret: str) -> SlackSignatureVerifier:
+    # One verifier per secret so the HMAC key state and replay cache are shared across requests
+    verifier = _signature_verifiers.get(signing_secret)
+    if verifier is None:
+        verifier = _signature_verifiers.setdefault(signing_secret, SlackSignatureVerifier(signing_secret))
+    return verifier
 
 
 async def verify_slack_request(
@@ -37,40 +51,12 @@ async def verify_slack_request(
     x_slack_request_timestamp,
     settings
 ):
-    if not x_slack_request_timestamp or not x_slack_signature:
-        raise HTTPException(status_code=400, detail="Missing request signature")
-
-    current_timestamp = int(time.time())
-    if abs(current_timestamp - int(x_slack_request_timestamp)) > 60 * 5:
-        raise HTTPException(status_code=400, detail="Request timestamp is too old")
-
-    sig_base = f"v0:{x_slack_request_timestamp}:{body.decode()}"
-    my_signature = (
-        "v0="
-        + hmac.new(
-            settings.SLACK_SIGNING_SECRET.encode(), sig_base.encode(), hashlib.sha256
-        ).hexdigest()
-    )
-
-    print("-------------------------------------")
-    print(f"Body: {body.decode()}")
-    print(f"Timestamp: {x_slack_request_timestamp}")
-    print(f"Received signature: {x_slack_signature}")
-    print(f"Sig base: {sig_base}")
-    print(f"Computed signature: {my_signature}")
-    print(f"X_SLACK_TIMETAMPS: {x_slack_request_timestamp}")
-    print(f"Signing Secret: {settings.SLACK_SIGNING_SECRET}")
-    print(f"Loaded Signing Secret: {settings.SLACK_SIGNING_SECRET}")
-    print("-------------------------------------")
-
-
-    if not hmac.compare_digest(my_signature, x_slack_signature):
-        print("Signature mismatch")
-        raise HTTPException(
-            status_code=400, detail="Invalid request signature is detected"
+    try:
+        get_signature_verifier(settings.SLACK_SIGNING_SECRET).verify(
+            body, x_slack_signature, x_slack_request_timestamp
         )
-
-    print("Signature verified")
+    except SlackSignatureError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 async def slack_challenge_parameter_verification(request: Request):
@@ -112,6 +98,8 @@ async def create_modal_view(callback_id: str, suggested_so_number:str) -> dict:
                     "placeholder": {"type": "plain_text", "text": "Enter the SO Number (e.g., SO-1245)"},
                     "initial_value": suggested_so_number
                 },
+                #The suggestion is not kept, see generate_next_so_number
+                "hint": {"type": "plain_text", "text": "A placeholder: the incident is filed under its Jira ticket key."},
             },
             {
                 "type": "input",
@@ -398,5 +386,81 @@ async def update_modal_view(callback_id:str) -> dict:
         ],
         "submit": {"type": "plain_text", "text": "Submit"}
     }
-    
-    
+
+
+# Precompiled modal views
+# The Block Kit dicts above are only built once at startup, with placeholders in
+# the per-request slots. Each view is serialized into the `view` argument of
+# views.open and split around the placeholders, so a slash command only has to join strings.
+_PRIVATE_METADATA_SLOT = "__private_metadata__"
+_SUGGESTED_SO_NUMBER_SLOT = "__suggested_so_number__"
+
+_SLOT_PATTERN = re.compile(
+    r'"(__private_metadata__|__suggested_so_number__)"'
+)
+
+
+class PrecompiledView:
+    """A modal view serialized once, with the per-request values left as gaps."""
+
+    def __init__(self, view: dict):
+        view = dict(view)
+        self.default_private_metadata = view.get("private_metadata", "")
+        if "private_metadata" in view:
+            view["private_metadata"] = _PRIVATE_METADATA_SLOT
+
+        serialized = json.dumps(view, separators=(",", ":"), ensure_ascii=False)
+        parts = _SLOT_PATTERN.split(serialized)
+        self._segments = parts[0::2]
+        self._slots = parts[1::2]
+
+    def render(self, private_metadata: str = None, suggested_so_number: str = None) -> str:
+        values = {
+            _PRIVATE_METADATA_SLOT: (
+                private_metadata
+                if private_metadata is not None
+                else self.default_private_metadata
+            ),
+            _SUGGESTED_SO_NUMBER_SLOT: suggested_so_number or "",
+        }
+        chunks = [self._segments[0]]
+        for slot, segment in zip(self._slots, self._segments[1:]):
+            chunks.append(json.dumps(values[slot], ensure_ascii=False))
+            chunks.append(segment)
+        return "".join(chunks)
+
+
+view_registry: dict = {}
+
+
+async def build_view_registry():
+    """Render every slash command modal once from the loaded options."""
+    view_registry["incident_form"] = PrecompiledView(
+        await create_modal_view(
+            callback_id="incident_form",
+            suggested_so_number=_SUGGESTED_SO_NUMBER_SLOT,
+        )
+    )
+    view_registry["so_lookup_form"] = PrecompiledView(
+        await get_modal_view(callback_id="so_lookup_form")
+    )
+    view_registry["statuspage_update"] = PrecompiledView(
+        await update_modal_view(callback_id="statuspage_update")
+    )
+
+
+async def render_view_payload(
+    callback_id: str,
+    private_metadata: str = None,
+    suggested_so_number: str = None,
+) -> str:
+    """Return the serialized view of a registered modal, the `view` argument of views.open."""
+    if not view_registry:
+        await initialize_options()
+    view = view_registry.get(callback_id)
+    if view is None:
+        raise KeyError(f"No modal view registered for callback_id {callback_id}")
+    return view.render(
+        private_metadata=private_metadata,
+        suggested_so_number=suggested_so_number,
+    )
@@ -1,5 +1,3 @@
-<<<<<<< HEAD
-=======
 import os
 import json
 import time
@@ -10,7 +8,8 @@ import requests
 import boto3
 
 from botocore.exceptions import ClientError
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Dict, Union
 
 # Environment variables set via Terraform
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET", "")
@@ -24,9 +23,33 @@ dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(DYNAMODB_TABLE_NAME)
 
 
-def verify_slack_signature(headers: Dict[str, str], raw_body: str) -> None:
+# Slack recommends ignoring requests older than 5 minutes to mitigate replay attacks
+MAX_REQUEST_AGE_SECONDS = 60 * 5
+MAX_SEEN_SIGNATURES = 10_000
+
+# HMAC key state is computed once per container and copied for every request
+_SIGNING_MAC = hmac.new(SLACK_SIGNING_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+
+# Signatures already accepted by this container, oldest first, mapped to when they can be forgotten
+_seen_signatures: "OrderedDict[bytes, float]" = OrderedDict()
+
+
+def _remember_signature(signature: bytes, now: float) -> bool:
+    while _seen_signatures:
+        expires_at = next(iter(_seen_signatures.values()))
+        if expires_at > now and len(_seen_signatures) < MAX_SEEN_SIGNATURES:
+            break
+        _seen_signatures.popitem(last=False)
+    if signature in _seen_signatures:
+        return False
+    # Timestamps are accepted up to 5 minutes either side of now
+    _seen_signatures[signature] = now + 2 * MAX_REQUEST_AGE_SECONDS
+    return True
+
+
+def verify_slack_signature(headers: Dict[str, str], raw_body: Union[str, bytes]) -> None:
     """
-    Inline Slack request verification. Raises ValueError on mismatch/expired requests.
+    Inline Slack request verification. Raises ValueError on mismatch/expired/replayed requests.
     """
     if not SLACK_SIGNING_SECRET:
         raise ValueError("Missing SLACK_SIGNING_SECRET environment variable.")
@@ -37,21 +60,28 @@ def verify_slack_signature(headers: Dict[str, str], raw_body: str) -> None:
     if not slack_signature or not slack_timestamp:
         raise ValueError("Missing Slack signature or timestamp headers.")
 
-    # Slack recommends ignoring requests older than 5 minutes to mitigate replay attacks
-    now = int(time.time())
-    if abs(now - int(slack_timestamp)) > 60 * 5:
+    now = time.time()
+    try:
+        request_time = int(slack_timestamp)
+    except ValueError:
+        raise ValueError("Slack request timestamp is too old or invalid.")
+    if abs(now - request_time) > MAX_REQUEST_AGE_SECONDS:
         raise ValueError("Slack request timestamp is too old or invalid.")
 
-    sig_basestring = f"v0:{slack_timestamp}:{raw_body}"
-    my_signature = "v0=" + hmac.new(
-        SLACK_SIGNING_SECRET.encode("utf-8"),
-        sig_basestring.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
+    mac = _SIGNING_MAC.copy()
+    mac.update(b"v0:")
+    mac.update(slack_timestamp.encode("ascii"))
+    mac.update(b":")
+    mac.update(raw_body.encode("utf-8") if isinstance(raw_body, str) else raw_body)
+    my_signature = b"v0=" + mac.hexdigest().encode("ascii")
+    received_signature = slack_signature.encode("ascii", "replace")
 
-    if not hmac.compare_digest(my_signature, slack_signature):
+    if not hmac.compare_digest(my_signature, received_signature):
         raise ValueError("Invalid Slack signature. Possible forgery.")
 
+    if not _remember_signature(received_signature, now):
+        raise ValueError("Slack request has already been processed.")
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -95,68 +125,81 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     except ClientError as e:
         return _error_response(500, f"DynamoDB error: {str(e)}")
 
-    # 6) If command == "/create-incident", let's open a Slack modal 
-    #    using the Slack Bot token and Slack's "views.open" endpoint.
-    if command == "/create-incident":
-        trigger_id = form_data.get("trigger_id", [""])[0]
-        if not trigger_id:
-            return _error_response(400, "Missing trigger_id. Slack cannot open a modal without it.")
-
-        # Build a sample modal
-        modal_view = {
-            "type": "modal",
-            "callback_id": "incident_form",
-            "title": {"type": "plain_text", "text": "Create Incident"},
-            "submit": {"type": "plain_text", "text": "Submit"},
-            "close": {"type": "plain_text", "text": "Cancel"},
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "description_block",
-                    "label": {"type": "plain_text", "text": "Description"},
-                    "element": {
-                        "type": "plain_text_input",
-                        "multiline": True,
-                        "action_id": "description_input"
-                    }
+    # 6) Route the command through the handler table (one dict lookup)
+    command_handler = COMMAND_HANDLERS.get(command, _acknowledge_command)
+    return command_handler(form_data, command, text, item_id)
+
+
+def _open_incident_modal(form_data: Dict[str, list], command: str, text: str, item_id: str) -> Dict[str, Any]:
+    """Open the incident modal using the Slack Bot token and Slack's "views.open" endpoint."""
+    trigger_id = form_data.get("trigger_id", [""])[0]
+    if not trigger_id:
+        return _error_response(400, "Missing trigger_id. Slack cannot open a modal without it.")
+
+    # Build a sample modal
+    modal_view = {
+        "type": "modal",
+        "callback_id": "incident_form",
+        "title": {"type": "plain_text", "text": "Create Incident"},
+        "submit": {"type": "plain_text", "text": "Submit"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            {
+                "type": "input",
+                "block_id": "description_block",
+                "label": {"type": "plain_text", "text": "Description"},
+                "element": {
+                    "type": "plain_text_input",
+                    "multiline": True,
+                    "action_id": "description_input"
                 }
-            ]
-        }
-
-        # Post to Slack "views.open"
-        slack_api_url = "https://slack.com/api/views.open"
-        headers_slack = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        payload = {
-            "trigger_id": trigger_id,
-            "view": modal_view
-        }
-
-        resp = requests.post(slack_api_url, headers=headers_slack, data=json.dumps(payload))
-        slack_data = resp.json()
-        if not slack_data.get("ok"):
-            return _error_response(500, f"Error opening modal: {slack_data}")
-
-        # Return ephemeral acknowledgement to Slack
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
-                "response_type": "ephemeral",
-                "text": f"Modal opened! DynamoDB ItemId: {item_id}"
-            })
-        }
-    else:
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
-                "response_type": "ephemeral",
-                "text": f"Received command '{command}' with text '{text}'. ItemId: {item_id}"
-            })
-        }
+            }
+        ]
+    }
+
+    # Post to Slack "views.open"
+    slack_api_url = "https://slack.com/api/views.open"
+    headers_slack = {
+        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
+        "Content-Type": "application/json; charset=utf-8"
+    }
+    payload = {
+        "trigger_id": trigger_id,
+        "view": modal_view
+    }
+
+    resp = requests.post(slack_api_url, headers=headers_slack, data=json.dumps(payload))
+    slack_data = resp.json()
+    if not slack_data.get("ok"):
+        return _error_response(500, f"Error opening modal: {slack_data}")
+
+    # Return ephemeral acknowledgement to Slack
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({
+            "response_type": "ephemeral",
+            "text": f"Modal opened! DynamoDB ItemId: {item_id}"
+        })
+    }
+
+
+def _acknowledge_command(form_data: Dict[str, list], command: str, text: str, item_id: str) -> Dict[str, Any]:
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({
+            "response_type": "ephemeral",
+            "text": f"Received command '{command}' with text '{text}'. ItemId: {item_id}"
+        })
+    }
+
+
+# Slash command -> handler. This Lambda is deployed as a single file, so it keeps
+# its own table with the same shape as the registry in src/handlers.
+COMMAND_HANDLERS = {
+    "/create-incident": _open_incident_modal,
+}
 
 
 def _error_response(status: int, message: str) -> Dict[str, Any]:
@@ -166,4 +209,3 @@ def _error_response(status: int, message: str) -> Dict[str, Any]:
         "headers": {"Content-Type": "application/json"},
         "body": json.dumps({"error": message})
     }
->>>>>>> 3b2ab68 (Lambda codes)
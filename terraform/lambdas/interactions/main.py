@@ -1,5 +1,3 @@
-<<<<<<< HEAD
-=======
 import os
 import json
 import time
@@ -10,7 +8,8 @@ import requests
 import boto3
 
 from botocore.exceptions import ClientError
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Dict, Union
 
 # Environment variables
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET", "")
@@ -23,7 +22,31 @@ dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(DYNAMODB_TABLE_NAME)
 
 
-def verify_slack_signature(headers: Dict[str, str], raw_body: str) -> None:
+# Slack recommends ignoring requests older than 5 minutes to mitigate replay attacks
+MAX_REQUEST_AGE_SECONDS = 60 * 5
+MAX_SEEN_SIGNATURES = 10_000
+
+# HMAC key state is computed once per container and copied for every request
+_SIGNING_MAC = hmac.new(SLACK_SIGNING_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+
+# Signatures already accepted by this container, oldest first, mapped to when they can be forgotten
+_seen_signatures: "OrderedDict[bytes, float]" = OrderedDict()
+
+
+def _remember_signature(signature: bytes, now: float) -> bool:
+    while _seen_signatures:
+        expires_at = next(iter(_seen_signatures.values()))
+        if expires_at > now and len(_seen_signatures) < MAX_SEEN_SIGNATURES:
+            break
+        _seen_signatures.popitem(last=False)
+    if signature in _seen_signatures:
+        return False
+    # Timestamps are accepted up to 5 minutes either side of now
+    _seen_signatures[signature] = now + 2 * MAX_REQUEST_AGE_SECONDS
+    return True
+
+
+def verify_slack_signature(headers: Dict[str, str], raw_body: Union[str, bytes]) -> None:
     if not SLACK_SIGNING_SECRET:
         raise ValueError("Missing SLACK_SIGNING_SECRET.")
 
@@ -33,20 +56,28 @@ def verify_slack_signature(headers: Dict[str, str], raw_body: str) -> None:
     if not slack_signature or not slack_timestamp:
         raise ValueError("Missing Slack signature or timestamp headers.")
 
-    now = int(time.time())
-    if abs(now - int(slack_timestamp)) > 300:  # 5 minutes
+    now = time.time()
+    try:
+        request_time = int(slack_timestamp)
+    except ValueError:
+        raise ValueError("Request is too old or invalid timestamp.")
+    if abs(now - request_time) > MAX_REQUEST_AGE_SECONDS:
         raise ValueError("Request is too old or invalid timestamp.")
 
-    basestring = f"v0:{slack_timestamp}:{raw_body}"
-    my_signature = "v0=" + hmac.new(
-        SLACK_SIGNING_SECRET.encode("utf-8"),
-        basestring.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
+    mac = _SIGNING_MAC.copy()
+    mac.update(b"v0:")
+    mac.update(slack_timestamp.encode("ascii"))
+    mac.update(b":")
+    mac.update(raw_body.encode("utf-8") if isinstance(raw_body, str) else raw_body)
+    my_signature = b"v0=" + mac.hexdigest().encode("ascii")
+    received_signature = slack_signature.encode("ascii", "replace")
 
-    if not hmac.compare_digest(my_signature, slack_signature):
+    if not hmac.compare_digest(my_signature, received_signature):
         raise ValueError("Invalid Slack signature.")
 
+    if not _remember_signature(received_signature, now):
+        raise ValueError("Slack request has already been processed.")
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -80,59 +111,69 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     if token != SLACK_VERIFICATION_TOKEN:
         return _error_response(401, "Invalid Slack verification token.")
 
-    user_id = payload.get("user", {}).get("id", "unknown_user")
     view = payload.get("view", {})  # If this is a modal submission
     callback_id = view.get("callback_id", "")
     interaction_type = payload.get("type", "")  # e.g. "view_submission"
 
-    # Incident form submissions
-    if interaction_type == "view_submission" and callback_id == "incident_form":
-        # Slack modal form data is in `view['state']['values']`, etc.
-        state_values = view.get("state", {}).get("values", {})
-
-        # Extracting a "description" from an input block
-        description_block = state_values.get("description_block", {})
-        desc_action = description_block.get("description_input", {})
-        description_text = desc_action.get("value", "No description provided")
-
-        # Store in DynamoDB
-        incident_id = f"modal-{user_id}-{int(time.time())}"
-        try:
-            table.put_item(
-                Item={
-                    "IncidentId": incident_id,
-                    "Description": description_text,
-                    "Environment": ENVIRONMENT,
-                    "SubmittedBy": user_id,
-                    "CreatedAt": int(time.time())
-                }
-            )
-        except ClientError as e:
-            return _error_response(500, f"DynamoDB error: {str(e)}")
-
-        # For a view_submission, if everything is good:
-        #   "response_action": "clear" => closes the modal
-        #   or "response_action": "errors" => display form validation errors
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"response_action": "clear"})
-        }
-
-    if interaction_type == "block_actions":
-        actions = payload.get("actions", [])
-
-
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
-                "response_action": "update",
-                "text": "Block action received!"
-            })
-        }
-
-    # Default fallback
+    # One dict lookup for the exact (type, callback_id), then the per-type fallback
+    interaction_handler = (
+        INTERACTION_HANDLERS.get((interaction_type, callback_id))
+        or INTERACTION_HANDLERS.get((interaction_type, None))
+        or _default_interaction
+    )
+    return interaction_handler(payload)
+
+
+def _store_incident_form(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Incident form submissions"""
+    user_id = payload.get("user", {}).get("id", "unknown_user")
+    view = payload.get("view", {})
+
+    # Slack modal form data is in `view['state']['values']`, etc.
+    state_values = view.get("state", {}).get("values", {})
+
+    # Extracting a "description" from an input block
+    description_block = state_values.get("description_block", {})
+    desc_action = description_block.get("description_input", {})
+    description_text = desc_action.get("value", "No description provided")
+
+    # Store in DynamoDB
+    incident_id = f"modal-{user_id}-{int(time.time())}"
+    try:
+        table.put_item(
+            Item={
+                "IncidentId": incident_id,
+                "Description": description_text,
+                "Environment": ENVIRONMENT,
+                "SubmittedBy": user_id,
+                "CreatedAt": int(time.time())
+            }
+        )
+    except ClientError as e:
+        return _error_response(500, f"DynamoDB error: {str(e)}")
+
+    # For a view_submission, if everything is good:
+    #   "response_action": "clear" => closes the modal
+    #   or "response_action": "errors" => display form validation errors
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"response_action": "clear"})
+    }
+
+
+def _acknowledge_block_action(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({
+            "response_action": "update",
+            "text": "Block action received!"
+        })
+    }
+
+
+def _default_interaction(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "statusCode": 200,
         "headers": {"Content-Type": "application/json"},
@@ -140,6 +181,15 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     }
 
 
+# (interaction type, callback_id) -> handler, callback_id None matches any view.
+# This Lambda is deployed as a single file, so it keeps its own table with the
+# same shape as the registry in src/handlers.
+INTERACTION_HANDLERS = {
+    ("view_submission", "incident_form"): _store_incident_form,
+    ("block_actions", None): _acknowledge_block_action,
+}
+
+
 def _error_response(status: int, message: str) -> Dict[str, Any]:
     """Helper to return JSON error to Slack."""
     return {
@@ -147,4 +197,3 @@ def _error_response(status: int, message: str) -> Dict[str, Any]:
         "headers": {"Content-Type": "application/json"},
         "body": json.dumps({"error": message})
     }
->>>>>>> 3b2ab68 (Lambda codes)
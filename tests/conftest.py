@@ -0,0 +1,35 @@
+import os
+
+# Settings are read from the environment when the app modules are imported; these let the
+# tests import them without a .env. Nothing here connects to the configured services.
+TEST_ENVIRONMENT = {
+    "NGROK_AUTHTOKEN": "test",
+    "SLACK_SIGNING_SECRET": "test-signing-secret",
+    "SLACK_VERIFICATION_TOKEN": "test",
+    "SLACK_BOT_TOKEN": "xoxb-test",
+    "SLACK_GENERAL_OUTAGES_CHANNEL": "C0GENERAL",
+    "SLACK_CLIENT_ID": "test",
+    "SLACK_TOKEN_URL": "http://slack.test/oauth",
+    "SLACK_CLIENT_SECRET": "test",
+    "SLACK_REDIRECT_URI": "http://slack.test/redirect",
+    "ENCRYPTION_KEY": "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=",
+    "database_hostname": "localhost",
+    "database_port": "5432",
+    "database_password": "test",
+    "database_name": "test",
+    "database_username": "test",
+    "secret_key": "test",
+    "algorithm": "HS256",
+    "access_token_expire_minutes": "5",
+    "opsgenie_api_key": "test",
+    "jira_api_key": "test",
+    "jira_email": "test@example.com",
+    "jira_server": "http://jira.test",
+    "statuspage_api_key": "test",
+    "statuspage_page_id": "page",
+    "statuspage_component_id": "component",
+    "statuspage_url": "http://statuspage.test",
+    "LOG_FILE": os.devnull,
+}
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
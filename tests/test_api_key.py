@@ -0,0 +1,35 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from src.middleware import api_key
+from src.middleware.api_key import require_api_key
+from src.routers import incidents
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api_key.settings, "API_KEY", "secret")
+    app = FastAPI()
+    app.include_router(incidents.router)
+
+    @app.get("/protected", dependencies=[Depends(require_api_key)])
+    async def protected():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_the_configured_key_is_let_through(client):
+    assert client.get("/protected", headers={"X-API-Key": "secret"}).json() == {"ok": True}
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-API-Key": "wrong"}])
+def test_incident_endpoints_refuse_requests_without_the_key(client, headers):
+    for path in ("/incidents", "/incidents/search?q=x", "/incidents/stats", "/incidents/export", "/incidents/SO-1/timeline"):
+        assert client.get(path, headers=headers).status_code == 401
+
+
+def test_everything_is_refused_without_a_configured_key(client, monkeypatch):
+    monkeypatch.setattr(api_key.settings, "API_KEY", "")
+
+    assert client.get("/protected", headers={"X-API-Key": ""}).status_code == 503
@@ -0,0 +1,45 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+from src.handlers.idempotency import IN_FLIGHT, IdempotencyStore, claim_statement
+
+
+class UnreachableDatabase:
+    """Session factory of a database that is down, so the store relies on its in-process cache."""
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        raise OSError("connection refused")
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def test_claim_statement_only_takes_over_unanswered_claims_past_the_lease():
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    compiled = claim_statement("command:1", now, timedelta(seconds=30)).compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+    assert "ON CONFLICT (idempotency_key) DO UPDATE SET started_at = excluded.started_at" in sql
+    assert "WHERE slack_deliveries.response IS NULL AND slack_deliveries.started_at <" in sql
+    assert now - timedelta(seconds=30) in compiled.params.values()
+
+
+def test_duplicate_within_the_lease_is_in_flight():
+    store = IdempotencyStore(session_factory=UnreachableDatabase(), lease=timedelta(seconds=30))
+    assert asyncio.run(store.claim("command:1")) == (True, None)
+    assert asyncio.run(store.claim("command:1")) == (False, IN_FLIGHT)
+
+
+def test_duplicate_after_the_lease_takes_the_delivery_over():
+    store = IdempotencyStore(session_factory=UnreachableDatabase(), lease=timedelta(0))
+    assert asyncio.run(store.claim("command:1")) == (True, None)
+    assert asyncio.run(store.claim("command:1")) == (True, None)
+
+
+def test_answered_delivery_is_replayed_whatever_its_age():
+    store = IdempotencyStore(session_factory=UnreachableDatabase(), lease=timedelta(0))
+    asyncio.run(store.claim("command:1"))
+    asyncio.run(store.complete("command:1", {"text": "done"}))
+    assert asyncio.run(store.claim("command:1")) == (False, {"text": "done"})
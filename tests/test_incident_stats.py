@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+from src.handlers.jobs import update_incident_status
+from src.helperFunctions.incident_stats import ALL
+from src.models import Incident, IncidentDailyStat, OutboxJob
+
+
+class RecordingSession:
+    """Sync session stand-in holding one incident and keeping what the job writes."""
+
+    def __init__(self, incident):
+        self.info = {}
+        self.incident = incident
+        self.added = []
+        self.statements = []
+
+    def get(self, model, ident):
+        return self.incident if model is Incident and ident == self.incident.id else None
+
+    def add(self, row):
+        self.added.append(row)
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+
+def make_incident(statuspage_incident_id=None):
+    started = datetime.now() - timedelta(hours=1)
+    return Incident(
+        id=7,
+        so_number="SO-7",
+        affected_products=["Search"],
+        severity=["High"],
+        suspected_owning_team=["Core"],
+        suspected_affected_components=[],
+        start_time=started,
+        end_time=started,
+        p1_customer_affected=False,
+        description="Search is down",
+        status="investigating",
+        statuspage_incident_id=statuspage_incident_id,
+    )
+
+
+def rollup_rows(db):
+    """The rows of every rollup upsert the job executed, as dicts."""
+    rows = []
+    for statement in db.statements:
+        if isinstance(statement, Insert) and statement.table is IncidentDailyStat.__table__:
+            params = statement.compile(dialect=postgresql.dialect()).params
+            count = sum(1 for name in params if name.startswith("day_m"))
+            rows.extend(
+                {name: params[f"{name}_m{index}"] for name in ("team", "product", "severity", "resolved", "resolution_seconds")}
+                for index in range(count)
+            )
+    return rows
+
+
+def test_resolving_an_incident_without_statuspage_counts_it_in_the_all_rollup():
+    db = RecordingSession(make_incident())
+
+    result = asyncio.run(update_incident_status({"incident_id": 7, "new_status": "Resolved"}, db))
+
+    assert result == {"status": "resolved", "statuspage": False}
+    assert db.incident.status == "resolved"
+    totals = [row for row in rollup_rows(db) if (row["team"], row["product"], row["severity"]) == (ALL, ALL, ALL)]
+    assert len(totals) == 1
+    assert totals[0]["resolved"] == 1
+    assert totals[0]["resolution_seconds"] >= 3600
+    assert not [row for row in db.added if isinstance(row, OutboxJob)]
+
+
+def test_resolving_an_incident_with_statuspage_also_queues_its_update():
+    db = RecordingSession(make_incident(statuspage_incident_id="sp-1"))
+
+    asyncio.run(update_incident_status({"incident_id": 7, "new_status": "resolved"}, db))
+
+    assert [row.job_type for row in db.added if isinstance(row, OutboxJob)] == ["statuspage.update"]
+    assert any(row["resolved"] == 1 for row in rollup_rows(db))
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import httpx
+from src.helperFunctions.jira import BULK_CREATE_LIMIT, JiraClient, idempotency_label
+
+
+class FakeJira:
+    """Stand-in for the Jira REST API, keeping the issues it created."""
+
+    def __init__(self, reject=(), drop_bulk_calls=()):
+        self.issues = []
+        self.bulk_sizes = []
+        self.reject = set(reject)
+        self.drop_bulk_calls = set(drop_bulk_calls)
+
+    def create(self, fields):
+        issue = {"id": str(len(self.issues) + 1), "key": f"SO-{len(self.issues) + 1}", "fields": fields}
+        self.issues.append(issue)
+        return {"id": issue["id"], "key": issue["key"]}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path.endswith("/issue/bulk"):
+            call = len(self.bulk_sizes)
+            self.bulk_sizes.append(len(body["issueUpdates"]))
+            created, errors = [], []
+            for index, update in enumerate(body["issueUpdates"]):
+                if update["fields"]["summary"] in self.reject:
+                    errors.append({"failedElementNumber": index, "elementErrors": {"errors": {"summary": "rejected"}}})
+                else:
+                    created.append(self.create(update["fields"]))
+            if call in self.drop_bulk_calls:
+                # Jira created the issues, but the connection failed before the response came back
+                raise httpx.ReadError("connection reset", request=request)
+            return httpx.Response(201, json={"issues": created, "errors": errors})
+        if request.url.path.endswith("/search"):
+            labels = body["jql"].split("labels in (")[1].split(")")[0].replace('"', "").split(", ")
+            matching = [issue for issue in self.issues if set(issue["fields"].get("labels", [])) & set(labels)]
+            return httpx.Response(200, json={"issues": matching})
+        return httpx.Response(201, json=self.create(body["fields"]))
+
+    def client(self) -> JiraClient:
+        return JiraClient("http://jira.test", "", client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)))
+
+
+def fields(number):
+    return {"summary": f"Incident {number}"}
+
+
+def test_create_issues_batches_into_bulk_requests_in_order():
+    jira = FakeJira()
+
+    issues = asyncio.run(jira.client().create_issues([fields(n) for n in range(2 * BULK_CREATE_LIMIT + 3)]))
+
+    assert sorted(jira.bulk_sizes) == [3, BULK_CREATE_LIMIT, BULK_CREATE_LIMIT]
+    by_key = {issue["key"]: issue for issue in jira.issues}
+    assert [by_key[issue["key"]]["fields"]["summary"] for issue in issues] == [f"Incident {n}" for n in range(2 * BULK_CREATE_LIMIT + 3)]
+
+
+def test_create_issues_leaves_rejected_elements_empty():
+    jira = FakeJira(reject={"Incident 1"})
+
+    issues = asyncio.run(jira.client().create_issues([fields(n) for n in range(3)]))
+
+    assert issues[1] is None
+    assert issues[0] is not None and issues[2] is not None
+    assert len(jira.issues) == 2
+
+
+def test_create_issues_finds_keyed_issues_of_a_chunk_lost_in_transit():
+    jira = FakeJira(drop_bulk_calls={0})
+
+    issues = asyncio.run(jira.client().create_issues([fields(n) for n in range(3)], ["a", None, "c"]))
+
+    assert [issue and issue["key"] for issue in issues] == ["SO-1", None, "SO-3"]
+    assert len(jira.issues) == 3
+
+
+def test_create_issue_once_reuses_the_issue_of_an_earlier_attempt():
+    jira = FakeJira()
+    client = jira.client()
+
+    first = asyncio.run(client.create_issue_once(fields(1), "key-1"))
+    retried = asyncio.run(client.create_issue_once(fields(1), "key-1", retrying=True))
+
+    assert retried["key"] == first["key"]
+    assert len(jira.issues) == 1
+    assert jira.issues[0]["fields"]["labels"] == [idempotency_label("key-1")]
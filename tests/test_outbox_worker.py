@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from src.outbox import queue
+from src.outbox.queue import ClaimedJob, JobType
+from src.outbox.worker import OutboxWorker, PermanentJobError
+
+
+class RecordingWorker(OutboxWorker):
+    """Claims from a list of pending job ids instead of the database."""
+
+    def __init__(self, pending, **kwargs):
+        super().__init__(**kwargs)
+        self.pending = list(pending)
+        self.ran = []
+
+    def claim(self, limit, job_ids=None):
+        claimable = [job for job in self.pending if job_ids is None or job in job_ids][:limit]
+        for job in claimable:
+            self.pending.remove(job)
+        return claimable
+
+    async def run_job(self, claimed):
+        self.ran.append(claimed)
+        return True
+
+
+def test_run_once_runs_the_given_jobs_and_one_batch():
+    worker = RecordingWorker(range(1, 11), concurrency=3, worker_id="test")
+
+    ran = asyncio.run(worker.run_once([7]))
+
+    assert ran == 4
+    assert worker.ran == [7, 1, 2, 3]
+    assert worker.pending == [4, 5, 6, 8, 9, 10]
+
+
+def test_run_once_without_jobs_runs_one_batch():
+    worker = RecordingWorker(range(1, 11), concurrency=3, worker_id="test")
+
+    assert asyncio.run(worker.run_once()) == 3
+    assert len(worker.pending) == 7
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+
+    def rollback(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("error, retried", [(PermanentJobError("invalid status"), False), (ValueError("flaky"), True)])
+def test_permanent_errors_fail_the_job_without_a_retry(monkeypatch, error, retried):
+    async def runner(payload, db):
+        raise error
+
+    failures = []
+    monkeypatch.setitem(queue.job_types, "test.failing", JobType("test.failing", runner, None, 5, None))
+    monkeypatch.setattr(queue, "mark_failed", lambda db, job_id, message, retry=True: failures.append(retry) or not retry)
+    claimed = ClaimedJob(SimpleNamespace(id=1, job_type="test.failing", payload={}, attempts=1, max_attempts=5))
+
+    assert asyncio.run(OutboxWorker(session_factory=FakeSession, worker_id="test").run_job(claimed)) is False
+    assert failures == [retried]
+
+
+def test_partitions_are_checked_once_per_interval(monkeypatch):
+    worker = OutboxWorker(session_factory=FakeSession, worker_id="test", partition_check_interval=3600)
+    checks = []
+    monkeypatch.setattr(worker, "ensure_partitions", lambda: checks.append(True))
+
+    async def loop_twice():
+        await worker.maybe_ensure_partitions()
+        await worker.maybe_ensure_partitions()
+
+    asyncio.run(loop_twice())
+
+    assert checks == [True]
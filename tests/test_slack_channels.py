@@ -0,0 +1,53 @@
+import asyncio
+from slack_sdk.errors import SlackApiError
+from src.helperFunctions.slack_channels import ChannelDirectory
+from src.helperFunctions.slack_utils import create_slack_channel
+
+
+class FakeSlack:
+    """Workspace whose channel list only shows `listed`, and where `taken` names cannot be created."""
+
+    def __init__(self, listed=(), taken=()):
+        self.listed = dict(listed)
+        self.taken = set(taken) | set(self.listed)
+        self.created = []
+        self.channels = ChannelDirectory(self.list_page)
+
+    async def list_page(self, **kwargs):
+        return {"channels": [{"name": name, "id": channel_id} for name, channel_id in self.listed.items()]}
+
+    async def api_call(self, method, **kwargs):
+        assert method == "conversations.create"
+        if kwargs["name"] in self.taken:
+            raise SlackApiError("name_taken", {"ok": False, "error": "name_taken"})
+        self.created.append(kwargs["name"])
+        return {"ok": True, "channel": {"id": f"C{len(self.created)}", "is_member": True}}
+
+
+def test_refresh_ignores_the_miss_window():
+    slack = FakeSlack()
+    assert asyncio.run(slack.channels.get("incident-so-1")) is None
+
+    slack.listed["incident-so-1"] = "C42"
+
+    assert asyncio.run(slack.channels.get("incident-so-1")) is None
+    assert asyncio.run(slack.channels.get("incident-so-1", refresh=True)) == "C42"
+
+
+def test_name_taken_reuses_the_channel_created_since_the_last_scan():
+    slack = FakeSlack()
+    assert asyncio.run(slack.channels.get("incident-so-1")) is None
+    # Another attempt creates the channel while the miss is still cached
+    slack.listed["incident-so-1"] = "C42"
+    slack.taken.add("incident-so-1")
+
+    assert asyncio.run(create_slack_channel(slack, "incident-so-1")) == "C42"
+    assert slack.created == []
+
+
+def test_name_taken_by_an_unlisted_channel_gets_another_name(caplog):
+    slack = FakeSlack(taken={"incident-so-1"})
+
+    assert asyncio.run(create_slack_channel(slack, "incident-so-1")) == "C1"
+    assert slack.created[0].startswith("incident-so-1-")
+    assert any(record.levelname == "ERROR" for record in caplog.records)
@@ -0,0 +1,52 @@
+import pytest
+from src.helperFunctions.slack_signature import MAX_REQUEST_AGE_SECONDS, SlackSignatureError, SlackSignatureVerifier
+
+
+NOW = 1_700_000_000
+BODY = b"token=x&command=%2Fcreate-incident&trigger_id=1.2.3"
+
+
+@pytest.fixture
+def verifier():
+    return SlackSignatureVerifier("test-signing-secret")
+
+
+def test_valid_signature_is_accepted(verifier):
+    timestamp = str(NOW)
+    verifier.verify(BODY, verifier.signature_for(BODY, timestamp), timestamp, now=NOW)
+
+
+def test_signature_matches_slack_v0_scheme(verifier):
+    import hashlib
+    import hmac
+
+    expected = "v0=" + hmac.new(b"test-signing-secret", f"v0:{NOW}:".encode() + BODY, hashlib.sha256).hexdigest()
+    assert verifier.signature_for(BODY, str(NOW)) == expected.encode()
+
+
+def test_stale_timestamp_is_rejected(verifier):
+    timestamp = str(NOW - MAX_REQUEST_AGE_SECONDS - 1)
+    with pytest.raises(SlackSignatureError, match="too old"):
+        verifier.verify(BODY, verifier.signature_for(BODY, timestamp), timestamp, now=NOW)
+
+
+def test_bad_signature_is_rejected(verifier):
+    timestamp = str(NOW)
+    signature = verifier.signature_for(BODY + b"&tampered=1", timestamp)
+    with pytest.raises(SlackSignatureError, match="Invalid request signature"):
+        verifier.verify(BODY, signature, timestamp, now=NOW)
+    # A forged request does not use up the replay cache
+    assert len(verifier.replay_cache) == 0
+
+
+def test_replayed_request_is_rejected(verifier):
+    timestamp = str(NOW)
+    signature = verifier.signature_for(BODY, timestamp)
+    verifier.verify(BODY, signature, timestamp, now=NOW)
+    with pytest.raises(SlackSignatureError, match="already been used"):
+        verifier.verify(BODY, signature, timestamp, now=NOW + 1)
+
+
+def test_missing_headers_are_rejected(verifier):
+    with pytest.raises(SlackSignatureError, match="Missing"):
+        verifier.verify(BODY, None, str(NOW), now=NOW)
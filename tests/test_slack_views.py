@@ -0,0 +1,45 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+import httpx
+from src.handlers.commands import open_command_modal
+from src.helperFunctions.slack_client import SlackClient
+from src.utils import PrecompiledView
+
+
+VIEW = {
+    "type": "modal",
+    "callback_id": "incident_form",
+    "private_metadata": "default",
+    "blocks": [{"type": "input", "element": {"type": "plain_text_input", "initial_value": "__suggested_so_number__"}}],
+}
+
+
+def test_precompiled_view_fills_the_slots():
+    view = json.loads(PrecompiledView(VIEW).render(suggested_so_number='SO-"1"'))
+
+    assert view["private_metadata"] == "default"
+    assert view["blocks"][0]["element"]["initial_value"] == 'SO-"1"'
+
+
+def test_open_command_modal_calls_views_open_through_the_client():
+    calls = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        calls.append((request.url.path, request.headers["Authorization"], parse_qs(request.content.decode())))
+        return httpx.Response(200, json={"ok": True, "view": {"id": "V1"}})
+
+    slack = SlackClient(
+        "xoxb-test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+        base_url="http://slack.test/api/", scheduler=None,
+    )
+    view = PrecompiledView(VIEW).render(suggested_so_number="SO-1")
+
+    response = asyncio.run(open_command_modal(slack, "trigger-1", view))
+
+    assert response["view"] == {"id": "V1"}
+    path, authorization, form = calls[0]
+    assert path == "/api/views.open"
+    assert authorization == "Bearer xoxb-test"
+    assert form["trigger_id"] == ["trigger-1"]
+    assert json.loads(form["view"][0])["callback_id"] == "incident_form"